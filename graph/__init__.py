@@ -1,6 +1,19 @@
 """Agentic orchestration module"""
-from graph.nodes import router_node, planner_node
-from graph.state import GraphState
-from graph.graph import create_graph
+import importlib
 
-__all__ = ['router_node', 'planner_node', 'create_graph', 'GraphState']
\ No newline at end of file
+# Resolved on first access, so light submodules (graph.safety, graph.state, ...)
+# can be imported without loading the LLM stack through graph.nodes
+_EXPORTS = {
+    'router_node': 'graph.nodes',
+    'planner_node': 'graph.nodes',
+    'create_graph': 'graph.graph',
+    'GraphState': 'graph.state',
+}
+
+__all__ = ['router_node', 'planner_node', 'create_graph', 'GraphState']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'graph' has no attribute '{name}'")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -2,39 +2,42 @@
 from graph.models.llm import get_llm
 from graph.answerer.prompts import answerer_prompt
 from graph.answerer.parser import parse_answer_with_citations
+from graph.answerer.context import pack_docs, count_tokens
 from langchain_core.runnables import RunnableLambda
+from typing import Callable
 import json
 
 def format_answerer_input(state_dict: dict) -> dict:
-    """Format state for answerer prompt."""
+    """
+    Format state for answerer prompt.
     
-    # Format retrieved docs
-    docs = state_dict.get("retrieved_docs", [])
-    docs_text = ""
-    
-    for i, doc in enumerate(docs, 1):
-        docs_text += f"\n[DOC {i}]"
-        docs_text += f"\nTitle: {doc.get('title', 'N/A')}"
-        docs_text += f"\nPrice: ${doc.get('price', 0):.2f}"
-        docs_text += f"\nBrand: {doc.get('brand', 'N/A')}"
-        docs_text += f"\nMaterial: {doc.get('material', 'N/A')}"
-        docs_text += f"\nCategory: {doc.get('category', 'N/A')}"
-        docs_text += f"\nContent: {doc.get('content', '')[:300]}..."
-        docs_text += f"\nDoc ID: {doc.get('doc_id', 'N/A')}"
-        docs_text += "\n"
+    Docs are packed within ANSWER_CONTEXT_TOKENS using the plan's
+    retrieval_fields; token counts are recorded on state_dict["answer_context"]
+    for the answerer step log.
+    """
+    plan = state_dict.get("plan") or {}
+    docs_text, report = pack_docs(
+        state_dict.get("retrieved_docs", []),
+        plan.get("retrieval_fields", [])
+    )
     
-    return {
+    inputs = {
         "query": state_dict["query"],
         "task": state_dict["task"],
-        "retrieved_docs": docs_text.strip(),
+        "retrieved_docs": docs_text,
         "comparison_criteria": json.dumps(
-            state_dict["plan"].get("comparison_criteria", [])
+            plan.get("comparison_criteria", [])
         )
     }
+    
+    report["prompt_tokens"] = count_tokens(answerer_prompt.format(**inputs))
+    state_dict["answer_context"] = report
+    
+    return inputs
 
-def create_answerer_chain():
+def create_answerer_chain(max_new_tokens: int = None):
     """Create the answerer LCEL chain."""
-    llm = get_llm()
+    llm = get_llm(max_new_tokens)
     
     chain = (
         RunnableLambda(format_answerer_input)
@@ -47,10 +50,28 @@ def create_answerer_chain():
 
 # Singleton pattern
 _answerer_chain = None
+_capped_answerer_chains = {}
 
-def get_answerer_chain():
-    """Get or create answerer chain (lazy loading)."""
+def get_answerer_chain(max_new_tokens: int = None):
+    """Get or create answerer chain (lazy loading), optionally with a generation cap."""
     global _answerer_chain
+    if max_new_tokens is not None:
+        if max_new_tokens not in _capped_answerer_chains:
+            _capped_answerer_chains[max_new_tokens] = create_answerer_chain(max_new_tokens)
+        return _capped_answerer_chains[max_new_tokens]
     if _answerer_chain is None:
         _answerer_chain = create_answerer_chain()
-    return _answerer_chain
\ No newline at end of file
+    return _answerer_chain
+
+def stream_answer(state_dict: dict, write: Callable[[dict], None], max_new_tokens: int = None) -> dict:
+    """
+    Answerer chain with the LLM output streamed: write({"answer_delta": text})
+    is called per generated chunk (for sentence-pipelined TTS), then the full
+    text is parsed like the non-streaming chain.
+    """
+    chain = RunnableLambda(format_answerer_input) | answerer_prompt | get_llm(max_new_tokens)
+    parts = []
+    for delta in chain.stream(state_dict):
+        parts.append(delta)
+        write({"answer_delta": delta})
+    return parse_answer_with_citations("".join(parts))
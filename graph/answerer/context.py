@@ -0,0 +1,107 @@
+# graph/answerer/context.py
+"""
+Token-budgeted context packing for the answerer prompt
+Counts tokens with the LLM's own tokenizer, writes only the fields the plan
+asked for, and splits a fixed token budget across docs by rank (higher-ranked
+docs get more room for their description). Catalog docs are described by
+their precomputed key-facts summary (scripts/summarize_products.py); raw
+content is only used for docs without one, e.g. web results.
+"""
+
+from graph.models.llm import get_tokenizer
+from typing import Dict, List, Tuple
+import os
+
+# Total tokens for the "Retrieved Documents" section
+ANSWER_CONTEXT_TOKENS = int(os.getenv("ANSWER_CONTEXT_TOKENS", "512"))
+
+# plan["retrieval_fields"] -> (doc key, prompt label); title and price are always included
+FIELD_LABELS = {
+    "brand": ("brand", "Brand"),
+    "material": ("material", "Material"),
+    "category": ("category", "Category"),
+    "rating": ("rating", "Rating"),
+    "review_count": ("review_count", "Reviews"),
+    "in_stock": ("in_stock", "In stock"),
+}
+
+# Values not worth spending tokens on
+EMPTY_VALUES = {"", "n/a", "nan", "none", "unknown", "[]"}
+
+
+def count_tokens(text: str) -> int:
+    return len(get_tokenizer().encode(text, add_special_tokens=False))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens, on the tokenizer's boundaries"""
+    if max_tokens <= 0:
+        return ""
+    tokenizer = get_tokenizer()
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(ids) <= max_tokens:
+        return text
+    return tokenizer.decode(ids[:max_tokens]).rstrip() + "..."
+
+
+def rank_weights(n: int) -> List[float]:
+    """1, 1/2, 1/3, ... so the top doc gets the largest share"""
+    return [1 / (rank + 1) for rank in range(n)]
+
+
+def _field_lines(doc: Dict, fields: List[str]) -> List[str]:
+    price = f"${float(doc.get('price') or 0):.2f}"
+    if "price" in (doc.get("stale_fields") or []):
+        price += " (cached, may have changed)"
+    lines = [f"Title: {doc.get('title', 'N/A')}", f"Price: {price}"]
+    for field in dict.fromkeys(fields or []):
+        if field not in FIELD_LABELS:
+            continue
+        key, label = FIELD_LABELS[field]
+        value = doc.get(key)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        if value is None or str(value).strip().lower() in EMPTY_VALUES:
+            continue
+        lines.append(f"{label}: {value}")
+    return lines
+
+
+def describe(doc: Dict) -> str:
+    """Summary if the product store has one, otherwise the raw content"""
+    return doc.get("summary") or doc.get("content") or ""
+
+
+def pack_docs(docs: List[Dict], fields: List[str], budget: int = ANSWER_CONTEXT_TOKENS) -> Tuple[str, Dict]:
+    """
+    Render docs for the prompt within a token budget
+
+    Each doc's share is the remaining budget weighted by rank; the share
+    left after its field lines goes to the description, and anything a doc
+    doesn't use carries over to the docs after it.
+
+    Returns:
+        (docs text, {"context_tokens", "budget", "per_doc_tokens", "summarized"})
+    """
+    weights = rank_weights(len(docs))
+    remaining = budget
+    blocks, per_doc = [], []
+
+    for i, doc in enumerate(docs):
+        share = int(remaining * weights[i] / sum(weights[i:]))
+
+        header = "\n".join([f"[DOC {i + 1}]"] + _field_lines(doc, fields))
+        description = truncate_tokens(describe(doc), share - count_tokens(header) - 2)
+        block = f"{header}\nDetails: {description}" if description else header
+
+        used = count_tokens(block)
+        remaining = max(0, remaining - used)
+        blocks.append(block)
+        per_doc.append(used)
+
+    return "\n\n".join(blocks), {
+        "context_tokens": sum(per_doc),
+        "budget": budget,
+        "per_doc_tokens": per_doc,
+        "summarized": sum(1 for doc in docs if doc.get("summary")),
+    }
@@ -0,0 +1,193 @@
+# graph/answerer/templates.py
+"""
+Deterministic answer generation (no LLM call)
+Renders grounded, cited answers from retrieved_docs and the plan's
+comparison_criteria. Same {"answer", "citations"} shape as
+parse_answer_with_citations; [DOC i] always refers to the i-th retrieved doc.
+
+Which tasks use it is set by TEMPLATE_TASKS; comparison and recommendation
+stay on the LLM. Answer latency is tracked per mode ("template" / "llm").
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+import threading
+import os
+
+# Tasks answered by template, e.g. TEMPLATE_TASKS="availability_check" to keep product_search on the LLM
+TEMPLATE_TASKS = {
+    t.strip() for t in os.getenv("TEMPLATE_TASKS", "availability_check,product_search").split(",") if t.strip()
+}
+
+# product_search with more docs than this goes to the LLM; 5 covers a full rag_only
+# (5 docs) or hybrid (3 + 2) retrieval, so a plain search is templated by default
+TEMPLATE_MAX_DOCS = int(os.getenv("TEMPLATE_MAX_DOCS", "5"))
+
+# Docs mentioned in a templated answer
+MAX_MENTIONED = 3
+
+# Recent answer latencies per mode
+LATENCY_WINDOW = 1000
+_latencies: Dict[str, deque] = {}
+_latencies_lock = threading.Lock()
+
+
+def select_answer_mode(task: Optional[str], docs: List[Dict]) -> str:
+    """ "template" for simple tasks in TEMPLATE_TASKS, otherwise "llm" """
+    if task not in TEMPLATE_TASKS:
+        return "llm"
+    if task == "product_search" and len(docs) > TEMPLATE_MAX_DOCS:
+        return "llm"
+    return "template"
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+def _price(doc: Dict) -> float:
+    try:
+        return float(doc.get("price") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _price_text(doc: Dict) -> str:
+    """'$9.99', hedged when the price comes from a stale web cache entry"""
+    stale = "price" in (doc.get("stale_fields") or [])
+    return f"${_price(doc):.2f}" + (" (last seen price)" if stale else "")
+
+
+def _number(doc: Dict, field: str) -> Optional[float]:
+    try:
+        return float(doc[field])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _brand(doc: Dict) -> str:
+    brand = doc.get("brand")
+    if isinstance(brand, list):
+        brand = brand[0] if brand else ""
+    brand = str(brand or "").strip()
+    return "" if brand.lower() in ("", "unknown", "nan", "n/a", "none") else brand
+
+
+def _mention(doc: Dict, i: int) -> str:
+    """'Title by Brand at $9.99 [DOC i]'"""
+    brand = _brand(doc)
+    by = f" by {brand}" if brand and brand.lower() not in str(doc.get("title", "")).lower() else ""
+    return f"{doc.get('title', 'N/A')}{by} at {_price_text(doc)} [DOC {i}]"
+
+
+def _join(parts: List[str]) -> str:
+    return parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+def _criteria_highlights(docs: List[Dict], criteria: List[str]) -> List[tuple]:
+    """(doc index, sentence) for the doc that wins each criterion the docs can support"""
+    highlights = []
+    for criterion in dict.fromkeys(criteria or []):
+        if criterion in ("price", "value_for_money"):
+            priced = [i for i, d in enumerate(docs) if _price(d) > 0]
+            if priced:
+                i = min(priced, key=lambda j: _price(docs[j]))
+                highlights.append((i, f"The lowest price is {_mention(docs[i], i + 1)}."))
+        elif criterion in ("rating", "review_count"):
+            rated = [i for i, d in enumerate(docs) if _number(d, criterion) is not None]
+            if rated:
+                i = max(rated, key=lambda j: _number(docs[j], criterion))
+                if criterion == "rating":
+                    text = f"The highest rated is {docs[i].get('title', 'N/A')} ({_number(docs[i], 'rating'):.1f}★) [DOC {i + 1}]."
+                else:
+                    text = f"The most reviewed is {docs[i].get('title', 'N/A')} ({int(_number(docs[i], 'review_count'))} reviews) [DOC {i + 1}]."
+                highlights.append((i, text))
+    return highlights
+
+
+def render_product_search(docs: List[Dict], criteria: List[str] = None) -> str:
+    """Top match, one line per supported criterion, then remaining alternatives"""
+    noun = "product" if len(docs) == 1 else "products"
+    if all(d.get("semantic_fallback") for d in docs):
+        # The retriever found nothing within the filters and returned its closest results instead
+        sentences = [f"I couldn't find an exact match, but found {len(docs)} similar {noun}.",
+                     f"The closest is {_mention(docs[0], 1)}."]
+    else:
+        sentences = [f"I found {len(docs)} matching {noun}.", f"The top match is {_mention(docs[0], 1)}."]
+
+    mentioned = {0}
+    for i, text in _criteria_highlights(docs, criteria):
+        if i not in mentioned:
+            sentences.append(text)
+            mentioned.add(i)
+
+    others = [_mention(d, i + 1) for i, d in enumerate(docs[:MAX_MENTIONED]) if i not in mentioned]
+    if others:
+        sentences.append(f"Also consider {_join(others)}.")
+    return " ".join(sentences)
+
+
+def _stock_known(doc: Dict) -> bool:
+    """Catalog docs are listed products; web docs only count as available if the provider said so"""
+    return doc.get("in_stock") is True or (doc.get("in_stock") is None and doc.get("source") != "web")
+
+
+def _availability(doc: Dict, i: int) -> str:
+    in_stock = doc.get("in_stock")
+    if in_stock is False:
+        return f"{doc.get('title', 'N/A')} is currently out of stock [DOC {i}]"
+    if not _stock_known(doc):
+        return f"{doc.get('title', 'N/A')} is listed online at {_price_text(doc)}, stock status unknown [DOC {i}]"
+    where = "available online" if doc.get("source") == "web" else "in our catalog"
+    return f"{doc.get('title', 'N/A')} is {where} at {_price_text(doc)} [DOC {i}]"
+
+
+def render_availability(docs: List[Dict]) -> str:
+    """Availability of the top match, plus other listed options"""
+    top = _availability(docs[0], 1)
+    sentences = [f"Yes, {top}." if _stock_known(docs[0]) else f"{top}."]
+    others = [_availability(d, i) for i, d in enumerate(docs[1:MAX_MENTIONED], 2)]
+    if others:
+        sentences.append(f"Other options: {_join(others)}.")
+    return " ".join(sentences)
+
+
+def render_answer(task: Optional[str], docs: List[Dict], criteria: List[str] = None) -> Dict:
+    """Templated answer and citations for any task (non-empty docs)"""
+    if task == "availability_check":
+        answer = render_availability(docs)
+    else:
+        answer = render_product_search(docs, criteria)
+
+    cited = []
+    for i in range(1, len(docs) + 1):
+        if f"[DOC {i}]" in answer:
+            cited.append(f"DOC {i}")
+    return {"answer": answer, "citations": cited}
+
+
+# ============================================================================
+# Latency per mode
+# ============================================================================
+
+def record_answer_latency(mode: str, latency_ms: float):
+    with _latencies_lock:
+        _latencies.setdefault(mode, deque(maxlen=LATENCY_WINDOW)).append(latency_ms)
+
+
+def get_answer_latency_stats() -> Dict:
+    """Count, mean, p50 and p95 answer latency (ms) per mode over the recent window"""
+    with _latencies_lock:
+        snapshot = {mode: sorted(values) for mode, values in _latencies.items()}
+
+    stats = {}
+    for mode, values in snapshot.items():
+        if not values:
+            continue
+        stats[mode] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values), 1),
+            "p50_ms": round(values[len(values) // 2], 1),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+        }
+    return stats
@@ -0,0 +1,161 @@
+# graph/async_nodes.py
+"""
+Async node implementations for create_graph("async")
+Model inference is offloaded to a dedicated executor, HTTP is awaited,
+so one event loop can serve many concurrent sessions.
+"""
+
+from graph.state import GraphState
+from graph.router import get_router_chain
+from graph.planner import get_planner_chain
+from graph.retriever import aretrieve_products, aretrieve_from_web
+from graph.answerer import get_answerer_chain
+from graph.nodes import (
+    SOURCE_TIMEOUTS_S, DEFAULT_SOURCE_TIMEOUT_S,
+    apply_router_result, apply_router_error, apply_rule_router,
+    planner_input, apply_planner_result, apply_planner_error, apply_rule_planner,
+    apply_rag_docs, apply_web_docs, apply_hybrid_docs, apply_retriever_error,
+    apply_no_docs_answer, apply_template_answer, apply_templated_answer, apply_capped_answer, apply_answerer_error,
+)
+from graph.answerer.templates import select_answer_mode
+from graph.deadline import is_tight, answer_token_cap, mark_degraded, MIN_NEW_TOKENS
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Dict, List
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# The LLM singleton is shared by every node; generating on it from several
+# threads at once doesn't go faster, so inference calls queue on one worker
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+_inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+
+async def run_inference(fn, *args):
+    """Run a blocking model call on the inference executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_inference_executor, fn, *args)
+
+
+async def arouter_node(state: GraphState) -> GraphState:
+    """Async router_node."""
+    if is_tight(state, "router"):
+        return apply_rule_router(state)
+    try:
+        result = await run_inference(lambda q: get_router_chain().invoke(q), state["query"])
+        return apply_router_result(state, result)
+    except Exception as e:
+        return apply_router_error(state, e)
+
+
+async def aplanner_node(state: GraphState) -> GraphState:
+    """Async planner_node."""
+    if is_tight(state, "planner"):
+        return apply_rule_planner(state)
+    try:
+        chain_input = planner_input(state)
+        plan = await run_inference(lambda x: get_planner_chain().invoke(x), chain_input)
+        return apply_planner_result(state, chain_input, plan)
+    except Exception as e:
+        return apply_planner_error(state, e)
+
+
+async def arag_retriever_node(state: GraphState) -> GraphState:
+    """Async rag_retriever_node."""
+    try:
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+
+        logger.info(f"Retrieving from private database with filters: {filters}")
+
+        docs = await aretrieve_products(query=query, filters=filters, k=5)
+        return apply_rag_docs(state, query, filters, docs)
+    except Exception as e:
+        return apply_retriever_error(state, "retriever", "RAG Retriever", e)
+
+
+async def aweb_retriever_node(state: GraphState) -> GraphState:
+    """Async web_retriever_node."""
+    try:
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+
+        logger.info(f"[Web Node] Retrieving from web search")
+
+        docs = await aretrieve_from_web(query, filters, k=5)
+        return apply_web_docs(state, query, filters, docs)
+    except Exception as e:
+        return apply_retriever_error(state, "web_retriever", "Web Retriever", e)
+
+
+async def _gather_sources(sources: Dict[str, Awaitable[List[dict]]], timeouts: Dict[str, float]):
+    """Async counterpart of nodes._run_sources_concurrently."""
+    start = time.perf_counter()
+    latency_ms = {}
+
+    async def timed(name, coro):
+        try:
+            return await asyncio.wait_for(coro, timeout=timeouts.get(name, DEFAULT_SOURCE_TIMEOUT_S))
+        finally:
+            latency_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    names = list(sources)
+    outcomes = await asyncio.gather(*(timed(n, sources[n]) for n in names), return_exceptions=True)
+
+    results, dropped = {}, {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            dropped[name] = "timeout"
+        elif isinstance(outcome, Exception):
+            logger.error(f"[Hybrid Node] {name} source failed: {outcome}")
+            dropped[name] = f"error: {outcome}"
+        else:
+            results[name] = outcome
+
+    for name, reason in dropped.items():
+        logger.warning(f"[Hybrid Node] Dropped {name} source ({reason}) after {latency_ms[name]:.0f}ms")
+
+    return results, dropped, latency_ms
+
+
+async def ahybrid_retriever_node(state: GraphState) -> GraphState:
+    """Async hybrid_retriever_node."""
+    try:
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+
+        logger.info(f"[Hybrid Node] Retrieving from both RAG and Web")
+
+        sources = {"rag": aretrieve_products(query, filters, k=3)}
+        skip_web = is_tight(state, "web")
+        if not skip_web:
+            sources["web"] = aretrieve_from_web(query, filters, k=2)
+        
+        results, dropped, latency_ms = await _gather_sources(sources, SOURCE_TIMEOUTS_S)
+        state = apply_hybrid_docs(state, query, filters, results, dropped, latency_ms)
+        return mark_degraded(state, "skip_web") if skip_web else state
+    except Exception as e:
+        return apply_retriever_error(state, "hybrid_retriever", "Hybrid Retriever", e)
+
+
+async def aanswerer_node(state: GraphState) -> GraphState:
+    """Async answerer_node."""
+    try:
+        if not state.get("retrieved_docs"):
+            return apply_no_docs_answer(state)
+
+        if select_answer_mode(state.get("task"), state["retrieved_docs"]) == "template":
+            return apply_template_answer(state)
+        
+        max_new_tokens = answer_token_cap(state)
+        if max_new_tokens is not None and max_new_tokens < MIN_NEW_TOKENS:
+            return apply_templated_answer(state)
+        
+        start = time.perf_counter()
+        result = await run_inference(lambda s: get_answerer_chain(max_new_tokens).invoke(s), state)
+        return apply_capped_answer(state, result, max_new_tokens, start)
+    except Exception as e:
+        return apply_answerer_error(state, e)
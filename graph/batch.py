@@ -0,0 +1,216 @@
+# graph/batch.py
+"""
+Cross-query batch execution for offline evaluation and catalog QA
+Runs router -> planner -> retriever -> answerer with every stage executed
+once for the whole batch: one batched router generation, one batched
+planner generation, one multi-query retrieval and one batched answerer pass.
+Per-query state and step_log match graph.invoke.
+"""
+
+from graph.state import GraphState
+from graph.router import get_router_chain
+from graph.planner import get_planner_chain
+from graph.retriever import retrieve_products_batch, retrieve_from_web
+from graph.answerer import get_answerer_chain
+from graph.strategies import retrieval_router_hybrid
+from graph.safety import record_check, apply_safety_refusal
+from graph.nodes import (
+    SOURCE_TIMEOUTS_S, source_executor,
+    apply_router_result, apply_router_error,
+    planner_input, apply_planner_result, apply_planner_error,
+    apply_rag_docs, apply_web_docs, apply_hybrid_docs, apply_retriever_error,
+    apply_no_docs_answer, apply_template_answer, apply_capped_answer, apply_answerer_error,
+)
+from graph.answerer.templates import select_answer_mode
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["router", "planner", "retriever", "answerer"]
+
+# Same per-mode k as the single-query retriever nodes
+RAG_K = {"rag_only": 5, "hybrid": 3}
+WEB_K = {"web_only": 5, "hybrid": 2}
+
+
+def _apply(state: GraphState, result, on_result, on_error) -> GraphState:
+    """Route one item of a return_exceptions batch to its apply_* helper."""
+    if isinstance(result, Exception):
+        return on_error(state, result)
+    try:
+        return on_result(state, result)
+    except Exception as e:
+        return on_error(state, e)
+
+
+def batch_router(states: List[GraphState]) -> List[GraphState]:
+    """One batched router generation."""
+    results = get_router_chain().batch([s["query"] for s in states], return_exceptions=True)
+    return [_apply(s, r, apply_router_result, apply_router_error) for s, r in zip(states, results)]
+
+
+def batch_planner(states: List[GraphState]) -> List[GraphState]:
+    """One batched planner generation."""
+    chain_inputs = [planner_input(s) for s in states]
+    plans = get_planner_chain().batch(chain_inputs, return_exceptions=True)
+    return [
+        _apply(s, p, lambda st, plan, ci=ci: apply_planner_result(st, ci, plan), apply_planner_error)
+        for s, ci, p in zip(states, chain_inputs, plans)
+    ]
+
+
+def batch_retriever(states: List[GraphState]) -> List[GraphState]:
+    """
+    One multi-query catalog search for every rag_only/hybrid query,
+    with the web lookups running concurrently alongside it.
+    """
+    start = time.perf_counter()
+    modes = [retrieval_router_hybrid(s) for s in states]
+
+    web_futures = {
+        i: source_executor("web").submit(retrieve_from_web, s["query"], s["plan"].get("filters", {}), WEB_K[m])
+        for i, (s, m) in enumerate(zip(states, modes)) if m in WEB_K
+    }
+    web_finished_at = {}
+    for i, future in web_futures.items():
+        future.add_done_callback(lambda f, i=i: web_finished_at.setdefault(i, time.perf_counter()))
+
+    rag_idx = [i for i, m in enumerate(modes) if m in RAG_K]
+    rag_docs, rag_error = {}, None
+    if rag_idx:
+        try:
+            results = retrieve_products_batch([states[i]["query"] for i in rag_idx], k=max(RAG_K.values()))
+            rag_docs = {i: docs[:RAG_K[modes[i]]] for i, docs in zip(rag_idx, results)}
+        except Exception as e:
+            rag_error = e
+    rag_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    def web_result(i) -> Tuple[List[dict], str]:
+        remaining = SOURCE_TIMEOUTS_S["web"] - (time.perf_counter() - start)
+        try:
+            return web_futures[i].result(timeout=max(0.0, remaining)), None
+        except FuturesTimeoutError:
+            return [], "timeout"
+        except Exception as e:
+            logger.error(f"[Batch] web source failed: {e}")
+            return [], f"error: {e}"
+
+    out = []
+    for i, (state, mode) in enumerate(zip(states, modes)):
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+
+        if mode == "web_only":
+            docs, reason = web_result(i)
+            if reason:
+                out.append(apply_retriever_error(state, "web_retriever", "Web Retriever", RuntimeError(reason)))
+            else:
+                out.append(apply_web_docs(state, query, filters, docs))
+            continue
+
+        if rag_error is not None:
+            node, label = ("hybrid_retriever", "Hybrid Retriever") if mode == "hybrid" else ("retriever", "RAG Retriever")
+            out.append(apply_retriever_error(state, node, label, rag_error))
+        elif mode == "rag_only":
+            out.append(apply_rag_docs(state, query, filters, rag_docs[i]))
+        else:
+            results, dropped = {"rag": rag_docs[i]}, {}
+            docs, reason = web_result(i)
+            if reason:
+                dropped["web"] = reason
+            else:
+                results["web"] = docs
+            latency_ms = {
+                "rag": rag_ms,
+                "web": round((web_finished_at.get(i, time.perf_counter()) - start) * 1000, 1),
+            }
+            out.append(apply_hybrid_docs(state, query, filters, results, dropped, latency_ms))
+
+    return out
+
+
+def batch_answerer(states: List[GraphState]) -> List[GraphState]:
+    """One batched answerer generation over the queries that need the LLM."""
+    llm_idx = [
+        i for i, s in enumerate(states)
+        if s.get("retrieved_docs") and select_answer_mode(s.get("task"), s["retrieved_docs"]) == "llm"
+    ]
+    start = time.perf_counter()
+    results = get_answerer_chain().batch([states[i] for i in llm_idx], return_exceptions=True) if llm_idx else []
+    answers = dict(zip(llm_idx, results))
+    # Amortized per query; kept out of get_answer_latency_stats, whose window holds single-query latencies
+    per_query_ms = round((time.perf_counter() - start) * 1000 / len(llm_idx), 1) if llm_idx else 0.0
+
+    def apply_batched_answer(state: GraphState, result: dict) -> GraphState:
+        state = apply_capped_answer(state, result)
+        state["step_log"][-1]["output"].update(latency_ms=per_query_ms, batched=True)
+        return state
+
+    out = []
+    for i, state in enumerate(states):
+        if i in answers:
+            out.append(_apply(state, answers[i], apply_batched_answer, apply_answerer_error))
+        elif state.get("retrieved_docs"):
+            out.append(_apply(state, None, lambda s, _: apply_template_answer(s), apply_answerer_error))
+        else:
+            out.append(apply_no_docs_answer(state))
+    return out
+
+
+def short_circuit_flagged(states: List[GraphState], active: List[int]) -> List[int]:
+    """Refuse flagged queries after routing, like the graph's safety edge; returns the rest."""
+    remaining = []
+    for i in active:
+        if record_check(states[i]):
+            states[i] = apply_safety_refusal(states[i])
+        else:
+            remaining.append(i)
+    return remaining
+
+
+STAGE_FUNCS = {
+    "router": batch_router,
+    "planner": batch_planner,
+    "retriever": batch_retriever,
+    "answerer": batch_answerer,
+}
+
+
+def run_batch(queries: List[str]) -> Tuple[List[GraphState], Dict]:
+    """
+    Run queries through the full pipeline, one batched call per stage
+
+    Returns:
+        (final state per query, stats) where stats holds the wall time of
+        each stage, total seconds and queries per second. Every query in a
+        batch waits for the whole stage, so stage wall time is also its
+        per-query stage latency.
+    """
+    states: List[GraphState] = [{"query": q, "step_log": []} for q in queries]
+    active = list(range(len(states)))
+    stage_ms = {}
+
+    start = time.perf_counter()
+    for stage in STAGES:
+        t0 = time.perf_counter()
+        if active:
+            done = STAGE_FUNCS[stage]([states[i] for i in active])
+            for i, state in zip(active, done):
+                states[i] = state
+        if stage == "router":
+            active = short_circuit_flagged(states, active)
+        stage_ms[stage] = round((time.perf_counter() - t0) * 1000, 1)
+        logger.info(f"[Batch] {stage}: {len(active)} queries in {stage_ms[stage]:.0f}ms")
+    total_s = time.perf_counter() - start
+
+    stats = {
+        "num_queries": len(states),
+        "short_circuited": len(states) - len(active),
+        "stage_ms": stage_ms,
+        "total_s": round(total_s, 3),
+        "queries_per_s": round(len(states) / total_s, 3) if total_s > 0 else 0.0,
+    }
+    return states, stats
@@ -0,0 +1,97 @@
+# graph/deadline.py
+"""
+Per-request latency budgets
+Callers put latency_budget_ms in the initial state; the clock starts when the
+graph is entered (each graph's entry node stamps the deadline), or earlier if
+the caller stamps it with start_deadline when the request arrives. Each node compares the time left against what its
+full-quality step typically costs and degrades when it won't fit:
+rule-based routing/planning, no web source, a capped max_new_tokens or a
+templated answer. Applied degradations are listed on the node's step_log entry.
+"""
+
+from graph.state import GraphState
+from graph.models.llm import LLM_MAX_NEW_TOKENS
+from typing import Optional
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Typical cost of each full-quality step (ms), measured on the default model
+STAGE_COST_MS = {
+    "router": float(os.getenv("ROUTER_COST_MS", "1500")),
+    "planner": float(os.getenv("PLANNER_COST_MS", "1500")),
+    "web": float(os.getenv("WEB_COST_MS", "1500")),
+}
+
+# Kept back for retrieval plus a minimal answer when deciding earlier steps
+ANSWER_RESERVE_MS = float(os.getenv("ANSWER_RESERVE_MS", "1500"))
+
+# Answerer sizing: prompt prefill overhead and per-token decode time
+ANSWER_OVERHEAD_MS = float(os.getenv("ANSWER_OVERHEAD_MS", "500"))
+LLM_MS_PER_TOKEN = float(os.getenv("LLM_MS_PER_TOKEN", "25"))
+
+# Below this many tokens an LLM answer isn't worth it, use the template
+MIN_NEW_TOKENS = 32
+
+# Caps are rounded down to this step so only a few capped chains get built
+TOKEN_CAP_STEP = 16
+
+
+def start_deadline(state: GraphState, start: Optional[float] = None) -> GraphState:
+    """
+    Stamp the deadline if the request has a budget and none is set yet
+
+    Args:
+        start: time.monotonic() when the request started (default: now)
+    """
+    budget = state.get("latency_budget_ms")
+    if budget is not None and state.get("deadline") is None:
+        state["deadline"] = (time.monotonic() if start is None else start) + budget / 1000
+    return state
+
+
+def remaining_ms(state: GraphState) -> Optional[float]:
+    """Time left in the request's budget, or None if it has no budget."""
+    if state.get("latency_budget_ms") is None:
+        return None
+    # Nodes run outside a graph start their own clock
+    start_deadline(state)
+    return (state["deadline"] - time.monotonic()) * 1000
+
+
+def is_tight(state: GraphState, stage: str) -> bool:
+    """Whether the full-quality step for stage won't fit before the deadline."""
+    remaining = remaining_ms(state)
+    if remaining is None:
+        return False
+    return remaining < STAGE_COST_MS[stage] + ANSWER_RESERVE_MS
+
+
+def answer_token_cap(state: GraphState) -> Optional[int]:
+    """
+    max_new_tokens that fits the remaining budget
+
+    Returns:
+        None when no cap is needed, otherwise the cap (below MIN_NEW_TOKENS
+        means the answer should be templated)
+    """
+    remaining = remaining_ms(state)
+    if remaining is None:
+        return None
+    tokens = int((remaining - ANSWER_OVERHEAD_MS) / LLM_MS_PER_TOKEN)
+    if tokens >= LLM_MAX_NEW_TOKENS:
+        return None
+    return max(0, tokens // TOKEN_CAP_STEP * TOKEN_CAP_STEP)
+
+
+def mark_degraded(state: GraphState, degradation: str) -> GraphState:
+    """Note a degradation on the latest step_log entry."""
+    entry = state["step_log"][-1]
+    entry.setdefault("degraded", []).append(degradation)
+    remaining = remaining_ms(state)
+    if remaining is not None:
+        entry["remaining_ms"] = round(remaining, 1)
+    logger.info(f"[Deadline] {entry['node']}: {degradation}")
+    return state
@@ -1,35 +1,61 @@
 # graph/graph.py
 from langgraph.graph import StateGraph, END
 from graph.state import GraphState
-from graph.nodes import router_node, planner_node, rag_retriever_node, web_retriever_node, hybrid_retriever_node, answerer_node
-from graph.strategies import retrieval_router_hybrid, retrieval_router_reflection, retrieval_router_autonomous
+from graph.nodes import router_node, planner_node, rag_retriever_node, web_retriever_node, hybrid_retriever_node, answerer_node, warm_retrieval_backend
+from graph.async_nodes import arouter_node, aplanner_node, arag_retriever_node, aweb_retriever_node, ahybrid_retriever_node, aanswerer_node
+from graph.speculative import speculate_node, speculative_router_node, speculative_retriever_node
+from graph.session import followup_node, refine_node, session_retriever_node, get_session_checkpointer
+from graph.safety import safety_node
+from graph.strategies import retrieval_router_hybrid, retrieval_router_reflection, retrieval_router_autonomous, session_router, safety_router
 
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+
+def _add_safety_edge(workflow, next_node: str):
+    """Route flagged queries from the router to the templated refusal."""
+    workflow.add_node("safety", safety_node)
+    workflow.add_conditional_edges(
+        "router",
+        safety_router,
+        {
+            "refuse": "safety",
+            "continue": next_node
+        }
+    )
+    workflow.add_edge("safety", END)
+
 # ============================================================================
 # Hybrid Conditional Retrieval Graph
 # ============================================================================
 
-def _build_graph_hybrid():
+def _build_graph_hybrid(async_nodes: bool = False):
     """Create the LangGraph workflow."""
     
     # Initialize graph
     workflow = StateGraph(GraphState)
     
     # Add nodes
-    workflow.add_node("router", router_node)
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("rag_retriever", rag_retriever_node)
-    workflow.add_node("web_retriever", web_retriever_node)
-    workflow.add_node("hybrid_retriever", hybrid_retriever_node)
-    workflow.add_node("answerer", answerer_node)
+    if async_nodes:
+        workflow.add_node("router", arouter_node)
+        workflow.add_node("planner", aplanner_node)
+        workflow.add_node("rag_retriever", arag_retriever_node)
+        workflow.add_node("web_retriever", aweb_retriever_node)
+        workflow.add_node("hybrid_retriever", ahybrid_retriever_node)
+        workflow.add_node("answerer", aanswerer_node)
+    else:
+        workflow.add_node("router", router_node)
+        workflow.add_node("planner", planner_node)
+        workflow.add_node("rag_retriever", rag_retriever_node)
+        workflow.add_node("web_retriever", web_retriever_node)
+        workflow.add_node("hybrid_retriever", hybrid_retriever_node)
+        workflow.add_node("answerer", answerer_node)
     
     # Define edges
     workflow.set_entry_point("router")
-    workflow.add_edge("router", "planner")
+    _add_safety_edge(workflow, "planner")
     
     # Conditional routing after planner
     workflow.add_conditional_edges(
@@ -51,16 +77,96 @@ def _build_graph_hybrid():
     return workflow
 
 
+# ============================================================================
+# Async Hybrid Graph (use with ainvoke / astream)
+# ============================================================================
+
+def _build_graph_async():
+    """Hybrid workflow with async nodes, for serving many sessions on one event loop."""
+    return _build_graph_hybrid(async_nodes=True)
+
+
+# ============================================================================
+# Speculative Retrieval Graph
+# ============================================================================
+
+def _build_graph_speculative():
+    """Start the vector search with the query, overlapping router and planner."""
+    
+    workflow = StateGraph(GraphState)
+    
+    workflow.add_node("speculate", speculate_node)
+    workflow.add_node("router", speculative_router_node)
+    workflow.add_node("planner", planner_node)
+    workflow.add_node("retriever", speculative_retriever_node)
+    workflow.add_node("answerer", answerer_node)
+    
+    workflow.set_entry_point("speculate")
+    workflow.add_edge("speculate", "router")
+    _add_safety_edge(workflow, "planner")
+    workflow.add_edge("planner", "retriever")
+    workflow.add_edge("retriever", "answerer")
+    workflow.add_edge("answerer", END)
+    
+    return workflow
+
+
+# ============================================================================
+# Multi-turn Session Graph (invoke with config=session_config(session_id))
+# ============================================================================
+
+def _build_graph_session():
+    """Follow-ups refine cached candidates; new searches run the full pipeline."""
+    
+    workflow = StateGraph(GraphState)
+    
+    workflow.add_node("followup", followup_node)
+    workflow.add_node("refine", refine_node)
+    workflow.add_node("router", router_node)
+    workflow.add_node("planner", planner_node)
+    workflow.add_node("retriever", session_retriever_node)
+    workflow.add_node("answerer", answerer_node)
+    
+    workflow.set_entry_point("followup")
+    workflow.add_conditional_edges(
+        "followup",
+        session_router,
+        {
+            "refine": "refine",
+            "new_search": "router",
+            "refuse": "safety"
+        }
+    )
+    _add_safety_edge(workflow, "planner")
+    workflow.add_edge("planner", "retriever")
+    workflow.add_edge("retriever", "answerer")
+    workflow.add_edge("refine", "answerer")
+    workflow.add_edge("answerer", END)
+    
+    return workflow
+
+
+# Versions whose state must persist between invocations
+CHECKPOINTED_VERSIONS = {"session"}
+
 
 def create_graph(version: str = 'hybrid'):
     """
     Create graph with specified version
+    
+    "hybrid": sync nodes (invoke / stream; ainvoke runs them in threads)
+    "async": async nodes, must be run with ainvoke / astream
+    "speculative": vector search starts before router/planner finish
+    "session": multi-turn memory in SQLite, pass config=session_config(session_id)
     """
     version = version.lower().strip()
     
     # Version registry
     builders = {
         "hybrid": _build_graph_hybrid,
+        "async": _build_graph_async,
+        "speculative": _build_graph_speculative,
+        "session": _build_graph_session,
     }
     
     # Get builder
@@ -70,9 +176,13 @@ def create_graph(version: str = 'hybrid'):
     
     builder = builders[version]
     
+    # Pay the vector backend's cold load here rather than inside the first request's RAG timeout
+    warm_retrieval_backend()
+    
     # Build and compile
     workflow = builder()
-    app = workflow.compile()
+    checkpointer = get_session_checkpointer() if version in CHECKPOINTED_VERSIONS else None
+    app = workflow.compile(checkpointer=checkpointer)
     
     logger.info(f"Graph {version.upper()} compiled successfully")
     
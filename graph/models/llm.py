@@ -9,6 +9,12 @@ logger = logging.getLogger(__name__)
 # Global instance
 _llm = None
 
+# Prompts per padded generate() call when chains are run with .batch()
+LLM_BATCH_SIZE = 8
+
+# Default generation length; callers on a latency budget pass a lower cap to get_llm
+LLM_MAX_NEW_TOKENS = 128
+
 def load_llm_qwen_model():
     """Load Qwen Model"""
     
@@ -23,6 +29,8 @@ def load_llm_qwen_model():
 
     logger.info(f"Loading model {model_id}...")
     tokenizer = AutoTokenizer.from_pretrained(model_id, trust_remote_code=True)
+    # Decoder-only models must be left-padded for batched generation
+    tokenizer.padding_side = "left"
     
     try:
         model = AutoModelForCausalLM.from_pretrained(
@@ -41,39 +49,47 @@ def load_llm_qwen_model():
             "text-generation",
             model=model,
             tokenizer=tokenizer,
-            max_new_tokens=128,  # Reduced for faster generation
+            max_new_tokens=LLM_MAX_NEW_TOKENS,  # Reduced for faster generation
             temperature=0.1,
             do_sample=True,
             return_full_text=False,
-            pad_token_id=tokenizer.eos_token_id
+            pad_token_id=tokenizer.eos_token_id,
+            batch_size=LLM_BATCH_SIZE
         )
     except Exception as e:
         logger.error(f"Pipeline creation failed: {e}")
         raise
     
-    llm = HuggingFacePipeline(pipeline=pipe)
+    llm = HuggingFacePipeline(pipeline=pipe, batch_size=LLM_BATCH_SIZE)
     logger.info("Model loaded successfully")
     
     return llm
 
-def get_llm():
+def get_llm(max_new_tokens: int = None):
     """
     Get the LLM instance (lazy loading singleton).
     Same model is reused across all nodes.
     
     Args:
-        model_id: HuggingFace model identifier (only used on first call)
+        max_new_tokens: Optional generation cap bound onto the shared model
     
     Returns:
-        HuggingFacePipeline instance
+        HuggingFacePipeline instance (or a bound runnable when capped)
     """
     global _llm
     
     if _llm is None:
         _llm = load_llm_qwen_model()
     
+    if max_new_tokens is not None:
+        return _llm.bind(pipeline_kwargs={"max_new_tokens": max_new_tokens})
+    
     return _llm
 
+def get_tokenizer():
+    """Tokenizer of the shared LLM, for counting prompt tokens."""
+    return get_llm().pipeline.tokenizer
+
 def reset_llm():
     """Reset the LLM instance (useful for testing or switching models)."""
     global _llm
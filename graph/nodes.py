@@ -4,274 +4,441 @@ from graph.router import get_router_chain
 from graph.planner import get_planner_chain
 from graph.retriever import retrieve_products
 from graph.retriever.web import retrieve_from_web
-from graph.answerer import get_answerer_chain
+from graph.answerer import get_answerer_chain, stream_answer
+from graph.answerer.templates import render_answer, select_answer_mode, record_answer_latency
+from graph.router.rules import rule_route
+from graph.planner.rules import rule_plan
+from graph.deadline import is_tight, answer_token_cap, mark_degraded, MIN_NEW_TOKENS
+from langgraph.config import get_stream_writer
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
-def router_node(state: GraphState) -> GraphState:
-    """Extract task, constraints, and safety flags using LangChain + HuggingFace."""
-    
-    query = state["query"]
+# Per-source retrieval budgets for the hybrid retriever (seconds)
+DEFAULT_SOURCE_TIMEOUT_S = 5.0
+SOURCE_TIMEOUTS_S = {
+    "rag": float(os.getenv("RAG_TIMEOUT_S", "8.0")),
+    "web": float(os.getenv("WEB_TIMEOUT_S", "3.0")),
+}
+
+# One pool per source so hybrid retrieval doesn't pay thread start-up per request,
+# and stalled web calls (whose futures are abandoned on timeout but keep running)
+# can't hold the threads RAG searches need, or make them queue against RAG_TIMEOUT_S
+_source_executors = {
+    "rag": ThreadPoolExecutor(max_workers=8, thread_name_prefix="retriever-rag"),
+    "web": ThreadPoolExecutor(max_workers=8, thread_name_prefix="retriever-web"),
+}
+_default_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retriever")
+
+
+def source_executor(name: str) -> ThreadPoolExecutor:
+    """Thread pool dedicated to one retrieval source"""
+    return _source_executors.get(name, _default_executor)
+
+
+_backend_warm = False
+
+
+def warm_retrieval_backend():
+    """
+    Load the vector backend and its encoder once (FAISS + stella can take
+    longer than RAG_TIMEOUT_S cold, which would drop RAG on the first request)
+    """
+    global _backend_warm
+    if _backend_warm or os.getenv("WARM_BACKEND", "1") == "0":
+        return
+    from graph.retriever import get_backend
+    start = time.perf_counter()
     try:
-        # Use the chain
-        router_chain = get_router_chain()
-        result = router_chain.invoke(query)
-        
-        # Update state
-        state["task"] = result.task
-        state["constraints"] = result.constraints.model_dump(exclude_none=True)
-        state["safety_flags"] = result.safety_flags
-        
-        # Log
-        state["step_log"].append({
-            "node": "router",
-            "input": query,
-            "output": {
-                "task": result.task,
-                "constraints": state["constraints"],
-                "safety_flags": result.safety_flags
-            },
-            "success": True
-        })
-        
+        get_backend().encode(["warm up"])
+        _backend_warm = True
+        logger.info(f"[Retriever] Vector backend warmed in {(time.perf_counter() - start) * 1000:.0f}ms")
     except Exception as e:
-        # Fallback on error
-        logger.error(f"Router error: {e}", exc_info=True)
-        
-        state["task"] = "product_search"
-        state["constraints"] = {}
-        state["safety_flags"] = []
-        state["step_log"].append({
-            "node": "router",
-            "error": str(e),
-            "success": False
-        })
+        logger.warning(f"[Retriever] Backend warm-up failed, loading on first request: {e}")
+
+# ============================================================================
+# State updates shared by the sync nodes and graph/async_nodes.py
+# ============================================================================
+
+def apply_router_result(state: GraphState, result) -> GraphState:
+    """Write router output into state and log it."""
+    
+    # Update state
+    state["task"] = result.task
+    state["constraints"] = result.constraints.model_dump(exclude_none=True)
+    state["safety_flags"] = result.safety_flags
     
+    # Log
+    state["step_log"].append({
+        "node": "router",
+        "input": state["query"],
+        "output": {
+            "task": result.task,
+            "constraints": state["constraints"],
+            "safety_flags": result.safety_flags
+        },
+        "success": True
+    })
     return state
 
-def planner_node(state: GraphState) -> GraphState:
-    """Create retrieval plan using LLM."""
+
+def apply_router_error(state: GraphState, e: Exception) -> GraphState:
+    """Fallback router output on error."""
+    logger.error(f"Router error: {e}", exc_info=True)
     
-    try:
-        # Use the chain
-        planner_chain = get_planner_chain()
-        
-        # Prepare input for chain
-        chain_input = {
+    state["task"] = "product_search"
+    state["constraints"] = {}
+    state["safety_flags"] = []
+    state["step_log"].append({
+        "node": "router",
+        "error": str(e),
+        "success": False
+    })
+    return state
+
+
+def apply_rule_router(state: GraphState) -> GraphState:
+    """Keyword routing when the latency budget can't fit the LLM router."""
+    return mark_degraded(apply_router_result(state, rule_route(state["query"])), "rule_router")
+
+
+def planner_input(state: GraphState) -> dict:
+    """Prepare input for the planner chain."""
+    return {
+        "query": state["query"],
+        "task": state["task"],
+        "constraints": state["constraints"]
+    }
+
+
+def apply_planner_result(state: GraphState, chain_input: dict, plan: dict) -> GraphState:
+    """Write plan into state and log it."""
+    state["plan"] = plan
+    state["step_log"].append({
+        "node": "planner",
+        "input": chain_input,
+        "output": plan,
+        "success": True
+    })
+    return state
+
+
+def apply_planner_error(state: GraphState, e: Exception) -> GraphState:
+    """Fallback plan on error."""
+    state["plan"] = {
+        "sources": ["private_rag"],
+        "retrieval_fields": ["title", "brand", "price", "rating"],
+        "comparison_criteria": ["price", "rating"],
+        "filters": {}
+    }
+    state["step_log"].append({
+        "node": "planner",
+        "error": str(e),
+        "success": False
+    })
+    return state
+
+
+def apply_rule_planner(state: GraphState) -> GraphState:
+    """Rule-based plan when the latency budget can't fit the LLM planner."""
+    chain_input = planner_input(state)
+    plan = rule_plan(state["query"], state["task"], state["constraints"])
+    return mark_degraded(apply_planner_result(state, chain_input, plan), "rule_planner")
+
+
+def apply_rag_docs(state: GraphState, query: str, filters: dict, docs: List[dict]) -> GraphState:
+    """Write private RAG results into state and log them."""
+    state["retrieved_docs"] = docs
+    state["step_log"].append({
+        "node": "rag_retriever",
+        "input": {"query": query, "filters": filters},
+        "output": {
+            "num_docs": len(docs),
+            "top_results": [
+                {"title": d["title"], "price": d["price"]} 
+                for d in docs[:3]
+            ]
+        },
+        "success": True
+    })
+    return state
+
+
+def apply_web_docs(state: GraphState, query: str, filters: dict, docs: List[dict]) -> GraphState:
+    """Write web results into state and log them."""
+    state["retrieved_docs"] = docs
+    state["step_log"].append({
+        "node": "web_retriever",
+        "input": {"query": query, "filters": filters},
+        "output": {
+            "num_docs": len(docs),
+            "source": "web",
+            "top_results": [
+                {"title": d["title"], "price": d["price"]} 
+                for d in docs[:3]
+            ]
+        },
+        "success": True
+    })
+    return state
+
+
+def apply_hybrid_docs(state: GraphState, query: str, filters: dict, results: dict, dropped: dict, latency_ms: dict) -> GraphState:
+    """Merge per-source results into state and log them."""
+    rag_docs = results.get("rag", [])
+    web_docs = results.get("web", [])
+    
+    all_docs = rag_docs + web_docs
+    state["retrieved_docs"] = all_docs
+    
+    state["step_log"].append({
+        "node": "hybrid_retriever",
+        "input": {"query": query, "filters": filters},
+        "output": {
+            "num_docs": len(all_docs),
+            "rag_docs": len(rag_docs),
+            "web_docs": len(web_docs),
+            "dropped_sources": dropped,
+            "latency_ms": latency_ms,
+            "top_results": [
+                {"title": d["title"], "price": d["price"], "source": d["source"]} 
+                for d in all_docs[:5]
+            ]
+        },
+        "success": True
+    })
+    return state
+
+
+def apply_retriever_error(state: GraphState, node: str, label: str, e: Exception) -> GraphState:
+    """Empty results on retriever error."""
+    logger.error(f"{label} error: {e}", exc_info=True)
+    state["retrieved_docs"] = []
+    state["step_log"].append({
+        "node": node,
+        "error": str(e),
+        "success": False
+    })
+    return state
+
+
+def apply_no_docs_answer(state: GraphState) -> GraphState:
+    """Answer when retrieval found nothing."""
+    state["answer"] = "I couldn't find any products matching your criteria. Try adjusting your search."
+    state["citations"] = []
+    state["step_log"].append({
+        "node": "answerer",
+        "output": {"answer": state["answer"]},
+        "success": True
+    })
+    return state
+
+
+def apply_answer(state: GraphState, result: dict, mode: str = "llm", start: float = None) -> GraphState:
+    """Write answer and citations into state and log them with the answer mode and latency."""
+    state["answer"] = result["answer"]
+    state["citations"] = result["citations"]
+    
+    output = {
+        "answer": result["answer"][:100] + "...",
+        "citations": result["citations"],
+        "mode": mode
+    }
+    if start is not None:
+        output["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record_answer_latency(mode, output["latency_ms"])
+    if mode == "llm" and state.get("answer_context"):
+        output["prompt_tokens"] = state["answer_context"]["prompt_tokens"]
+        output["context_tokens"] = state["answer_context"]["context_tokens"]
+        output["summarized_docs"] = state["answer_context"]["summarized"]
+    
+    state["step_log"].append({
+        "node": "answerer",
+        "input": {
             "query": state["query"],
-            "task": state["task"],
-            "constraints": state["constraints"]
-        }
-        
-        # Invoke chain
-        plan = planner_chain.invoke(chain_input)
-        
-        # Update state
-        state["plan"] = plan
-        
-        # Log
-        state["step_log"].append({
-            "node": "planner",
-            "input": chain_input,
-            "output": plan,
-            "success": True
-        })
-        
-    except Exception as e:
-        # Fallback
-        state["plan"] = {
-            "sources": ["private_rag"],
-            "retrieval_fields": ["title", "brand", "price", "rating"],
-            "comparison_criteria": ["price", "rating"],
-            "filters": {}
-        }
-        state["step_log"].append({
-            "node": "planner",
-            "error": str(e),
-            "success": False
-        })
+            "num_docs": len(state["retrieved_docs"])
+        },
+        "output": output,
+        "success": True
+    })
+    return state
+
+
+def answer_criteria(state: GraphState) -> list:
+    return (state.get("plan") or {}).get("comparison_criteria", [])
+
+
+def apply_template_answer(state: GraphState) -> GraphState:
+    """Deterministic answer for tasks that don't need the LLM (see TEMPLATE_TASKS)."""
+    start = time.perf_counter()
+    result = render_answer(state.get("task"), state["retrieved_docs"], answer_criteria(state))
+    return apply_answer(state, result, "template", start)
+
+
+def apply_templated_answer(state: GraphState) -> GraphState:
+    """Answer from a template when no useful generation fits the latency budget."""
+    return mark_degraded(apply_template_answer(state), "template_answer")
+
+
+def apply_capped_answer(state: GraphState, result: dict, max_new_tokens: int = None, start: float = None) -> GraphState:
+    """apply_answer for the LLM path, noting the generation cap if the budget imposed one."""
+    state = apply_answer(state, result, "llm", start)
+    if max_new_tokens is not None:
+        mark_degraded(state, f"max_new_tokens={max_new_tokens}")
+    return state
+
+
+def apply_answerer_error(state: GraphState, e: Exception) -> GraphState:
+    """Fallback summary answer on error."""
+    logger.error(f"Answerer error: {e}", exc_info=True)
     
+    docs = state.get("retrieved_docs", [])
+    if docs:
+        state["answer"] = f"Found {len(docs)} products. Top result: {docs[0]['title']} at ${docs[0]['price']:.2f}"
+        state["citations"] = ["DOC 1"]
+    else:
+        state["answer"] = "No products found."
+        state["citations"] = []
+    
+    state["step_log"].append({
+        "node": "answerer",
+        "error": str(e),
+        "success": False
+    })
     return state
 
+
+# ============================================================================
+# Nodes
+# ============================================================================
+
+def router_node(state: GraphState) -> GraphState:
+    """Extract task, constraints, and safety flags using LangChain + HuggingFace."""
+    # Entry node of the hybrid graph: is_tight stamps the deadline before any work
+    if is_tight(state, "router"):
+        return apply_rule_router(state)
+    try:
+        result = get_router_chain().invoke(state["query"])
+        return apply_router_result(state, result)
+    except Exception as e:
+        return apply_router_error(state, e)
+
+
+def planner_node(state: GraphState) -> GraphState:
+    """Create retrieval plan using LLM."""
+    if is_tight(state, "planner"):
+        return apply_rule_planner(state)
+    try:
+        chain_input = planner_input(state)
+        plan = get_planner_chain().invoke(chain_input)
+        return apply_planner_result(state, chain_input, plan)
+    except Exception as e:
+        return apply_planner_error(state, e)
+
+
 def rag_retriever_node(state: GraphState) -> GraphState:
     """Retrieve products from private RAG using plan filters"""
-    
     try:
-        plan = state["plan"]
         query = state["query"]
-        
-        # Extract retrieval parameters from plan
-        filters = plan.get("filters", {})
+        filters = state["plan"].get("filters", {})
         
         logger.info(f"Retrieving from private database with filters: {filters}")
         
-        # Retrieve documents
         docs = retrieve_products(query=query, filters=filters, k=5)
-        # Update state
-        state["retrieved_docs"] = docs
-        
-        # Log
-        state["step_log"].append({
-            "node": "rag_retriever",
-            "input": {"query": query, "filters": filters},
-            "output": {
-                "num_docs": len(docs),
-                "top_results": [
-                    {"title": d["title"], "price": d["price"]} 
-                    for d in docs[:3]
-                ]
-            },
-            "success": True
-        })
-        
+        return apply_rag_docs(state, query, filters, docs)
     except Exception as e:
-        logger.error(f"RAG Retriever error: {e}", exc_info=True)
-        state["retrieved_docs"] = []
-        state["step_log"].append({
-            "node": "retriever",
-            "error": str(e),
-            "success": False
-        })
-    
-    return state
+        return apply_retriever_error(state, "retriever", "RAG Retriever", e)
 
 
 def web_retriever_node(state: GraphState) -> GraphState:
     """V2: Web-only retriever"""
     try:
-        plan = state["plan"]
         query = state["query"]
-        filters = plan.get("filters", {})
+        filters = state["plan"].get("filters", {})
         
         logger.info(f"[Web Node] Retrieving from web search")
         
         docs = retrieve_from_web(query, filters, k=5)
-        state["retrieved_docs"] = docs
-        
-        state["step_log"].append({
-            "node": "web_retriever",
-            "input": {"query": query, "filters": filters},
-            "output": {
-                "num_docs": len(docs),
-                "source": "web",
-                "top_results": [
-                    {"title": d["title"], "price": d["price"]} 
-                    for d in docs[:3]
-                ]
-            },
-            "success": True
-        })
-        
+        return apply_web_docs(state, query, filters, docs)
     except Exception as e:
-        logger.error(f"Web Retriever error: {e}", exc_info=True)
-        state["retrieved_docs"] = []
-        state["step_log"].append({
-            "node": "web_retriever",
-            "error": str(e),
-            "success": False
-        })
+        return apply_retriever_error(state, "web_retriever", "Web Retriever", e)
+
+
+def _run_sources_concurrently(sources: Dict[str, Callable[[], List[dict]]], timeouts: Dict[str, float]):
+    """
+    Run retrieval sources in parallel, each with its own timeout
     
-    return state
+    Returns:
+        (docs per source that finished in time, {dropped source: reason}, latency ms per source)
+    """
+    start = time.perf_counter()
+    futures = {name: source_executor(name).submit(fn) for name, fn in sources.items()}
+    finished_at = {}
+    for name, future in futures.items():
+        future.add_done_callback(lambda f, name=name: finished_at.setdefault(name, time.perf_counter()))
+    
+    results, dropped, latency_ms = {}, {}, {}
+    for name, future in futures.items():
+        remaining = timeouts.get(name, DEFAULT_SOURCE_TIMEOUT_S) - (time.perf_counter() - start)
+        try:
+            results[name] = future.result(timeout=max(0.0, remaining))
+        except FuturesTimeoutError:
+            future.cancel()  # no-op if already running; the result is simply ignored
+            dropped[name] = "timeout"
+        except Exception as e:
+            logger.error(f"[Hybrid Node] {name} source failed: {e}", exc_info=True)
+            dropped[name] = f"error: {e}"
+        latency_ms[name] = round((finished_at.get(name, time.perf_counter()) - start) * 1000, 1)
+    
+    for name, reason in dropped.items():
+        logger.warning(f"[Hybrid Node] Dropped {name} source ({reason}) after {latency_ms[name]:.0f}ms")
+    
+    return results, dropped, latency_ms
 
 
 def hybrid_retriever_node(state: GraphState) -> GraphState:
-    """V2: Hybrid retriever (RAG + Web)"""
+    """V2: Hybrid retriever (RAG + Web), both sources fetched concurrently"""
     try:
-        plan = state["plan"]
         query = state["query"]
-        filters = plan.get("filters", {})
+        filters = state["plan"].get("filters", {})
         
         logger.info(f"[Hybrid Node] Retrieving from both RAG and Web")
         
-        rag_docs = retrieve_products(query, filters, k=3)
-        web_docs = retrieve_from_web(query, filters, k=2)
-        
-        all_docs = rag_docs + web_docs
-        state["retrieved_docs"] = all_docs
-        
-        state["step_log"].append({
-            "node": "hybrid_retriever",
-            "input": {"query": query, "filters": filters},
-            "output": {
-                "num_docs": len(all_docs),
-                "rag_docs": len(rag_docs),
-                "web_docs": len(web_docs),
-                "top_results": [
-                    {"title": d["title"], "price": d["price"], "source": d["source"]} 
-                    for d in all_docs[:5]
-                ]
-            },
-            "success": True
-        })
+        sources = {"rag": lambda: retrieve_products(query, filters, k=3)}
+        skip_web = is_tight(state, "web")
+        if not skip_web:
+            sources["web"] = lambda: retrieve_from_web(query, filters, k=2)
         
+        results, dropped, latency_ms = _run_sources_concurrently(sources, SOURCE_TIMEOUTS_S)
+        state = apply_hybrid_docs(state, query, filters, results, dropped, latency_ms)
+        return mark_degraded(state, "skip_web") if skip_web else state
     except Exception as e:
-        logger.error(f"Hybrid Retriever error: {e}", exc_info=True)
-        state["retrieved_docs"] = []
-        state["step_log"].append({
-            "node": "hybrid_retriever",
-            "error": str(e),
-            "success": False
-        })
-    
-    return state
+        return apply_retriever_error(state, "hybrid_retriever", "Hybrid Retriever", e)
 
 
 def answerer_node(state: GraphState) -> GraphState:
     """Synthesize final answer from retrieved documents"""
-    
     try:
-        # Check if we have docs
         if not state.get("retrieved_docs"):
-            state["answer"] = "I couldn't find any products matching your criteria. Try adjusting your search."
-            state["citations"] = []
-            state["step_log"].append({
-                "node": "answerer",
-                "output": {"answer": state["answer"]},
-                "success": True
-            })
-            return state
-        
-        # Use the chain
-        answerer_chain = get_answerer_chain()
+            return apply_no_docs_answer(state)
         
-        # Invoke chain
-        result = answerer_chain.invoke(state)
+        if select_answer_mode(state.get("task"), state["retrieved_docs"]) == "template":
+            return apply_template_answer(state)
         
-        # Update state
-        state["answer"] = result["answer"]
-        state["citations"] = result["citations"]
+        max_new_tokens = answer_token_cap(state)
+        if max_new_tokens is not None and max_new_tokens < MIN_NEW_TOKENS:
+            return apply_templated_answer(state)
         
-        # Log
-        state["step_log"].append({
-            "node": "answerer",
-            "input": {
-                "query": state["query"],
-                "num_docs": len(state["retrieved_docs"])
-            },
-            "output": {
-                "answer": result["answer"][:100] + "...",
-                "citations": result["citations"]
-            },
-            "success": True
-        })
-        
-    except Exception as e:
-        logger.error(f"Answerer error: {e}", exc_info=True)
-        
-        # Fallback: simple summary
-        docs = state.get("retrieved_docs", [])
-        if docs:
-            state["answer"] = f"Found {len(docs)} products. Top result: {docs[0]['title']} at ${docs[0]['price']:.2f}"
-            state["citations"] = ["DOC 1"]
+        start = time.perf_counter()
+        if state.get("stream_answer"):
+            # Deltas go to graph.stream(..., stream_mode="custom") consumers (voice TTS)
+            result = stream_answer(state, get_stream_writer(), max_new_tokens)
         else:
-            state["answer"] = "No products found."
-            state["citations"] = []
-        
-        state["step_log"].append({
-            "node": "answerer",
-            "error": str(e),
-            "success": False
-        })
-    
-    return state
+            result = get_answerer_chain(max_new_tokens).invoke(state)
+        return apply_capped_answer(state, result, max_new_tokens, start)
+    except Exception as e:
+        return apply_answerer_error(state, e)
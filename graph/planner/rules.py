@@ -0,0 +1,58 @@
+# graph/planner/rules.py
+"""
+Rule-based planner: the decision rules from PLANNER_TEMPLATE applied directly.
+Used instead of the LLM when the latency budget is too tight.
+"""
+
+import re
+
+WEB_KEYWORDS = ["now", "current", "latest", "today", "available", "in stock"]
+
+RETRIEVAL_FIELDS = {
+    "product_search": ["title", "brand", "price", "rating", "material"],
+    "comparison": ["title", "brand", "price", "rating", "features", "ingredients", "review_count"],
+    "recommendation": ["title", "brand", "price", "rating", "features", "review_count"],
+    "availability_check": ["title", "brand", "price", "in_stock"],
+}
+
+# Router constraint -> database filter
+FILTER_FIELDS = {
+    "min_price": "min_price",
+    "max_price": "max_price",
+    "material": "material",
+    "brand": "brand",
+    "product": "category",
+}
+
+
+def rule_plan(query: str, task: str, constraints: dict) -> dict:
+    """Plan dict in the same shape as parse_planner_output"""
+    query_lc = query.lower()
+
+    sources = ["private_rag"]
+    if task == "availability_check" or any(re.search(rf"\b{k}\b", query_lc) for k in WEB_KEYWORDS):
+        sources.append("web_search")
+
+    if task == "availability_check":
+        criteria = []
+    elif task == "comparison":
+        criteria = ["price", "rating", "features"]
+    elif re.search(r"\b(best|top|recommend)\b", query_lc):
+        criteria = ["rating", "review_count"]
+    elif re.search(r"\b(cheap|affordable)\b", query_lc):
+        criteria = ["price", "value_for_money"]
+    else:
+        criteria = ["price", "rating"]
+
+    filters = {
+        FILTER_FIELDS[key]: value
+        for key, value in constraints.items()
+        if key in FILTER_FIELDS and value not in (None, [], "")
+    }
+
+    return {
+        "sources": sources,
+        "retrieval_fields": RETRIEVAL_FIELDS.get(task, RETRIEVAL_FIELDS["product_search"]),
+        "comparison_criteria": criteria,
+        "filters": filters
+    }
@@ -4,15 +4,27 @@ Unified retriever interface
 Maintains backward compatibility with v1
 """
 
-from graph.retriever.rag1 import retrieve_from_rag, get_vector_store,rag_with_auto_filter
-from graph.retriever.web import retrieve_from_web
+from graph.retriever.rag1 import retrieve_from_rag, get_vector_store,rag_with_auto_filter, extract_filters_from_text, aextract_filters_from_text
+from graph.retriever.web import retrieve_from_web, aretrieve_from_web
+from graph.retriever.web_providers import get_provider
+from graph.retriever.web_cache import get_web_cache_stats
+from graph.retriever.mcp_pool import get_mcp_stats
+from graph.retriever.web_hedge import get_hedge_stats
+from graph.retriever.breaker import get_breaker_states
+from graph.retriever.backends import get_backend
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Re-export for backward compatibility
-__all__ = ['retrieve_products', 'retrieve_from_rag', 'retrieve_from_web', 'get_vector_store', 'rag_with_auto_filter']
+__all__ = ['retrieve_products', 'retrieve_from_rag', 'retrieve_from_web', 'get_vector_store', 'rag_with_auto_filter', 'get_backend',
+           'aretrieve_products', 'aretrieve_from_web', 'retrieve_products_batch', 'get_provider', 'get_web_cache_stats', 'get_mcp_stats', 'get_hedge_stats', 'get_breaker_states']
+
+# Concurrent Groq filter requests in retrieve_products_batch
+FILTER_WORKERS = 8
 
 
 def retrieve_products(
@@ -22,6 +34,7 @@ def retrieve_products(
 ) -> List[Dict]:
     """
     Unified retriever (v2) — automatically extracts filters via Groq API.
+    Searches the vector backend selected by VECTOR_BACKEND (faiss | chroma).
     Args:
         query: Search query text
         filters: Ignored (auto-handled by LLM)
@@ -29,4 +42,35 @@ def retrieve_products(
     Returns:
         List of product dicts
     """
-    return rag_with_auto_filter(query, k)
+    auto_filters = extract_filters_from_text(query)
+    return get_backend().search(query, auto_filters, k)
+
+
+def retrieve_products_batch(
+    queries: List[str],
+    k: int = 5
+) -> List[List[Dict]]:
+    """
+    Multi-query retrieve_products: Groq filters are extracted concurrently,
+    then every query is encoded and searched in one backend batch.
+    """
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(FILTER_WORKERS, len(queries))) as pool:
+        filters_list = list(pool.map(extract_filters_from_text, queries))
+    return get_backend().search_batch(queries, filters_list, k)
+
+
+
+async def aretrieve_products(
+    query: str,
+    filters: Dict,
+    k: int = 5
+) -> List[Dict]:
+    """
+    Async retrieve_products: the Groq filter call is awaited on a pooled
+    HTTP client, the encode + vector search runs in the default executor.
+    """
+    auto_filters = await aextract_filters_from_text(query)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_backend().search, query, auto_filters, k)
@@ -0,0 +1,136 @@
+# graph/retriever/backends.py
+"""
+Pluggable vector backends
+Both retrieval stacks behind one interface, selected by VECTOR_BACKEND
+"""
+
+from typing import List, Dict, Optional, Protocol
+import numpy as np
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "faiss"
+
+
+class VectorBackend(Protocol):
+    """Interface every vector backend implements"""
+
+    name: str
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        """Top-k product dicts for one query"""
+        ...
+
+    def search_batch(self, queries: List[str], filters_list: List[Dict], k: int = 5) -> List[List[Dict]]:
+        """Top-k product dicts for each query, encoded in one batch"""
+        ...
+
+    def upsert(self, products: List[Dict]) -> int:
+        """Insert or replace products given in the standard dict format"""
+        ...
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of arbitrary texts with the backend's model (no search)"""
+        ...
+
+    def vectors(self, doc_ids: List[str]) -> Dict[str, np.ndarray]:
+        """Stored embeddings of indexed products by doc_id (unknown ids are left out)"""
+        ...
+
+    def stats(self) -> Dict:
+        """Backend name, model, vector count and dimension"""
+        ...
+
+
+class FaissBackend:
+    """FAISS + stella (graph/retriever/rag1.py)"""
+
+    name = "faiss"
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        from graph.retriever.rag1 import retrieve_from_rag
+        return retrieve_from_rag(query, filters, k)
+
+    def search_batch(self, queries: List[str], filters_list: List[Dict], k: int = 5) -> List[List[Dict]]:
+        from graph.retriever.rag1 import retrieve_from_rag_batch
+        return retrieve_from_rag_batch(queries, filters_list, k)
+
+    def upsert(self, products: List[Dict]) -> int:
+        from graph.retriever.rag1 import upsert_products
+        return upsert_products(products)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        from graph.retriever.rag1 import encode_texts
+        return encode_texts(texts)
+
+    def vectors(self, doc_ids: List[str]) -> Dict[str, np.ndarray]:
+        from graph.retriever.rag1 import get_doc_vectors
+        return get_doc_vectors(doc_ids)
+
+    def stats(self) -> Dict:
+        from graph.retriever.rag1 import get_stats
+        return get_stats()
+
+
+class ChromaBackend:
+    """Chroma + all-MiniLM-L6-v2 (graph/retriever/rag.py)"""
+
+    name = "chroma"
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        from graph.retriever.rag import retrieve_from_rag
+        return retrieve_from_rag(query, filters, k)
+
+    def search_batch(self, queries: List[str], filters_list: List[Dict], k: int = 5) -> List[List[Dict]]:
+        from graph.retriever.rag import retrieve_from_rag_batch
+        return retrieve_from_rag_batch(queries, filters_list, k)
+
+    def upsert(self, products: List[Dict]) -> int:
+        from graph.retriever.rag import upsert_products
+        return upsert_products(products)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        from graph.retriever.rag import encode_texts
+        return encode_texts(texts)
+
+    def vectors(self, doc_ids: List[str]) -> Dict[str, np.ndarray]:
+        from graph.retriever.rag import get_doc_vectors
+        return get_doc_vectors(doc_ids)
+
+    def stats(self) -> Dict:
+        from graph.retriever.rag import get_stats
+        return get_stats()
+
+
+# Backend registry
+BACKENDS = {
+    "faiss": FaissBackend,
+    "chroma": ChromaBackend,
+}
+
+_backends: Dict[str, VectorBackend] = {}
+
+
+def get_backend(name: Optional[str] = None) -> VectorBackend:
+    """
+    Get a vector backend (one instance per name)
+
+    Args:
+        name: "faiss" or "chroma"; defaults to the VECTOR_BACKEND env var
+
+    Returns:
+        VectorBackend instance
+    """
+    name = (name or os.getenv("VECTOR_BACKEND", DEFAULT_BACKEND)).lower().strip()
+
+    if name not in BACKENDS:
+        logger.warning(f"Unknown vector backend '{name}', defaulting to {DEFAULT_BACKEND}")
+        name = DEFAULT_BACKEND
+
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+        logger.info(f"[Retriever] Using {name} vector backend")
+
+    return _backends[name]
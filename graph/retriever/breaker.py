@@ -0,0 +1,166 @@
+# graph/retriever/breaker.py
+"""
+Circuit breakers for remote dependencies (Groq filter extraction, web providers)
+Each breaker watches a rolling window of calls and opens when too many fail
+or are too slow; while open, calls are rejected immediately and the caller
+uses its fallback (empty filters, RAG-only retrieval). After a cool-down a
+few probe calls are let through (half-open): success closes the breaker,
+failure opens it again.
+
+    with get_breaker("groq").guard():
+        ...remote call...
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+import threading
+import asyncio
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Defaults for every breaker; per-dependency slow-call thresholds below
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_RATE = float(os.getenv("BREAKER_SLOW_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+# A successful call slower than this counts as slow (ms); "web" covers every "web:<provider>" breaker
+SLOW_CALL_MS = {
+    "groq": float(os.getenv("BREAKER_GROQ_SLOW_MS", "2500")),
+    "web": float(os.getenv("BREAKER_WEB_SLOW_MS", "3000")),
+}
+DEFAULT_SLOW_CALL_MS = 3000.0
+
+
+class CircuitOpenError(Exception):
+    """Raised by guard() instead of calling an unhealthy dependency"""
+
+
+class CircuitBreaker:
+    """Failure-rate and slow-call-rate breaker over the last BREAKER_WINDOW calls"""
+
+    def __init__(self, name: str, slow_call_ms: float):
+        self.name = name
+        self.slow_call_ms = slow_call_ms
+        self.state = CLOSED
+        self.calls = deque(maxlen=BREAKER_WINDOW)  # (failed, slow)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.counts = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def _rates(self):
+        n = len(self.calls)
+        if not n:
+            return 0.0, 0.0
+        return sum(f for f, _ in self.calls) / n, sum(s for _, s in self.calls) / n
+
+    def _open(self, reason: str):
+        self.state, self.opened_at, self.probes = OPEN, time.monotonic(), 0
+        self.counts["opened"] += 1
+        logger.warning(f"[Breaker] {self.name} opened ({reason}), rejecting calls for {BREAKER_OPEN_SECONDS:.0f}s")
+
+    def allow(self) -> bool:
+        """True if a call may go through now (reserves a probe slot when half-open)"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_OPEN_SECONDS:
+                self.state, self.probes = HALF_OPEN, 0
+                logger.info(f"[Breaker] {self.name} half-open, probing")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.probes < BREAKER_HALF_OPEN_PROBES:
+                self.probes += 1
+                return True
+            self.counts["rejected"] += 1
+            return False
+
+    def record(self, failed: bool, latency_ms: float):
+        slow = not failed and latency_ms > self.slow_call_ms
+        with self._lock:
+            self.counts["calls"] += 1
+            self.counts["failures"] += failed
+            self.counts["slow"] += slow
+
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open("probe failed" if failed else f"probe took {latency_ms:.0f}ms")
+                else:
+                    self.state = CLOSED
+                    self.calls.clear()
+                    logger.info(f"[Breaker] {self.name} closed")
+                return
+
+            self.calls.append((failed, slow))
+            if self.state == CLOSED and len(self.calls) >= BREAKER_MIN_CALLS:
+                failure_rate, slow_rate = self._rates()
+                if failure_rate >= BREAKER_FAILURE_RATE:
+                    self._open(f"failure rate {failure_rate:.0%}")
+                elif slow_rate >= BREAKER_SLOW_RATE:
+                    self._open(f"slow-call rate {slow_rate:.0%} over {self.slow_call_ms:.0f}ms")
+
+    def _release_probe(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+
+    @contextmanager
+    def guard(self):
+        """
+        Wrap one remote call: raises CircuitOpenError if the breaker rejects
+        it, otherwise records the outcome and latency (exceptions propagate)
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+        start = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Cancelled by the caller (e.g. a hedge loser): says nothing about the dependency
+            self._release_probe()
+            raise
+        except Exception:
+            self.record(True, (time.perf_counter() - start) * 1000)
+            raise
+        self.record(False, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            failure_rate, slow_rate = self._rates()
+            return {
+                "state": self.state,
+                "failure_rate": round(failure_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+                "window": len(self.calls),
+                "slow_call_ms": self.slow_call_ms,
+                "open_for_s": round(max(0.0, BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at)), 1)
+                if self.state == OPEN else 0.0,
+                **self.counts,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """One breaker per dependency name, e.g. "groq" or "web:serper" """
+    with _breakers_lock:
+        if name not in _breakers:
+            slow_call_ms = SLOW_CALL_MS.get(name.split(":")[0], DEFAULT_SLOW_CALL_MS)
+            _breakers[name] = CircuitBreaker(name, slow_call_ms)
+        return _breakers[name]
+
+
+def get_breaker_states() -> Dict:
+    """State, rolling rates and counters of every breaker, for monitoring"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
@@ -0,0 +1,49 @@
+# graph/retriever/filters.py
+"""
+Plan filters applied to already-retrieved product dicts
+(speculative candidates, cached session candidates, web results)
+"""
+
+from typing import List, Dict
+
+
+def matches_filters(doc: Dict, filters: Dict) -> bool:
+    """Check if a standard product dict matches the plan filters"""
+
+    # Category filter
+    if filters.get("category"):
+        doc_category = str(doc.get("category") or "").lower()
+        if str(filters["category"]).lower() not in doc_category:
+            return False
+
+    # Price filtering
+    price = float(doc.get("price") or 0)
+
+    if filters.get("min_price") is not None and price < float(filters["min_price"]):
+        return False
+
+    if filters.get("max_price") is not None and price > float(filters["max_price"]):
+        return False
+
+    # Brand filtering
+    if filters.get("brand"):
+        brands = filters["brand"]
+        if isinstance(brands, str):
+            brands = [brands]
+        doc_brand = str(doc.get("brand") or "").lower()
+        if not any(str(b).lower() in doc_brand for b in brands):
+            return False
+
+    # Material filtering
+    if filters.get("material"):
+        doc_material = str(doc.get("material") or "").lower()
+        if str(filters["material"]).lower() not in doc_material:
+            return False
+
+    return True
+
+
+def filter_docs(docs: List[Dict], filters: Dict, k: int = None) -> List[Dict]:
+    """Keep docs matching filters, in their original rank order, up to k"""
+    kept = [d for d in docs if matches_filters(d, filters)]
+    return kept[:k] if k is not None else kept
@@ -0,0 +1,326 @@
+# graph/retriever/mcp_pool.py
+"""
+Pooled, long-lived MCP client sessions for web search tools
+A fixed number of warm sessions to one MCP server (stdio subprocess or
+streamable HTTP), shared by all requests. Tool calls are multiplexed over
+the sessions (least in-flight first), sessions are pinged periodically, and
+a session that fails a call or a ping is reconnected with backoff.
+
+The pool lives on the web client's background loop
+(graph/retriever/web_client.py), so worker threads and the async graph share it.
+"""
+
+from graph.retriever.web_client import submit
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Optional
+import concurrent.futures
+import contextlib
+import asyncio
+import atexit
+import shlex
+import json
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Server: MCP_SERVER_URL (streamable HTTP) wins over MCP_SERVER_COMMAND (stdio subprocess).
+# No default, so a missing setting can't silently serve the stub's fake products
+MCP_SERVER_COMMAND = os.getenv("MCP_SERVER_COMMAND", "")
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "")
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_MAX_INFLIGHT = int(os.getenv("MCP_MAX_INFLIGHT", "16"))  # concurrent calls per session
+
+# Seconds
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "10"))
+MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "5"))
+MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "15"))
+MCP_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", "2"))
+MCP_MAX_BACKOFF = 10.0
+# Slack on top of connect + call timeouts before a blocked caller gives up
+MCP_RESULT_MARGIN = 1.0
+
+
+def check_server_configured(command: str = MCP_SERVER_COMMAND, url: str = MCP_SERVER_URL):
+    if not (url or command):
+        raise ValueError("❌ MCP server not set. Set MCP_SERVER_URL or MCP_SERVER_COMMAND "
+                         "(e.g. MCP_SERVER_COMMAND='python scripts/mcp_stub_server.py' for the local stub).")
+
+
+@contextlib.asynccontextmanager
+async def open_transport(command: str = MCP_SERVER_COMMAND, url: str = MCP_SERVER_URL):
+    """(read, write) streams to the configured MCP server"""
+    check_server_configured(command, url)
+    if url:
+        from mcp.client.streamable_http import streamablehttp_client
+        async with streamablehttp_client(url) as (read, write, _):
+            yield read, write
+    else:
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        argv = shlex.split(command)
+        params = StdioServerParameters(command=argv[0], args=argv[1:], env=dict(os.environ))
+        async with stdio_client(params) as (read, write):
+            yield read, write
+
+
+def tool_result_json(result) -> Any:
+    """Structured content of a CallToolResult, else its first text block parsed as JSON"""
+    if result.isError:
+        text = " ".join(getattr(c, "text", "") for c in result.content)
+        raise RuntimeError(f"MCP tool error: {text or 'unknown'}")
+    if getattr(result, "structuredContent", None):
+        return result.structuredContent
+    for block in result.content:
+        if getattr(block, "text", None):
+            return json.loads(block.text)
+    return {}
+
+
+class _PooledSession:
+    """One ClientSession kept open by a holder task (anyio contexts must exit in the task that entered them)"""
+
+    def __init__(self, index: int, command: str = MCP_SERVER_COMMAND, url: str = MCP_SERVER_URL):
+        self.index = index
+        self.command, self.url = command, url
+        self.session = None
+        self.inflight = 0
+        self.connects = 0
+        self.reconnecting = False
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and not self.reconnecting
+
+    async def connect(self):
+        from mcp import ClientSession
+
+        ready, self._stop = asyncio.Event(), asyncio.Event()
+
+        async def hold():
+            try:
+                async with open_transport(self.command, self.url) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        self.session = session
+                        self.connects += 1
+                        ready.set()
+                        await self._stop.wait()
+            except Exception as e:
+                logger.warning(f"[MCP] Session {self.index} closed: {e!r}")
+            finally:
+                self.session = None
+                ready.set()
+
+        self._task = asyncio.create_task(hold())
+        try:
+            await asyncio.wait_for(ready.wait(), MCP_CONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Don't leave a half-open transport (and a stdio subprocess) behind
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            raise
+        if self.session is None:
+            raise ConnectionError(f"MCP session {self.index} failed to initialize")
+
+    async def close(self):
+        if self._stop is not None:
+            self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, MCP_PING_TIMEOUT)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+        self.session = None
+
+
+class MCPSessionPool:
+    """Warm MCP sessions with multiplexed tool calls, health checks and reconnection"""
+
+    def __init__(self, size: int = MCP_POOL_SIZE, max_inflight: int = MCP_MAX_INFLIGHT,
+                 command: str = MCP_SERVER_COMMAND, url: str = MCP_SERVER_URL):
+        check_server_configured(command, url)
+        self.sessions = [_PooledSession(i, command, url) for i in range(size)]
+        self.max_inflight = max_inflight
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started: Optional[asyncio.Task] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stats = Counter()
+
+    async def start(self):
+        """Connect every session (once; concurrent callers wait for the same start)"""
+        if self._started is None:
+            self._started = asyncio.ensure_future(self._start())
+        await asyncio.shield(self._started)
+
+    async def _start(self):
+        self._slots = asyncio.Semaphore(len(self.sessions) * self.max_inflight)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(s.connect() for s in self.sessions), return_exceptions=True)
+        for session, result in zip(self.sessions, results):
+            if isinstance(result, Exception):
+                self._schedule_reconnect(session)
+        self._health_task = asyncio.create_task(self._health_loop())
+        logger.info(f"[MCP] Pool warm: {sum(s.healthy for s in self.sessions)}/{len(self.sessions)} sessions "
+                    f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _pick(self) -> Optional[_PooledSession]:
+        healthy = [s for s in self.sessions if s.healthy]
+        return min(healthy, key=lambda s: s.inflight) if healthy else None
+
+    async def _wait_for_healthy(self) -> _PooledSession:
+        deadline = time.monotonic() + MCP_CONNECT_TIMEOUT
+        while (session := self._pick()) is None:
+            if time.monotonic() > deadline:
+                raise ConnectionError("No healthy MCP session")
+            await asyncio.sleep(0.05)
+        return session
+
+    async def call_tool(self, name: str, arguments: Dict, timeout: float = MCP_CALL_TIMEOUT):
+        """
+        Call a tool on the least-loaded healthy session
+
+        A transport failure marks the session for reconnection and the call
+        is retried once on another session; timeouts and tool errors are raised.
+        """
+        await self.start()
+        async with self._slots:
+            for attempt in range(2):
+                session = await self._wait_for_healthy()
+                session.inflight += 1
+                try:
+                    result = await session.session.call_tool(
+                        name, arguments, read_timeout_seconds=timedelta(seconds=timeout)
+                    )
+                    self._stats["calls"] += 1
+                    return result
+                except Exception as e:
+                    if _is_timeout(e):
+                        self._stats["timeouts"] += 1
+                        raise
+                    self._stats["call_errors"] += 1
+                    logger.warning(f"[MCP] Call on session {session.index} failed: {e!r}")
+                    self._schedule_reconnect(session)
+                    if attempt:
+                        raise
+                finally:
+                    session.inflight -= 1
+
+    def _schedule_reconnect(self, session: _PooledSession):
+        """Take the session out of rotation now and reconnect it in the background"""
+        if session.reconnecting or self._closed:
+            return
+        session.reconnecting = True
+        self._stats["reconnects"] += 1
+        asyncio.create_task(self._reconnect(session))
+
+    async def _reconnect(self, session: _PooledSession):
+        """Replace a failed session, backing off between attempts"""
+        try:
+            await session.close()
+            backoff = 0.5
+            while not self._closed:
+                try:
+                    await session.connect()
+                    logger.info(f"[MCP] Session {session.index} reconnected")
+                    return
+                except Exception as e:
+                    logger.warning(f"[MCP] Reconnect of session {session.index} failed: {e!r}, retrying in {backoff:.1f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MCP_MAX_BACKOFF)
+        finally:
+            session.reconnecting = False
+
+    async def _health_loop(self):
+        """Ping idle sessions; a failed ping, or a session that closed on its own, triggers a reconnect"""
+        while not self._closed:
+            await asyncio.sleep(MCP_HEALTH_INTERVAL)
+            for session in self.sessions:
+                if session.session is None and not session.reconnecting:
+                    logger.warning(f"[MCP] Session {session.index} is closed, reconnecting")
+                    self._schedule_reconnect(session)
+                    continue
+                if not session.healthy or session.inflight:
+                    continue
+                try:
+                    await asyncio.wait_for(session.session.send_ping(), MCP_PING_TIMEOUT)
+                    self._stats["pings"] += 1
+                except Exception as e:
+                    self._stats["ping_failures"] += 1
+                    logger.warning(f"[MCP] Session {session.index} failed health check: {e!r}")
+                    self._schedule_reconnect(session)
+
+    async def close(self):
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.gather(*(s.close() for s in self.sessions), return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self.sessions),
+            "healthy": sum(s.healthy for s in self.sessions),
+            "inflight": [s.inflight for s in self.sessions],
+            "connects": sum(s.connects for s in self.sessions),
+            **{k: self._stats.get(k, 0) for k in ("calls", "call_errors", "timeouts", "reconnects", "pings", "ping_failures")},
+        }
+
+
+def _is_timeout(error: Exception) -> bool:
+    # ClientSession reports read timeouts as McpError with a "Timed out" message
+    return isinstance(error, asyncio.TimeoutError) or "timed out" in str(error).lower()
+
+
+_pool: Optional[MCPSessionPool] = None
+
+
+def get_mcp_pool() -> MCPSessionPool:
+    """Process-wide pool (sessions connect on the first call)"""
+    global _pool
+    if _pool is None:
+        _pool = MCPSessionPool()
+        atexit.register(close_mcp_pool)
+    return _pool
+
+
+def close_mcp_pool():
+    """Close all sessions (stops stdio server subprocesses)"""
+    global _pool
+    if _pool is not None:
+        try:
+            submit(_pool.close()).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"[MCP] Pool close failed: {e!r}")
+        _pool = None
+
+
+def _result_timeout(timeout: float) -> float:
+    """How long a caller waits: a (re)connect, the call itself and some slack"""
+    return MCP_CONNECT_TIMEOUT + timeout + MCP_RESULT_MARGIN
+
+
+def call_tool(name: str, arguments: Dict, timeout: float = MCP_CALL_TIMEOUT) -> Any:
+    """Blocking pooled tool call; returns the tool's JSON result"""
+    future = submit(get_mcp_pool().call_tool(name, arguments, timeout))
+    try:
+        return tool_result_json(future.result(timeout=_result_timeout(timeout)))
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+async def acall_tool(name: str, arguments: Dict, timeout: float = MCP_CALL_TIMEOUT) -> Any:
+    """call_tool for coroutines on any event loop (wait_for cancels the pool call on timeout)"""
+    future = asyncio.wrap_future(submit(get_mcp_pool().call_tool(name, arguments, timeout)))
+    return tool_result_json(await asyncio.wait_for(future, _result_timeout(timeout)))
+
+
+def get_mcp_stats() -> Dict:
+    """Pool health and call counters (empty before the first call)"""
+    return _pool.stats() if _pool is not None else {}
@@ -6,29 +6,99 @@ Extracted from original retriever/__init__.py
 
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
 _vector_store = None
 
+EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Metadata schema written by scripts/index_data.py
+# v1: raw "Selling Price" string only
+# v2: adds numeric "price" and lowercased "*_lc" filter fields
+METADATA_SCHEMA_VERSION = 2
+
+
 def get_vector_store(persist_directory: str = "./chroma_db"):
     """Get or create vector store (singleton)"""
     global _vector_store
     
     if _vector_store is None:
         embedder = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+            model_name=EMBED_MODEL
         )
         _vector_store = Chroma(
             persist_directory=persist_directory,
             embedding_function=embedder
         )
+        
+        if get_schema_version(_vector_store) < METADATA_SCHEMA_VERSION:
+            logger.warning(
+                f"[RAG] {persist_directory} uses metadata schema v{get_schema_version(_vector_store)}, "
+                f"falling back to Python filtering. Run 'python scripts/index_data.py --migrate' to upgrade."
+            )
     
     return _vector_store
 
 
+def get_schema_version(vector_store) -> int:
+    """Read the metadata schema version stored on the Chroma collection"""
+    collection_metadata = vector_store._collection.metadata or {}
+    return int(collection_metadata.get("schema_version", 1))
+
+
+def normalize_metadata(metadata: Dict) -> Dict:
+    """
+    Add the normalized filter fields to a product metadata dict
+    
+    Args:
+        metadata: Dict with "Selling Price", category, brand, material
+    
+    Returns:
+        Copy of metadata with numeric "price" and lowercased
+        "category_lc", "brand_lc", "material_lc"
+    """
+    normalized = dict(metadata)
+    normalized["price"] = _parse_price(metadata.get("Selling Price"))
+    for field in ("category", "brand", "material"):
+        normalized[f"{field}_lc"] = str(metadata.get(field) or "").strip().lower()
+    return normalized
+
+
+def build_where_clause(filters: Dict) -> Optional[Dict]:
+    """
+    Translate plan filters into a Chroma `where` expression
+    
+    Only prices are pushed down, as numeric range conditions. Category,
+    brand and material keep the substring semantics of `_matches_filters`
+    ("nike" matches "Nike Inc", "shampoo" matches "hair shampoo"), which
+    Chroma's exact `$eq`/`$in` can't express, so they are post-filtered.
+    
+    Returns:
+        Chroma where dict, or None if no filter can be pushed down
+    """
+    conditions = []
+    
+    if filters.get("min_price") is not None:
+        conditions.append({"price": {"$gte": float(filters["min_price"])}})
+    
+    if filters.get("max_price") is not None:
+        conditions.append({"price": {"$lte": float(filters["max_price"])}})
+    
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+# Filters checked in Python after the store's price filtering
+POST_FILTER_FIELDS = ("category", "brand", "material")
+
+
 def retrieve_from_rag(
     query: str,
     filters: Dict,
@@ -46,13 +116,147 @@ def retrieve_from_rag(
         List of product dicts with standard format
     """
     vector_store = get_vector_store()
+    where, post_filters, fetch_k = _search_params(vector_store, filters, k)
+    
+    embedding = vector_store.embeddings.embed_query(query)
+    results = _search_by_vector(vector_store, embedding, fetch_k, where)
+    
+    return _format_results(results, post_filters, k)
+
+
+def retrieve_from_rag_batch(
+    queries: List[str],
+    filters_list: List[Dict],
+    k: int = 5
+) -> List[List[Dict]]:
+    """
+    Retrieve products for many queries, embedding them in one batch
+    
+    Args:
+        queries: Search query texts
+        filters_list: One filter dict per query
+        k: Number of results per query
+    
+    Returns:
+        One list of product dicts per query
+    """
+    vector_store = get_vector_store()
+    embeddings = vector_store.embeddings.embed_documents(queries)
+    
+    batch_results = []
+    for embedding, filters in zip(embeddings, filters_list):
+        where, post_filters, fetch_k = _search_params(vector_store, filters, k)
+        results = _search_by_vector(vector_store, embedding, fetch_k, where)
+        batch_results.append(_format_results(results, post_filters, k))
+    
+    return batch_results
+
+
+def upsert_products(products: List[Dict]) -> int:
+    """
+    Insert or replace products in the Chroma collection
+    
+    Args:
+        products: Product dicts in the standard retriever format
+    
+    Returns:
+        Number of products written
+    """
+    vector_store = get_vector_store()
+    
+    metadatas = [
+        normalize_metadata({
+            "Uniq Id": p["doc_id"],
+            "Product Name": p.get("title", ""),
+            "Selling Price": f"${float(p.get('price', 0) or 0):.2f}",
+            "category": p.get("category", "") or "",
+            "brand": p.get("brand", "") or "",
+            "material": p.get("material", "") or "",
+            "summary": p.get("summary", "") or "",
+        })
+        for p in products
+    ]
+    
+    # Older indexes were written with random ids, so drop by product id first
+    ids = [str(p["doc_id"]) for p in products]
+    vector_store._collection.delete(where={"Uniq Id": {"$in": ids}})
+    
+    vector_store.add_texts(
+        texts=[p.get("content") or p.get("title", "") for p in products],
+        metadatas=metadatas,
+        ids=ids
+    )
+    
+    logger.info(f"[RAG] Upserted {len(products)} products")
+    return len(products)
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """MiniLM embeddings for arbitrary texts, same embedder as the collection"""
+    return np.asarray(get_vector_store().embeddings.embed_documents(texts), dtype="float32")
+
+
+def get_doc_vectors(doc_ids: List[str]) -> Dict[str, np.ndarray]:
+    """Stored embeddings by product id, read from the collection (no re-encoding)"""
+    if not doc_ids:
+        return {}
+    found = get_vector_store()._collection.get(
+        where={"Uniq Id": {"$in": [str(i) for i in doc_ids]}},
+        include=["embeddings", "metadatas"]
+    )
+    return {
+        str(metadata["Uniq Id"]): np.asarray(embedding, dtype="float32")
+        for metadata, embedding in zip(found["metadatas"], found["embeddings"])
+    }
+
+
+def get_stats() -> Dict:
+    """Size, model and schema information for the Chroma collection"""
+    vector_store = get_vector_store()
+    collection = vector_store._collection
+    
+    sample = collection.get(limit=1, include=["embeddings"])
+    embeddings = sample.get("embeddings")
     
-    # Get more results for post-filtering
-    results = vector_store.similarity_search_with_score(
-        query=query,
-        k=k * 3
+    return {
+        "backend": "chroma",
+        "model": EMBED_MODEL,
+        "num_vectors": collection.count(),
+        "dim": len(embeddings[0]) if embeddings is not None and len(embeddings) else 0,
+        "schema_version": get_schema_version(vector_store),
+    }
+
+
+def _search_by_vector(vector_store, embedding: List[float], k: int, where: Optional[Dict]):
+    """
+    (doc, distance) pairs for one query vector, lower is better
+    
+    Single and batch searches both go through here so "score" means the same
+    thing in search and search_batch. Despite its name, langchain_chroma's
+    *_with_relevance_scores returns the raw collection distance (it has no
+    *_by_vector_with_score), matching similarity_search_with_score.
+    """
+    return vector_store.similarity_search_by_vector_with_relevance_scores(
+        embedding=embedding,
+        k=k,
+        filter=where
     )
+
+
+def _search_params(vector_store, filters: Dict, k: int):
+    """Decide the where clause, post-filters and candidate count for a search"""
+    if get_schema_version(vector_store) >= METADATA_SCHEMA_VERSION:
+        # Price inside the store; substring fields need a post-check
+        where = build_where_clause(filters)
+        post_filters = {f: filters[f] for f in POST_FILTER_FIELDS if filters.get(f)}
+        return where, post_filters, k * 3 if post_filters else k
     
+    # Legacy index: get more results for post-filtering
+    return None, filters, k * 3
+
+
+def _format_results(results, post_filters: Dict, k: int) -> List[Dict]:
+    """Post-filter (doc, score) pairs and convert them to standard product dicts"""
     logger.info(f"[RAG] Retrieved {len(results)} candidates before filtering")
     
     # Post-process filtering
@@ -60,18 +264,20 @@ def retrieve_from_rag(
     for doc, score in results:
         metadata = doc.metadata
         
-        if not _matches_filters(metadata, filters):
+        if post_filters and not _matches_filters(metadata, post_filters):
             continue
         
         # Build result dict
+        price = metadata.get("price")
         result = {
             "doc_id": metadata.get("Uniq Id"),
             "title": metadata.get("Product Name"),
-            "price": _parse_price(metadata.get("Selling Price")),
+            "price": float(price) if price is not None else _parse_price(metadata.get("Selling Price")),
             "category": metadata.get("category", ""),
             "brand": metadata.get("brand", ""),
             "material": metadata.get("material", ""),
             "content": doc.page_content,
+            "summary": metadata.get("summary", ""),
             "score": float(score),
             "source": "rag"  # 标记来源
         }
@@ -106,7 +312,10 @@ def _matches_filters(metadata: Dict, filters: Dict) -> bool:
             return False
     
     # Price filtering
-    price = _parse_price(metadata.get("Selling Price", 0))
+    if "min_price" in filters or "max_price" in filters:
+        price = metadata.get("price")
+        if price is None:
+            price = _parse_price(metadata.get("Selling Price", 0))
     
     if "min_price" in filters:
         if price < filters["min_price"]:
@@ -119,7 +328,8 @@ def _matches_filters(metadata: Dict, filters: Dict) -> bool:
     # Brand filtering
     if "brand" in filters and filters["brand"]:
         doc_brand = str(metadata.get("brand", "")).lower()
-        filter_brands = [b.lower() for b in filters["brand"]]
+        brands = filters["brand"]
+        filter_brands = [str(b).lower() for b in ([brands] if isinstance(brands, str) else brands)]
         if not any(fb in doc_brand for fb in filter_brands):
             return False
     
@@ -5,6 +5,8 @@ Supports auto-download embeddings from Google Drive & user-provided API key.
 
 import os
 import json
+import asyncio
+import weakref
 import faiss
 import torch
 import logging
@@ -14,6 +16,7 @@ import requests
 from typing import List, Dict
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from graph.retriever.breaker import get_breaker, CircuitOpenError
 
 # ===============================
 # 🔹 Environment Setup
@@ -36,6 +39,20 @@ DATA_DRIVE_ID = os.getenv("DATA_DRIVE_ID")
 GROQ_ENDPOINT = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = "llama-3.3-70b-versatile"
 
+# Seconds; a stalled Groq call falls back to no filters instead of blocking the request
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "1.5"))
+GROQ_READ_TIMEOUT = float(os.getenv("GROQ_READ_TIMEOUT", "3.0"))
+# Default encoder; local builds record theirs in the manifest, which the loader follows
+EMBED_MODEL = "infgrad/stella-base-en-v2"
+
+# Locally built artifacts (python scripts/build_embeddings.py); preferred over Drive downloads
+FAISS_DIR = os.getenv("FAISS_DIR", "./data/faiss")
+MANIFEST_NAME = "manifest.json"
+# Hash the whole embedding file on load (slow for large catalogs; builds are immutable)
+FAISS_VERIFY_CHECKSUM = os.getenv("FAISS_VERIFY_CHECKSUM", "0") == "1"
+# Rows converted to float32 per index.add when loading the float16 matrix
+INDEX_ADD_CHUNK = 65536
+
 
 # ===============================
 # 1️⃣ Setup Function
@@ -52,6 +69,10 @@ def setup_env(GROQ_API_KEY: str = None):
     else:
         raise ValueError("❌ Please provide your GROQ_API_KEY when calling setup_env().")
 
+    if _has_local_artifacts():
+        logger.info(f"[Setup] Using locally built embeddings in {FAISS_DIR}.")
+        return
+
     if not os.path.exists(DATA_PATH):
         _download_data_from_drive()
     else:
@@ -87,6 +108,64 @@ def _download_data_from_drive():
 # ===============================
 # 3️⃣ Load Vector Store
 # ===============================
+def _has_local_artifacts() -> bool:
+    return os.path.exists(os.path.join(FAISS_DIR, MANIFEST_NAME))
+
+
+def file_checksum(path: str) -> str:
+    """sha256 of a file, read in 1 MB blocks"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def load_local_artifacts(faiss_dir: str = FAISS_DIR, verify_checksum: bool = None):
+    """
+    Load the catalog and embedding matrix written by scripts/build_embeddings.py,
+    validating them against the manifest.
+
+    The manifest points at an immutable build directory, so shape checks are
+    enough to catch a mismatched pair; the full-file checksum (which reads
+    the whole matrix) only runs with FAISS_VERIFY_CHECKSUM=1.
+
+    The query encoder must be the model the build used, which
+    build_embeddings.py --model may have changed from EMBED_MODEL, so the
+    manifest's model name is returned with the data.
+
+    Returns:
+        (catalog DataFrame, read-only memory-mapped float16 embedding matrix, model name)
+    """
+    if verify_checksum is None:
+        verify_checksum = FAISS_VERIFY_CHECKSUM
+    with open(os.path.join(faiss_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    emb_path = os.path.join(faiss_dir, manifest["embeddings"])
+    if verify_checksum and file_checksum(emb_path) != manifest["checksum"]:
+        raise ValueError(f"❌ Checksum mismatch for {emb_path}; rebuild with scripts/build_embeddings.py")
+
+    emb = np.load(emb_path, mmap_mode="r")
+    df = pd.read_parquet(os.path.join(faiss_dir, manifest["catalog"]))
+    if emb.shape != (manifest["rows"], manifest["dim"]) or len(df) != manifest["rows"]:
+        raise ValueError(
+            f"❌ Manifest expects {manifest['rows']}x{manifest['dim']}, "
+            f"found embeddings {emb.shape} and {len(df)} catalog rows"
+        )
+
+    return df, emb, manifest["model"]
+
+
+def build_flat_index(emb: np.ndarray, chunk_rows: int = INDEX_ADD_CHUNK):
+    """IndexFlatIP over emb, converting to float32 a chunk at a time (no full float32 copy besides the index)"""
+    index = faiss.IndexFlatIP(emb.shape[1])
+    for start in range(0, emb.shape[0], chunk_rows):
+        index.add(np.ascontiguousarray(emb[start:start + chunk_rows], dtype="float32"))
+    return index
+
+
 def get_vector_store():
     """Load FAISS index and SentenceTransformer encoder."""
     global _vector_store, _stella_model, _df, _index
@@ -94,16 +173,21 @@ def get_vector_store():
     if _vector_store is None:
         logger.info("[Init] Loading dataset and embeddings...")
 
-        _df = pd.read_csv(DATA_PATH)
-        text_emb = torch.load(EMB_PATH, map_location="cpu")
-        text_emb = text_emb / torch.norm(text_emb, dim=1, keepdim=True)
-        text_emb_np = text_emb.numpy().astype("float32")
+        if _has_local_artifacts():
+            # Built offline from data/amazon_enriched.parquet, already L2-normalized
+            _df, text_emb_np, model_name = load_local_artifacts()
+        else:
+            model_name = EMBED_MODEL
+            _df = pd.read_csv(DATA_PATH)
+            text_emb = torch.load(EMB_PATH, map_location="cpu")
+            text_emb = text_emb / torch.norm(text_emb, dim=1, keepdim=True)
+            text_emb_np = text_emb.numpy().astype("float32")
 
-        _index = faiss.IndexFlatIP(text_emb_np.shape[1])
-        _index.add(text_emb_np)
+        _index = build_flat_index(text_emb_np)
 
-        _stella_model = SentenceTransformer("infgrad/stella-base-en-v2", trust_remote_code=True)
-        _vector_store = {"index": _index, "df": _df, "model": _stella_model}
+        # Queries are encoded with the model the embeddings were built with
+        _stella_model = SentenceTransformer(model_name, trust_remote_code=True)
+        _vector_store = {"index": _index, "df": _df, "model": _stella_model, "model_name": model_name}
 
         logger.info(f"[Init] FAISS index with {_index.ntotal} vectors loaded.")
     return _vector_store
@@ -112,14 +196,7 @@ def get_vector_store():
 # ===============================
 # 4️⃣ Filter Extraction
 # ===============================
-def extract_filters_from_text(query: str) -> Dict:
-    """Extract structured filters using user-provided Groq API key."""
-    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-    print(f"[DEBUG] Loaded GROQ_API_KEY: {GROQ_API_KEY[:8]}******")
-    if not GROQ_API_KEY:
-        raise ValueError("❌ GROQ_API_KEY not set. Please call setup_env(GROQ_API_KEY=...) first.")
-
-    system_prompt = """You are a data extraction assistant.
+FILTER_SYSTEM_PROMPT = """You are a data extraction assistant.
 Extract structured filters from a shopping query in JSON.
 Keys: category, min_price, max_price, material, brand.
 Omit keys not mentioned.
@@ -127,27 +204,83 @@ Example:
 "Find eco-friendly stainless cleaner under $15" ->
 {"category":"cleaner","material":"stainless","max_price":15}
 Return only valid JSON."""
+
+
+def _groq_filter_request(query: str):
+    """Headers and payload for the Groq filter-extraction call"""
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    if not GROQ_API_KEY:
+        raise ValueError("❌ GROQ_API_KEY not set. Please call setup_env(GROQ_API_KEY=...) first.")
     headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
     payload = {
         "model": GROQ_MODEL,
         "messages": [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": FILTER_SYSTEM_PROMPT},
             {"role": "user", "content": query},
         ],
         "max_tokens": 200,
         "temperature": 0.2,
     }
+    return headers, payload
+
+
+def _parse_groq_filters(res: Dict) -> Dict:
+    text = res["choices"][0]["message"]["content"].strip()
+    filters = _safe_json_parse(text)
+    logger.debug(f"[Groq] Parsed filters: {filters}")
+    return filters
+
+
+def extract_filters_from_text(query: str) -> Dict:
+    """Extract structured filters using user-provided Groq API key.
+    Falls back to {} (no filters) on errors, timeouts or an open circuit breaker."""
+    headers, payload = _groq_filter_request(query)
     try:
-        res = requests.post(GROQ_ENDPOINT, headers=headers, json=payload).json()
-        print("[DEBUG] Groq API raw response:", res)
-        text = res["choices"][0]["message"]["content"].strip()
-        print("[DEBUG] Parsed filters:", _safe_json_parse(text))  # 👈 输出解析结果
-        return _safe_json_parse(text)
+        with get_breaker("groq").guard():
+            res = requests.post(
+                GROQ_ENDPOINT, headers=headers, json=payload,
+                timeout=(GROQ_CONNECT_TIMEOUT, GROQ_READ_TIMEOUT)
+            )
+            res.raise_for_status()
+            return _parse_groq_filters(res.json())
+
+    except CircuitOpenError as e:
+        logger.info(f"[Groq] {e}, searching without filters")
+        return {}
+    except Exception as e:
+        logger.warning(f"[Groq] Filter extraction failed: {e}")
+        return {}
+
+
+# One pooled client per event loop (httpx connections are loop-bound)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_async_client():
+    import httpx
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(timeout=httpx.Timeout(GROQ_READ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT))
+        _async_clients[loop] = client
+    return client
 
+
+async def aextract_filters_from_text(query: str) -> Dict:
+    """Async version of extract_filters_from_text on a pooled httpx client."""
+    headers, payload = _groq_filter_request(query)
+    try:
+        with get_breaker("groq").guard():
+            response = await _get_async_client().post(GROQ_ENDPOINT, headers=headers, json=payload)
+            response.raise_for_status()
+            return _parse_groq_filters(response.json())
+
+    except CircuitOpenError as e:
+        logger.info(f"[Groq] {e}, searching without filters")
+        return {}
     except Exception as e:
         logger.warning(f"[Groq] Filter extraction failed: {e}")
         return {}
-        
 
 
 def _safe_json_parse(text):
@@ -173,8 +306,24 @@ def retrieve_from_rag(query: str, filters: Dict, k: int = 20) -> List[Dict]:
 
     q_emb = model.encode([query], normalize_embeddings=True).astype("float32")
     scores, indices = index.search(q_emb, k * 5)
-    indices, scores = indices[0], scores[0]
+    return _filter_candidates(df, query, filters, indices[0], scores[0], k)
+
+
+def retrieve_from_rag_batch(queries: List[str], filters_list: List[Dict], k: int = 20) -> List[List[Dict]]:
+    """Retrieve top-k documents for many queries with one encode and one FAISS search"""
+    vs = get_vector_store()
+    df, index, model = vs["df"], vs["index"], vs["model"]
 
+    q_emb = model.encode(queries, normalize_embeddings=True).astype("float32")
+    scores, indices = index.search(q_emb, k * 5)
+    return [
+        _filter_candidates(df, query, filters, indices[i], scores[i], k)
+        for i, (query, filters) in enumerate(zip(queries, filters_list))
+    ]
+
+
+def _filter_candidates(df, query: str, filters: Dict, indices, scores, k: int) -> List[Dict]:
+    """Apply filter constraints to FAISS candidates of a single query"""
     filtered = []
     for idx, score in zip(indices, scores):
         row = df.iloc[idx]
@@ -201,21 +350,19 @@ def retrieve_from_rag(query: str, filters: Dict, k: int = 20) -> List[Dict]:
 
     # ✅ Fallback: if no results, return top semantic matches
     if not filtered:
-        print("[DEBUG] No strict matches found — returning top semantic results (may include out-of-range prices)")
-        fallback = [_format_result(df.iloc[idx], score) for idx, score in zip(indices[:k], scores[:k])]
+        logger.debug("[RAG] No strict matches found, returning top semantic results")
+        # Marked so answers don't present them as matching the filters
+        fallback = [
+            {**_format_result(df.iloc[idx], score), "semantic_fallback": True}
+            for idx, score in zip(indices[:k], scores[:k])
+        ]
         # Fallback 也做一次价格过滤
         if "max_price" in filters:
             fallback = [f for f in fallback if f.get("price", 0) <= float(filters["max_price"])]
         filtered = fallback
 
     # ✅ Debug logs
-    print(f"[DEBUG] Dataset found: {os.path.exists(DATA_PATH)} ({DATA_PATH})")
-    print(f"[DEBUG] Retrieved {len(filtered)} items for query: '{query}' with filters: {filters}")
-
-    if len(filtered) > 0:
-        print(f"✅ Successfully retrieved {len(filtered)} results.")
-    else:
-        print("⚠️ No matching results found. Check filters or data content.")
+    logger.debug(f"[RAG] Retrieved {len(filtered)} items for query '{query}' with filters {filters}")
 
     # ✅ Final strict price filter to guarantee correctness
     if "max_price" in filters:
@@ -224,14 +371,74 @@ def retrieve_from_rag(query: str, filters: Dict, k: int = 20) -> List[Dict]:
             before = len(filtered)
             filtered = [f for f in filtered if f.get("price", 0) <= max_p]
             after = len(filtered)
-            print(f"[DEBUG] Applied max_price filter {max_p}: reduced {before} → {after} results")
+            logger.debug(f"[RAG] Applied max_price filter {max_p}: {before} → {after} results")
         except Exception as e:
-            print(f"[DEBUG] Skipped price filter due to error: {e}")
+            logger.debug(f"[RAG] Skipped price filter: {e}")
 
     return filtered
 
 
 
+def upsert_products(products: List[Dict]) -> int:
+    """Insert or replace products (standard dict format) in the in-memory FAISS index"""
+    global _df
+    vs = get_vector_store()
+    df, index, model = vs["df"], vs["index"], vs["model"]
+
+    # Drop stale rows first so index positions stay aligned with df rows
+    ids = {str(p["doc_id"]) for p in products}
+    stale = np.where(df["uniq_id"].astype(str).isin(ids))[0]
+    if len(stale):
+        index.remove_ids(stale.astype("int64"))
+        df = df.drop(df.index[stale]).reset_index(drop=True)
+
+    rows = pd.DataFrame([
+        {
+            "uniq_id": p["doc_id"],
+            "product_name": p.get("title", ""),
+            "selling_price": float(p.get("price", 0) or 0),
+            "category": p.get("category", ""),
+            "brand": p.get("brand", ""),
+            "material": p.get("material", ""),
+            "rich_description": p.get("content") or p.get("title", ""),
+            "summary": p.get("summary") or None,
+        }
+        for p in products
+    ])
+    emb = model.encode(rows["rich_description"].tolist(), normalize_embeddings=True).astype("float32")
+    index.add(emb)
+
+    _df = pd.concat([df, rows], ignore_index=True)
+    vs["df"] = _df
+    logger.info(f"[FAISS] Upserted {len(rows)} products ({len(stale)} replaced), {index.ntotal} vectors total")
+    return len(rows)
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """L2-normalized stella embeddings for arbitrary texts (no index search)"""
+    model = get_vector_store()["model"]
+    return model.encode(texts, normalize_embeddings=True).astype("float32")
+
+
+def get_doc_vectors(doc_ids: List[str]) -> Dict[str, np.ndarray]:
+    """Indexed embeddings by doc_id, reconstructed from the FAISS index (index positions follow df rows)"""
+    vs = get_vector_store()
+    wanted = {str(i) for i in doc_ids}
+    rows = np.where(vs["df"]["uniq_id"].astype(str).isin(wanted))[0]
+    return {str(vs["df"]["uniq_id"].iat[row]): vs["index"].reconstruct(int(row)) for row in rows}
+
+
+def get_stats() -> Dict:
+    """Size and model information for the FAISS index"""
+    vs = get_vector_store()
+    return {
+        "backend": "faiss",
+        "model": vs["model_name"],
+        "num_vectors": int(vs["index"].ntotal),
+        "dim": int(vs["index"].d),
+    }
+
+
 def _format_result(row, score):
     return {
         "doc_id": row.get("uniq_id"),
@@ -241,6 +448,7 @@ def _format_result(row, score):
         "brand": row.get("brand", ""),
         "material": row.get("material", ""),
         "content": row.get("rich_description", ""),
+        "summary": row.get("summary") if pd.notna(row.get("summary")) else "",
         "score": float(score),
         "source": "rag",
     }
@@ -250,7 +458,6 @@ def _format_result(row, score):
 # 6️⃣ Unified Pipeline
 # ===============================
 def rag_with_auto_filter(user_query: str, k: int = 20) -> List[Dict]:
-    print(f"[DEBUG] 🚀 rag_with_auto_filter triggered with query: {user_query}")
     filters = extract_filters_from_text(user_query)
     results = retrieve_from_rag(user_query, filters, k)
     return results
@@ -1,15 +1,58 @@
 # graph/retriever/web.py
 """
-Web search retrieval logic (MCP integration point)
-This is a MOCK implementation - Web Search Team will replace this
+Web search retrieval
+Live product results from the provider selected by WEB_PROVIDER
+(graph/retriever/web_providers.py), over the shared pooled HTTP client.
+A failed or slow provider yields no web docs rather than failing the request,
+and once its circuit breaker opens (graph/retriever/breaker.py) it isn't
+called at all: retrieval falls back to private RAG only.
+
+Results go through a TTL + stale-while-revalidate cache
+(graph/retriever/web_cache.py); set WEB_CACHE=0 to always hit the provider.
 """
 
+from graph.retriever.web_providers import get_provider
+from graph.retriever import web_cache
+from graph.retriever.breaker import CircuitOpenError
 from typing import List, Dict
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def apply_price_filters(docs: List[Dict], filters: Dict) -> List[Dict]:
+    """Drop results outside min_price/max_price (unpriced results are kept)"""
+    min_price, max_price = filters.get("min_price"), filters.get("max_price")
+    kept = []
+    for doc in docs:
+        price = doc.get("price") or 0
+        if price and min_price is not None and price < float(min_price):
+            continue
+        if price and max_price is not None and price > float(max_price):
+            continue
+        kept.append(doc)
+    return kept
+
+
+def search_web(query: str, filters: Dict, k: int) -> List[Dict]:
+    """Uncached provider search; raises on provider errors and timeouts"""
+    provider = get_provider()
+    start = time.perf_counter()
+    docs = provider.search(query, filters, k)
+    logger.info(f"[WEB] {provider.name} returned {len(docs)} results in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return docs
+
+
+async def asearch_web(query: str, filters: Dict, k: int) -> List[Dict]:
+    """Awaitable search_web"""
+    provider = get_provider()
+    start = time.perf_counter()
+    docs = await provider.asearch(query, filters, k)
+    logger.info(f"[WEB] {provider.name} returned {len(docs)} results in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return docs
+
+
 def retrieve_from_web(
     query: str,
     filters: Dict,
@@ -17,42 +60,64 @@ def retrieve_from_web(
 ) -> List[Dict]:
     """
     Retrieve products from live web search
-    
+
     Args:
         query: Search query text
         filters: Dict with category, min_price, max_price, brand, material
         k: Number of results
-    
+
     Returns:
-        List of product dicts with standard format
-    
-    NOTE: This is a MOCK implementation!
-    Web Search Team should replace this with real MCP integration.
+        List of product dicts with standard format (source="web", url);
+        docs served from a stale cache entry carry "stale_fields"
+    """
+    key, fetch_k = web_cache.cache_key(query, filters), max(k, web_cache.WEB_CACHE_FETCH_K)
+
+    docs = None
+    if web_cache.WEB_CACHE_ENABLED and k <= web_cache.WEB_CACHE_FETCH_K:
+        docs = web_cache.get(key, refresh=lambda: search_web(query, filters, fetch_k))
+
+    if docs is None:
+        try:
+            docs = search_web(query, filters, fetch_k)
+        except CircuitOpenError as e:
+            logger.info(f"[WEB] {e}, falling back to private RAG only")
+            return []
+        except Exception as e:
+            logger.warning(f"[WEB] {get_provider().name} search failed: {e!r}")
+            return []
+        if web_cache.WEB_CACHE_ENABLED:
+            web_cache.put(key, docs)
+
+    return apply_price_filters(docs, filters)[:k]
+
+
+async def aretrieve_from_web(
+    query: str,
+    filters: Dict,
+    k: int = 5
+) -> List[Dict]:
+    """
+    Async retrieve_from_web for the async graph
+
+    Awaits the provider's request on the shared client, so the event
+    loop keeps serving other requests while the search is in flight.
     """
-    
-    logger.warning("[WEB] Using MOCK web search (not implemented yet)")
-    
-    # TODO: Web Search Team - Replace with real implementation
-    # Example integration:
-    # from mcp_client import search_products
-    # results = search_products(query, filters)
-    
-    # Mock results for testing
-    mock_results = [
-        {
-            "doc_id": "web_001",
-            "title": f"[WEB MOCK] Product matching '{query}'",
-            "price": 15.99,
-            "category": filters.get("category", "unknown"),
-            "brand": filters.get("brand", ["Unknown"])[0] if filters.get("brand") else "Unknown",
-            "material": filters.get("material", "unknown"),
-            "content": f"This is a mock web search result for '{query}'. Real implementation needed.",
-            "score": 0.95,
-            "source": "web",  # 标记来源
-            "url": "https://example.com/product"  # Web 独有字段
-        }
-    ]
-    
-    logger.info(f"[WEB] Returned {len(mock_results)} mock results")
-    
-    return mock_results[:k]
\ No newline at end of file
+    key, fetch_k = web_cache.cache_key(query, filters), max(k, web_cache.WEB_CACHE_FETCH_K)
+
+    docs = None
+    if web_cache.WEB_CACHE_ENABLED and k <= web_cache.WEB_CACHE_FETCH_K:
+        docs = web_cache.get(key, refresh=lambda: search_web(query, filters, fetch_k))
+
+    if docs is None:
+        try:
+            docs = await asearch_web(query, filters, fetch_k)
+        except CircuitOpenError as e:
+            logger.info(f"[WEB] {e}, falling back to private RAG only")
+            return []
+        except Exception as e:
+            logger.warning(f"[WEB] {get_provider().name} search failed: {e!r}")
+            return []
+        if web_cache.WEB_CACHE_ENABLED:
+            web_cache.put(key, docs)
+
+    return apply_price_filters(docs, filters)[:k]
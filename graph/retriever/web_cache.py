@@ -0,0 +1,200 @@
+# graph/retriever/web_cache.py
+"""
+TTL + stale-while-revalidate cache for web search results
+Keyed by normalized query + filters. Each doc field has its own TTL: an
+entry is fresh until its most volatile field (price, in_stock) expires,
+then served stale while one background refresh runs, for at most
+WEB_CACHE_MAX_STALE_S (and never past its most stable field's TTL), after
+which the next lookup is a plain miss. Stale docs carry "stale_fields":
+in_stock is dropped from them and the answerer hedges a stale price.
+Empty results are cached briefly (WEB_CACHE_EMPTY_TTL_S).
+"""
+
+from collections import OrderedDict, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import json
+import time
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+WEB_CACHE_ENABLED = os.getenv("WEB_CACHE", "1") != "0"
+WEB_CACHE_SIZE = int(os.getenv("WEB_CACHE_SIZE", "2048"))
+
+# Results are fetched at this k (or more) so smaller k requests share one entry
+WEB_CACHE_FETCH_K = int(os.getenv("WEB_CACHE_FETCH_K", "5"))
+
+# Seconds each doc field stays valid, e.g. WEB_CACHE_TTLS="price=120,in_stock=60"
+DEFAULT_FIELD_TTLS = {
+    "price": 300,
+    "in_stock": 300,
+    "rating": 3600,
+    "review_count": 3600,
+    "title": 86400,
+    "url": 86400,
+}
+FIELD_TTLS = {
+    **DEFAULT_FIELD_TTLS,
+    **{
+        field.strip(): float(ttl)
+        for field, _, ttl in (item.partition("=") for item in os.getenv("WEB_CACHE_TTLS", "").split(","))
+        if field.strip() and ttl.strip()
+    },
+}
+
+# Longest a stale entry is served after its fresh TTL, so price/stock can't be hours old
+WEB_CACHE_MAX_STALE_S = float(os.getenv("WEB_CACHE_MAX_STALE_S", "300"))
+
+# Fresh and stale TTL of an empty result (negative caching), so a miss is retried soon
+WEB_CACHE_EMPTY_TTL_S = float(os.getenv("WEB_CACHE_EMPTY_TTL_S", "60"))
+
+# Fields left out of stale docs rather than served out of date
+DROP_WHEN_STALE = ("in_stock",)
+
+# Recent staleness samples (seconds past the fresh TTL) for the metrics
+STALENESS_WINDOW = 1000
+
+_entries: "OrderedDict[str, Dict]" = OrderedDict()
+_refreshing = set()
+_stats = Counter()
+_staleness = deque(maxlen=STALENESS_WINDOW)
+_lock = threading.Lock()
+
+# Background refreshes; small, they only wait on the web provider
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-cache-refresh")
+
+
+def cache_key(query: str, filters: Dict) -> str:
+    """Lowercased, punctuation-free query plus canonical JSON of the filters"""
+    normalized_query = " ".join(re.sub(r"[^\w$.\s]", " ", query.lower()).split())
+    normalized_filters = {}
+    for field, value in (filters or {}).items():
+        if value in (None, "", []):
+            continue
+        if isinstance(value, list):
+            value = sorted(str(v).lower() for v in value)
+        elif isinstance(value, str):
+            value = value.lower().strip()
+        normalized_filters[field] = value
+    return normalized_query + "|" + json.dumps(normalized_filters, sort_keys=True)
+
+
+def _ttl_window(docs: List[Dict]) -> Tuple[float, float]:
+    """
+    (fresh TTL, stale TTL): shortest TTL over the fields the docs carry, then
+    at most WEB_CACHE_MAX_STALE_S more, capped by the longest TTL
+    """
+    fields = {f for doc in docs for f in doc if f in FIELD_TTLS}
+    if not fields:
+        return WEB_CACHE_EMPTY_TTL_S, WEB_CACHE_EMPTY_TTL_S
+    ttls = [FIELD_TTLS[f] for f in fields]
+    return min(ttls), min(max(ttls), min(ttls) + WEB_CACHE_MAX_STALE_S)
+
+
+def _stale_docs(docs: List[Dict], age: float) -> List[Dict]:
+    """Copies of docs tagged with the fields whose TTL has passed, without DROP_WHEN_STALE fields"""
+    expired = sorted(f for f, ttl in FIELD_TTLS.items() if age >= ttl)
+    stale = []
+    for doc in docs:
+        doc = {**doc, "stale_fields": [f for f in expired if f in doc]}
+        for field in DROP_WHEN_STALE:
+            if field in doc["stale_fields"]:
+                doc[field] = None
+        stale.append(doc)
+    return stale
+
+
+def put(key: str, docs: List[Dict]):
+    """Store fresh results, evicting the least recently used entry when full"""
+    fresh_ttl, stale_ttl = _ttl_window(docs)
+    with _lock:
+        _entries[key] = {"docs": docs, "fetched_at": time.monotonic(), "fresh_ttl": fresh_ttl, "stale_ttl": stale_ttl}
+        _entries.move_to_end(key)
+        while len(_entries) > WEB_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+def _refresh(key: str, fetch: Callable[[], List[Dict]]):
+    try:
+        put(key, fetch())
+        with _lock:
+            _stats["refreshes"] += 1
+    except Exception as e:
+        # Keep serving the stale entry; the next stale lookup retries
+        logger.warning(f"[WebCache] Background refresh failed: {e!r}")
+        with _lock:
+            _stats["refresh_errors"] += 1
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def get(key: str, refresh: Callable[[], List[Dict]]) -> Optional[List[Dict]]:
+    """
+    Cached docs for key, or None on a miss
+
+    Fresh entries are returned as-is. Stale entries are returned with
+    "stale_fields" on each doc and one background refresh(); concurrent
+    lookups of the same key don't start another.
+    """
+    with _lock:
+        entry = _entries.get(key)
+        age = time.monotonic() - entry["fetched_at"] if entry else 0.0
+
+        if entry is None or age >= entry["stale_ttl"]:
+            if entry is not None:
+                del _entries[key]
+            _stats["misses"] += 1
+            return None
+
+        _entries.move_to_end(key)
+        if age < entry["fresh_ttl"]:
+            _stats["fresh_hits"] += 1
+            return entry["docs"]
+
+        _stats["stale_hits"] += 1
+        _staleness.append(age - entry["fresh_ttl"])
+        start_refresh = key not in _refreshing
+        _refreshing.add(key)
+
+    if start_refresh:
+        _refresh_executor.submit(_refresh, key, refresh)
+    return _stale_docs(entry["docs"], age)
+
+
+def clear():
+    """Drop all entries and zero the counters"""
+    with _lock:
+        _entries.clear()
+        _stats.clear()
+        _staleness.clear()
+
+
+def get_web_cache_stats() -> Dict:
+    """Hit ratio, stale-serve ratio, staleness (s past fresh TTL) and refresh counters"""
+    with _lock:
+        stats = dict(_stats)
+        staleness = sorted(_staleness)
+        size = len(_entries)
+
+    lookups = stats.get("fresh_hits", 0) + stats.get("stale_hits", 0) + stats.get("misses", 0)
+    hits = stats.get("fresh_hits", 0) + stats.get("stale_hits", 0)
+    return {
+        "size": size,
+        "lookups": lookups,
+        "fresh_hits": stats.get("fresh_hits", 0),
+        "stale_hits": stats.get("stale_hits", 0),
+        "misses": stats.get("misses", 0),
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "stale_ratio": round(stats.get("stale_hits", 0) / lookups, 4) if lookups else 0.0,
+        "staleness_p50_s": round(staleness[len(staleness) // 2], 1) if staleness else 0.0,
+        "staleness_p95_s": round(staleness[min(len(staleness) - 1, int(len(staleness) * 0.95))], 1) if staleness else 0.0,
+        "refreshes": stats.get("refreshes", 0),
+        "refresh_errors": stats.get("refresh_errors", 0),
+        "evictions": stats.get("evictions", 0),
+    }
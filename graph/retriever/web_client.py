@@ -0,0 +1,121 @@
+# graph/retriever/web_client.py
+"""
+Shared async HTTP transport for web providers
+One httpx.AsyncClient with keep-alive pooling, owned by a background event
+loop, so the sync graph (worker threads) and the async graph (its own loop)
+share the same connections. Each host gets its own concurrency limit.
+"""
+
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import concurrent.futures
+import threading
+import asyncio
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Timeouts (seconds): a slow provider should cost one web source, not the request
+WEB_CONNECT_TIMEOUT = float(os.getenv("WEB_CONNECT_TIMEOUT", "1.5"))
+WEB_READ_TIMEOUT = float(os.getenv("WEB_READ_TIMEOUT", "4.0"))
+# Whole request including the wait for a per-host slot, so a saturated host can't block callers
+WEB_REQUEST_TIMEOUT = float(os.getenv("WEB_REQUEST_TIMEOUT", str(WEB_CONNECT_TIMEOUT + WEB_READ_TIMEOUT)))
+
+# Pool size across hosts, and concurrent requests per host
+WEB_MAX_CONNECTIONS = int(os.getenv("WEB_MAX_CONNECTIONS", "64"))
+WEB_MAX_KEEPALIVE = int(os.getenv("WEB_MAX_KEEPALIVE", "32"))
+WEB_HOST_LIMIT = int(os.getenv("WEB_HOST_LIMIT", "8"))
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_in_flight: Dict[str, int] = {}  # Requests holding a host slot; only updated on the client loop
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop that owns the client (started on first use)"""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="web-client", daemon=True).start()
+    return _loop
+
+
+def submit(coro) -> concurrent.futures.Future:
+    """Run a coroutine on the client loop (also hosts the MCP session pool)"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def _get_client():
+    """Pooled client; only touched from the background loop"""
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(WEB_READ_TIMEOUT, connect=WEB_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=WEB_MAX_CONNECTIONS, max_keepalive_connections=WEB_MAX_KEEPALIVE),
+            follow_redirects=True,
+        )
+    return _client
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(WEB_HOST_LIMIT)
+    return _host_limits[host]
+
+
+async def _send(method: str, url: str, **kwargs) -> Dict:
+    host = urlsplit(url).netloc
+    async with _host_limit(url):
+        _in_flight[host] = _in_flight.get(host, 0) + 1
+        try:
+            response = await _get_client().request(method, url, **kwargs)
+        finally:
+            _in_flight[host] -= 1
+    response.raise_for_status()
+    return response.json()
+
+
+async def _request_json(method: str, url: str, **kwargs) -> Dict:
+    """_send bounded by WEB_REQUEST_TIMEOUT; on timeout it is cancelled and its host slot freed"""
+    return await asyncio.wait_for(_send(method, url, **kwargs), WEB_REQUEST_TIMEOUT)
+
+
+def request_json(method: str, url: str, **kwargs) -> Dict:
+    """
+    Blocking JSON request on the shared client (for worker threads)
+
+    Args:
+        method, url: HTTP method and URL
+        **kwargs: Passed to httpx (params, json, headers, timeout)
+
+    Returns:
+        Decoded JSON body; raises on timeouts and non-2xx statuses
+    """
+    future = submit(_request_json(method, url, **kwargs))
+    try:
+        # wait_for already bounds the request; this also covers a stalled client loop
+        return future.result(timeout=WEB_REQUEST_TIMEOUT + 1.0)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+async def arequest_json(method: str, url: str, **kwargs) -> Dict:
+    """request_json for coroutines on any event loop"""
+    return await asyncio.wrap_future(submit(_request_json(method, url, **kwargs)))
+
+
+def get_client_stats() -> Dict:
+    """Pool settings and in-flight requests per host"""
+    return {
+        "max_connections": WEB_MAX_CONNECTIONS,
+        "max_keepalive": WEB_MAX_KEEPALIVE,
+        "host_limit": WEB_HOST_LIMIT,
+        "hosts": dict(_in_flight),
+    }
@@ -0,0 +1,170 @@
+# graph/retriever/web_hedge.py
+"""
+Hedged web search across providers
+WEB_PROVIDER="serper,stub" sends each query to the first provider; if it
+hasn't answered within its own p90 latency, the same query goes to the next
+provider, and the first successful response wins (the others are cancelled).
+A provider that fails fast is hedged immediately. Per-provider latencies are
+tracked online, so hedge delays follow each provider's recent behaviour.
+"""
+
+from graph.retriever.web_client import submit, WEB_REQUEST_TIMEOUT
+from graph.retriever.breaker import CircuitOpenError
+from collections import Counter, deque
+from typing import Dict, List
+import concurrent.futures
+import threading
+import asyncio
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latency quantile that triggers the hedge, and how many recent calls it's computed over
+WEB_HEDGE_QUANTILE = float(os.getenv("WEB_HEDGE_QUANTILE", "0.9"))
+WEB_HEDGE_WINDOW = int(os.getenv("WEB_HEDGE_WINDOW", "500"))
+
+# Delay used until a provider has WEB_HEDGE_MIN_SAMPLES latencies, and the clamp on learned delays (ms)
+WEB_HEDGE_DEFAULT_MS = float(os.getenv("WEB_HEDGE_DEFAULT_MS", "300"))
+WEB_HEDGE_MIN_SAMPLES = int(os.getenv("WEB_HEDGE_MIN_SAMPLES", "20"))
+WEB_HEDGE_MIN_MS = float(os.getenv("WEB_HEDGE_MIN_MS", "20"))
+WEB_HEDGE_MAX_MS = float(os.getenv("WEB_HEDGE_MAX_MS", "2000"))
+
+
+class LatencyTracker:
+    """Sliding window of one provider's latencies (ms)"""
+
+    def __init__(self, window: int = WEB_HEDGE_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float):
+        with self._lock:
+            self.samples.append(latency_ms)
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+    def hedge_delay_ms(self) -> float:
+        """p90 (WEB_HEDGE_QUANTILE) once warmed up, else the default"""
+        if len(self.samples) < WEB_HEDGE_MIN_SAMPLES:
+            return WEB_HEDGE_DEFAULT_MS
+        return min(max(self.quantile(WEB_HEDGE_QUANTILE), WEB_HEDGE_MIN_MS), WEB_HEDGE_MAX_MS)
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_tracker(name: str) -> LatencyTracker:
+    if name not in _trackers:
+        _trackers[name] = LatencyTracker()
+    return _trackers[name]
+
+
+def _count(**counts):
+    with _stats_lock:
+        _stats.update(counts)
+
+
+class HedgedProvider:
+    """Providers tried in order, each one hedged after its predecessor's p90"""
+
+    def __init__(self, providers: List):
+        self.providers = providers
+        self.name = ",".join(p.name for p in providers)
+        # Each provider launches at the latest when its predecessor gives up,
+        # so the whole hedge is bounded by one request timeout per provider
+        self.timeout = len(providers) * WEB_REQUEST_TIMEOUT + 1.0
+
+    async def _hedged_search(self, query: str, filters: Dict, k: int) -> List[Dict]:
+        pending = {}
+        launched = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            provider = self.providers[launched]
+            task = asyncio.ensure_future(provider.asearch(query, filters, k))
+            pending[task] = (provider, time.perf_counter())
+            launched += 1
+
+        launch()
+        _count(requests=1)
+        try:
+            while pending:
+                has_next = launched < len(self.providers)
+                delay = get_tracker(self.providers[launched - 1].name).hedge_delay_ms() / 1000 if has_next else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # The newest request is past its provider's p90: hedge
+                    launch()
+                    _count(hedges=1)
+                    continue
+
+                for task in done:
+                    provider, start = pending.pop(task)
+                    latency_ms = (time.perf_counter() - start) * 1000
+                    if task.exception() is None:
+                        get_tracker(provider.name).record(latency_ms)
+                        _count(**{f"wins_{provider.name}": 1})
+                        return task.result()
+                    last_error = task.exception()
+                    if isinstance(last_error, CircuitOpenError):
+                        # Breaker open: fail over straight away, no latency sample
+                        _count(**{f"skipped_{provider.name}": 1})
+                        continue
+                    _count(**{f"errors_{provider.name}": 1})
+                    logger.warning(f"[WEB] {provider.name} failed after {latency_ms:.0f}ms: {last_error!r}")
+
+                # Everything in flight failed: go to the next provider without waiting
+                if not pending and launched < len(self.providers):
+                    launch()
+                    _count(failovers=1)
+
+            raise last_error
+        finally:
+            for task, (provider, start) in pending.items():
+                if task.done():
+                    continue
+                task.cancel()
+                # Censored sample: the loser took at least this long
+                get_tracker(provider.name).record((time.perf_counter() - start) * 1000)
+                _count(cancelled=1)
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        future = submit(self._hedged_search(query, filters, k))
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            # Cancels the hedge, which cancels its in-flight provider requests
+            future.cancel()
+            raise
+
+    async def asearch(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        return await asyncio.wrap_future(submit(self._hedged_search(query, filters, k)))
+
+
+def get_hedge_stats() -> Dict:
+    """Hedge rate, wins/errors per provider and per-provider latency quantiles"""
+    with _stats_lock:
+        stats = dict(_stats)
+    requests = stats.get("requests", 0)
+    return {
+        **stats,
+        "hedge_rate": round(stats.get("hedges", 0) / requests, 4) if requests else 0.0,
+        "providers": {
+            name: {
+                "samples": len(tracker.samples),
+                "p50_ms": round(tracker.quantile(0.5), 1),
+                "p90_ms": round(tracker.quantile(0.9), 1),
+                "hedge_delay_ms": round(tracker.hedge_delay_ms(), 1),
+            }
+            for name, tracker in list(_trackers.items())
+        },
+    }
@@ -0,0 +1,225 @@
+# graph/retriever/web_providers.py
+"""
+Pluggable web search providers
+Each provider turns a query into one HTTP request and the JSON response into
+standard product dicts (source="web", url); the transport is shared
+(graph/retriever/web_client.py). Selected by WEB_PROVIDER.
+"""
+
+from graph.retriever.web_client import request_json, arequest_json
+from graph.retriever.breaker import get_breaker
+from typing import List, Dict, Optional, Protocol
+import hashlib
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Serper's shopping endpoint; the stub server (scripts/web_stub_server.py) speaks the same format
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/shopping")
+WEB_STUB_URL = os.getenv("WEB_STUB_URL", "http://127.0.0.1:8765/shopping")
+WEB_STUB2_URL = os.getenv("WEB_STUB2_URL", "http://127.0.0.1:8767/shopping")
+
+# MCP tool answering {"query", "num"} with a Serper-style {"shopping": [...]} result
+MCP_SEARCH_TOOL = os.getenv("MCP_SEARCH_TOOL", "web.search")
+
+
+class WebProvider(Protocol):
+    """Interface every web search provider implements"""
+
+    name: str
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        """Top-k product dicts for one query (blocking)"""
+        ...
+
+    async def asearch(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        """Top-k product dicts for one query (awaitable)"""
+        ...
+
+
+def parse_price(price) -> float:
+    """'$1,299.99' / 'From $12.50' / 12.5 -> float; missing or junk -> 0.0"""
+    if isinstance(price, (int, float)):
+        return float(price)
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(price or ""))
+    return float(match.group(0).replace(",", "")) if match else 0.0
+
+
+def build_search_query(query: str, filters: Dict) -> str:
+    """Append brand/material filters the query text doesn't already mention"""
+    terms = [query]
+    for value in [*(filters.get("brand") or []), filters.get("material")]:
+        if value and str(value).lower() not in query.lower():
+            terms.append(str(value))
+    return " ".join(terms)
+
+
+class SerperProvider:
+    """Serper.dev shopping search (POST JSON, X-API-KEY header)"""
+
+    name = "serper"
+
+    def __init__(self, url: str = SERPER_URL, api_key: Optional[str] = None):
+        self.url = url
+        self.api_key = api_key if api_key is not None else os.getenv("SERPER_API_KEY", "")
+
+    def build_request(self, query: str, filters: Dict, k: int) -> Dict:
+        """Method, URL and httpx kwargs for one search"""
+        if not self.api_key:
+            raise ValueError("❌ SERPER_API_KEY not set. Set it or use WEB_PROVIDER=stub.")
+        return {
+            "method": "POST",
+            "url": self.url,
+            "headers": {"X-API-KEY": self.api_key, "Content-Type": "application/json"},
+            "json": {"q": build_search_query(query, filters), "num": max(k * 2, 10)},
+        }
+
+    def parse_response(self, payload: Dict, filters: Dict) -> List[Dict]:
+        """Shopping results -> standard product dicts, ranked by position"""
+        items = payload.get("shopping") or []
+        docs = []
+        for rank, item in enumerate(items):
+            if not item.get("title") or not item.get("link"):
+                continue
+            rating = item.get("rating")
+            docs.append({
+                "doc_id": "web_" + (str(item.get("productId") or "")
+                                    or hashlib.sha1(item["link"].encode("utf-8")).hexdigest()[:12]),
+                "title": item["title"],
+                "price": parse_price(item.get("price")),
+                "category": filters.get("category", ""),
+                "brand": item.get("brand") or "",
+                "material": filters.get("material", ""),
+                "content": " ".join(str(item[f]) for f in ("title", "snippet", "delivery") if item.get(f)),
+                "rating": float(rating) if rating is not None else None,
+                "review_count": item.get("ratingCount"),
+                "in_stock": item.get("inStock"),  # None when the provider doesn't say
+                "seller": item.get("source", ""),
+                "score": round(1.0 / (rank + 1), 4),
+                "source": "web",
+                "url": item["link"],
+            })
+        return docs
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        request = self.build_request(query, filters, k)
+        with get_breaker(f"web:{self.name}").guard():
+            return self.parse_response(request_json(**request), filters)
+
+    async def asearch(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        request = self.build_request(query, filters, k)
+        with get_breaker(f"web:{self.name}").guard():
+            return self.parse_response(await arequest_json(**request), filters)
+
+
+class StubProvider(SerperProvider):
+    """Local stand-in search server (python scripts/web_stub_server.py)"""
+
+    name = "stub"
+
+    def __init__(self, url: str = WEB_STUB_URL):
+        super().__init__(url=url, api_key="stub")
+
+
+class SecondStubProvider(StubProvider):
+    """A second stub server, e.g. as the hedge target of WEB_PROVIDER=stub,stub2"""
+
+    name = "stub2"
+
+    def __init__(self, url: str = WEB_STUB2_URL):
+        super().__init__(url=url)
+
+
+class MCPProvider(SerperProvider):
+    """web.search tool on an MCP server, over the pooled sessions (graph/retriever/mcp_pool.py)"""
+
+    name = "mcp"
+
+    def __init__(self, tool: str = MCP_SEARCH_TOOL):
+        super().__init__(url="", api_key="mcp")
+        self.tool = tool
+
+    def _arguments(self, query: str, filters: Dict, k: int) -> Dict:
+        return {"query": build_search_query(query, filters), "num": max(k * 2, 10)}
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        from graph.retriever.mcp_pool import call_tool
+        with get_breaker(f"web:{self.name}").guard():
+            return self.parse_response(call_tool(self.tool, self._arguments(query, filters, k)), filters)
+
+    async def asearch(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        from graph.retriever.mcp_pool import acall_tool
+        with get_breaker(f"web:{self.name}").guard():
+            return self.parse_response(await acall_tool(self.tool, self._arguments(query, filters, k)), filters)
+
+
+class MockProvider:
+    """One canned result, no I/O (used when no provider is configured)"""
+
+    name = "mock"
+
+    def search(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        logger.warning("[WEB] Using MOCK web search (set WEB_PROVIDER=serper, stub or mcp)")
+        return [{
+            "doc_id": "web_001",
+            "title": f"[WEB MOCK] Product matching '{query}'",
+            "price": 15.99,
+            "category": filters.get("category", "unknown"),
+            "brand": filters.get("brand", ["Unknown"])[0] if filters.get("brand") else "Unknown",
+            "material": filters.get("material", "unknown"),
+            "content": f"This is a mock web search result for '{query}'.",
+            "score": 0.95,
+            "source": "web",
+            "url": "https://example.com/product",
+        }][:k]
+
+    async def asearch(self, query: str, filters: Dict, k: int = 5) -> List[Dict]:
+        return self.search(query, filters, k)
+
+
+# Provider registry
+PROVIDERS = {
+    "serper": SerperProvider,
+    "stub": StubProvider,
+    "stub2": SecondStubProvider,
+    "mcp": MCPProvider,
+    "mock": MockProvider,
+}
+
+_providers: Dict[str, WebProvider] = {}
+
+
+def get_provider(name: Optional[str] = None) -> WebProvider:
+    """
+    Get a web provider (one instance per name)
+
+    Args:
+        name: "serper", "stub", "stub2", "mcp" or "mock"; defaults to
+            WEB_PROVIDER, then serper if SERPER_API_KEY is set, otherwise mock.
+            A comma-separated list ("serper,stub") gives a HedgedProvider
+            over those providers, in order (graph/retriever/web_hedge.py)
+
+    Returns:
+        WebProvider instance
+    """
+    default = "serper" if os.getenv("SERPER_API_KEY") else "mock"
+    name = (name or os.getenv("WEB_PROVIDER", default)).lower().strip()
+
+    if "," in name:
+        if name not in _providers:
+            from graph.retriever.web_hedge import HedgedProvider
+            _providers[name] = HedgedProvider([get_provider(n.strip()) for n in name.split(",") if n.strip()])
+            logger.info(f"[WEB] Hedging across {name}")
+        return _providers[name]
+
+    if name not in PROVIDERS:
+        logger.warning(f"Unknown web provider '{name}', defaulting to {default}")
+        name = default
+
+    if name not in _providers:
+        _providers[name] = PROVIDERS[name]()
+        logger.info(f"[WEB] Using {name} web provider")
+
+    return _providers[name]
@@ -0,0 +1,118 @@
+# graph/router/rules.py
+"""
+Rule-based router: the keyword and price rules from ROUTER_TEMPLATE applied
+with regexes. Used instead of the LLM when the latency budget is too tight.
+"""
+
+from graph.router.parser import RouterOutput, Constraints
+from typing import Optional, Tuple
+import re
+
+# Checked in order, first match wins (comparison before recommendation: "which is better")
+TASK_KEYWORDS = [
+    ("comparison", ["compare", " vs", "versus", "difference between", "which is better"]),
+    ("availability_check", ["available", "in stock", "can i buy", "is there", "do you have"]),
+    ("recommendation", ["recommend", "suggest", "best", "top rated", "should i buy"]),
+]
+
+# Regex fragments matched as whole words. Medical stems only count in phrases
+# asking for treatment ("cure for", "treat my"), so "heat treated steel" or
+# "cured leather" don't flag; common products named after weapons are excluded.
+SAFETY_KEYWORDS = {
+    "medical_advice": [
+        r"cures? (?:for|my)", r"treat(?:ing)? my", r"how (?:do i |to )treat", r"treatments? for", r"medicines? for",
+        r"remed(?:y|ies) for", r"heal(?:ing)? my", r"diagnos(?:e|is|ing)", r"diseases?", r"illness(?:es)?", r"sick",
+    ],
+    "dangerous_product": [
+        r"(?<!glue )(?<!heat )(?<!nail )(?<!massage )(?<!water )guns?", r"firearms?", r"weapons?",
+        r"explosives?", r"(?<!bath )bombs?", r"drugs?", r"illegal",
+    ],
+    "inappropriate_content": [r"xxx", r"porn\w*", r"nsfw"],
+}
+SAFETY_PATTERNS = {
+    flag: re.compile(rf"\b(?:{'|'.join(keywords)})\b") for flag, keywords in SAFETY_KEYWORDS.items()
+}
+
+MATERIALS = [
+    "stainless steel", "organic", "vegan", "leather", "wooden", "wood", "cotton", "plastic",
+    "metal", "glass", "bamboo", "silicone", "ceramic", "wool", "silk", "aluminum",
+]
+
+_NUM = r"\$?\s*(\d+(?:\.\d+)?)"
+PRICE_BETWEEN = re.compile(rf"between\s+{_NUM}\s+(?:and|to|-)\s+{_NUM}")
+PRICE_UNDER = re.compile(rf"(?:under|below|less than|cheaper than|up to)\s+{_NUM}")
+PRICE_OVER = re.compile(rf"(?:above|over|more than|at least)\s+{_NUM}")
+PRICE_AROUND = re.compile(rf"(?:around|about|roughly)\s+{_NUM}")
+
+STOPWORDS = {
+    "a", "an", "the", "me", "my", "i", "for", "to", "of", "and", "or", "with", "some", "any",
+    "find", "show", "looking", "need", "want", "get", "buy", "is", "are", "there", "do", "you",
+    "have", "can", "now", "current", "latest", "today", "please", "what", "which", "whats",
+    "cheap", "affordable", "budget", "expensive", "premium", "luxury", "high-end", "good",
+    "under", "below", "less", "than", "above", "over", "more", "around", "about", "roughly",
+    "between", "up", "at", "least", "in", "stock", "available", "rated", "top", "best",
+    "compare", "vs", "versus", "difference", "better", "recommend", "suggest", "should",
+    "only", "just", "how", "else", "next", "see", "those", "these", "them", "other", "others",
+}
+
+
+def rule_task(query_lc: str) -> str:
+    padded = f" {query_lc} "
+    for task, keywords in TASK_KEYWORDS:
+        if any(k in padded for k in keywords):
+            return task
+    return "product_search"
+
+
+def rule_safety_flags(query_lc: str) -> list:
+    return [flag for flag, pattern in SAFETY_PATTERNS.items() if pattern.search(query_lc)]
+
+
+def rule_price(query_lc: str) -> Tuple[Optional[float], Optional[float]]:
+    """(min_price, max_price) per the router prompt's price rules"""
+    if m := PRICE_BETWEEN.search(query_lc):
+        return float(m.group(1)), float(m.group(2))
+    if m := PRICE_UNDER.search(query_lc):
+        return None, float(m.group(1))
+    if m := PRICE_OVER.search(query_lc):
+        return float(m.group(1)), None
+    if m := PRICE_AROUND.search(query_lc):
+        x = float(m.group(1))
+        return round(x * 0.9, 2), round(x * 1.1, 2)
+    if re.search(r"\b(cheap|affordable|budget)\b", query_lc):
+        return None, 15.0
+    if re.search(r"\b(expensive|premium|luxury|high-end)\b", query_lc):
+        return 100.0, None
+    return None, None
+
+
+def rule_route(query: str) -> RouterOutput:
+    """Task, constraints and safety flags from keywords alone"""
+    query_lc = query.lower()
+
+    material = next((m for m in MATERIALS if re.search(rf"\b{m}\b", query_lc)), None)
+
+    # Capitalized words after the first are taken as brand names ("compare Dove vs Pantene")
+    words = re.findall(r"[A-Za-z][\w'&-]*", query)
+    brand = [w for w in words[1:] if w[0].isupper() and w.lower() not in STOPWORDS]
+
+    # Product: last remaining content word, singularized
+    skip = STOPWORDS | set((material or "").split()) | {b.lower() for b in brand}
+    content = [w.lower() for w in words if w.lower() not in skip]
+    product = content[-1] if content else None
+    if product and product.endswith("s") and not product.endswith("ss"):
+        product = product[:-1]
+
+    min_price, max_price = rule_price(query_lc)
+
+    return RouterOutput(
+        task=rule_task(query_lc),
+        constraints=Constraints(
+            product=product,
+            min_price=min_price,
+            max_price=max_price,
+            material=material,
+            brand=brand
+        ),
+        safety_flags=rule_safety_flags(query_lc)
+    )
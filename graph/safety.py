@@ -0,0 +1,100 @@
+# graph/safety.py
+"""
+Safety short-circuit
+Queries the router flags go straight to a templated refusal/redirect,
+skipping the planner, Groq filter extraction, retrieval and the answerer LLM.
+Process-wide counters show how much pipeline work this saves on live traffic.
+"""
+
+from graph.state import GraphState
+from collections import Counter
+from typing import Dict, List
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Router safety flags that end the request before planning
+SHORT_CIRCUIT_FLAGS = {"dangerous_product", "medical_advice", "inappropriate_content"}
+
+# Stages a flagged request would otherwise have run
+SKIPPED_STAGES = ["planner", "filter_extraction", "retrieval", "answerer"]
+
+REFUSALS = {
+    "dangerous_product": "I can't help find weapons, explosives, drugs or other dangerous or illegal items.",
+    "medical_advice": "I can't give medical advice or suggest treatments. A doctor or pharmacist is the right person to ask.",
+    "inappropriate_content": "I can't help with that request.",
+}
+REDIRECT = "I'm happy to help you shop for something else."
+
+_stats = {"checked": 0, "short_circuited": 0, "by_flag": Counter(), "stages_saved": Counter()}
+_stats_lock = threading.Lock()
+
+
+def flagged(state: GraphState) -> List[str]:
+    """Safety flags on the state that trigger the short-circuit."""
+    return [f for f in dict.fromkeys(state.get("safety_flags") or []) if f in SHORT_CIRCUIT_FLAGS]
+
+
+def record_check(state: GraphState) -> bool:
+    """Count one routed request; True if it should be short-circuited."""
+    flags = flagged(state)
+    with _stats_lock:
+        _stats["checked"] += 1
+        if flags:
+            _stats["short_circuited"] += 1
+            _stats["by_flag"].update(flags)
+            _stats["stages_saved"].update(SKIPPED_STAGES)
+    return bool(flags)
+
+
+def get_safety_stats() -> Dict:
+    """Snapshot of the short-circuit counters."""
+    with _stats_lock:
+        checked = _stats["checked"]
+        return {
+            "checked": checked,
+            "short_circuited": _stats["short_circuited"],
+            "rate": round(_stats["short_circuited"] / checked, 4) if checked else 0.0,
+            "by_flag": dict(_stats["by_flag"]),
+            "stages_saved": dict(_stats["stages_saved"]),
+        }
+
+
+def reset_safety_stats():
+    """Zero the counters (tests, per-window reporting)."""
+    with _stats_lock:
+        _stats.update(checked=0, short_circuited=0, by_flag=Counter(), stages_saved=Counter())
+
+
+def refusal_answer(flags: List[str]) -> str:
+    """One sentence per flag, then the redirect."""
+    return " ".join([REFUSALS[f] for f in flags] + [REDIRECT])
+
+
+def apply_safety_refusal(state: GraphState) -> GraphState:
+    """Templated refusal instead of planning, retrieval and answering."""
+    flags = flagged(state)
+
+    # The speculative graph may already have a vector search in flight
+    if state.get("speculation_id"):
+        from graph.speculative import discard_speculation
+        discard_speculation(state["speculation_id"])
+
+    state["plan"] = {"sources": [], "retrieval_fields": [], "comparison_criteria": [], "filters": {}}
+    state["retrieved_docs"] = []
+    state["answer"] = refusal_answer(flags)
+    state["citations"] = []
+    state["step_log"].append({
+        "node": "safety",
+        "input": {"query": state["query"], "safety_flags": flags},
+        "output": {"answer": state["answer"], "skipped_stages": SKIPPED_STAGES},
+        "success": True
+    })
+    logger.info(f"[Safety] Short-circuited {flags}, skipped {SKIPPED_STAGES}")
+    return state
+
+
+def safety_node(state: GraphState) -> GraphState:
+    """Answer flagged queries without running the rest of the pipeline."""
+    return apply_safety_refusal(state)
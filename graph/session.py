@@ -0,0 +1,288 @@
+# graph/session.py
+"""
+Multi-turn session memory for create_graph("session")
+The graph is compiled with a SQLite checkpointer, so each session (thread_id)
+keeps its plan and last candidate set between turns. Follow-ups like
+"cheaper ones?", "only Nike" or "show me more" re-filter, re-sort or re-rank
+the cached candidates instead of running the router, planner and a new
+vector search; the rule-based safety check still runs on every follow-up.
+Re-ranking reads the candidates' vectors back from the vector backend, so
+checkpoints never hold embeddings.
+"""
+
+from graph.state import GraphState
+from graph.retriever import retrieve_products, retrieve_from_web, get_backend
+from graph.retriever.filters import filter_docs
+from graph.router.rules import rule_route, rule_safety_flags, MATERIALS, PRICE_BETWEEN, PRICE_UNDER, PRICE_OVER, PRICE_AROUND
+from graph.strategies import retrieval_router_hybrid
+from graph.nodes import _run_sources_concurrently, SOURCE_TIMEOUTS_S
+from graph.deadline import is_tight, mark_degraded, start_deadline
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+SESSION_DB = os.getenv("SESSION_DB", "./data/sessions.sqlite")
+
+# Candidates cached per fresh search, and docs shown per turn
+SESSION_CANDIDATES = 30
+PAGE_SIZE = 5
+
+MORE_PATTERN = re.compile(r"\b(show me more|more options|more results|any others|other options|next|see more|what else)\b")
+CHEAPER_PATTERN = re.compile(r"\b(cheaper|less expensive|lower price|more affordable)\b")
+PRICIER_PATTERN = re.compile(r"\b(more expensive|pricier|higher end|fancier)\b")
+BRAND_PATTERN = re.compile(r"\b(?:only|just)\s+(?:from\s+|by\s+)?([A-Z][\w'&-]*)")
+
+# Short follow-ups without a structured signal are re-ranked semantically
+FOLLOWUP_LEADS = ("only ", "just ", "what about ", "how about ", "with ", "without ", "and ", "any ", "those ", "the ones ")
+
+# Product words that point back at the cached results rather than naming a new product
+GENERIC_PRODUCTS = {"one", "option", "result", "thing", "item", "product", "kind", "type", "more"}
+
+_checkpointer = None
+
+
+def get_session_checkpointer(db_path: str = SESSION_DB):
+    """SQLite checkpointer shared by every session graph (lazy loading)."""
+    global _checkpointer
+    if _checkpointer is None:
+        import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        _checkpointer = SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+        logger.info(f"[Session] Checkpoints in {db_path}")
+    return _checkpointer
+
+
+def session_config(session_id: str) -> dict:
+    """invoke/stream config selecting a session's checkpoint thread."""
+    return {"configurable": {"thread_id": session_id}}
+
+
+def parse_followup(query: str, session_query: str = "") -> Optional[Dict]:
+    """
+    Rule-based follow-up detection
+
+    Returns:
+        {"filters", "sort", "more", "rerank"} or None for a new search
+    """
+    query_lc = query.lower().strip()
+
+    # Naming a different product ("leather boots" after "running shoes") is a new search
+    product = rule_route(query).constraints.product
+    if product and product not in GENERIC_PRODUCTS and product not in session_query.lower():
+        return None
+
+    filters = {}
+
+    if m := BRAND_PATTERN.search(query):
+        filters["brand"] = [m.group(1)]
+
+    if m := PRICE_BETWEEN.search(query_lc):
+        filters["min_price"], filters["max_price"] = float(m.group(1)), float(m.group(2))
+    elif m := PRICE_UNDER.search(query_lc):
+        filters["max_price"] = float(m.group(1))
+    elif m := PRICE_OVER.search(query_lc):
+        filters["min_price"] = float(m.group(1))
+    elif m := PRICE_AROUND.search(query_lc):
+        filters["min_price"], filters["max_price"] = round(float(m.group(1)) * 0.9, 2), round(float(m.group(1)) * 1.1, 2)
+
+    if material := next((m for m in MATERIALS if re.search(rf"\b{m}\b", query_lc)), None):
+        filters["material"] = material
+
+    sort = None
+    if CHEAPER_PATTERN.search(query_lc):
+        sort = "price_asc"
+    elif PRICIER_PATTERN.search(query_lc):
+        sort = "price_desc"
+
+    more = bool(MORE_PATTERN.search(query_lc))
+    lead = query_lc.startswith(FOLLOWUP_LEADS)
+
+    if not (filters or sort or more or lead):
+        return None
+
+    return {
+        "filters": filters,
+        "sort": sort,
+        "more": more,
+        # Nothing structured to apply: re-rank by similarity to the refined query
+        "rerank": lead and not (filters or sort or more),
+    }
+
+
+def _doc_key(doc: Dict) -> str:
+    return str(doc.get("doc_id") or doc.get("title"))
+
+
+def refine_candidates(state: GraphState, refinement: Dict) -> List[Dict]:
+    """Apply a follow-up to the cached candidates and return the next page."""
+    candidates = state.get("session_candidates", [])
+    shown = set(state.get("session_shown", []))
+    filters = {**state.get("session_filters", {}), **refinement["filters"]}
+
+    ranked = list(range(len(candidates)))
+
+    if refinement["rerank"] and candidates:
+        q_emb = get_backend().encode([f"{state.get('session_query', '')} {state['query']}"])[0]
+        emb = candidate_vectors(candidates)
+        scores = emb @ (q_emb / (np.linalg.norm(q_emb) or 1.0))
+        ranked = [int(i) for i in np.argsort(-scores)]
+
+    docs = filter_docs([candidates[i] for i in ranked], filters)
+
+    shown_prices = [float(d.get("price") or 0) for d in candidates if _doc_key(d) in shown]
+    if refinement["sort"] == "price_asc":
+        cheaper = [d for d in docs if shown_prices and float(d.get("price") or 0) < min(shown_prices)]
+        docs = sorted(cheaper or docs, key=lambda d: float(d.get("price") or 0))
+    elif refinement["sort"] == "price_desc":
+        pricier = [d for d in docs if shown_prices and float(d.get("price") or 0) > max(shown_prices)]
+        docs = sorted(pricier or docs, key=lambda d: float(d.get("price") or 0), reverse=True)
+
+    if refinement["more"]:
+        docs = [d for d in docs if _doc_key(d) not in shown]
+
+    state["session_filters"] = filters
+    return docs[:PAGE_SIZE]
+
+
+def candidate_vectors(candidates: List[Dict]) -> np.ndarray:
+    """
+    Embeddings aligned with candidates: indexed products are read back from the
+    backend, only the rest (web results) are encoded.
+    """
+    backend = get_backend()
+    stored = backend.vectors([str(d["doc_id"]) for d in candidates if d.get("doc_id") is not None])
+    missing = [i for i, d in enumerate(candidates) if str(d.get("doc_id")) not in stored]
+    encoded = backend.encode([candidates[i].get("content") or candidates[i].get("title", "") for i in missing]) if missing else []
+    vectors = [stored.get(str(d.get("doc_id"))) for d in candidates]
+    for i, vector in zip(missing, encoded):
+        vectors[i] = vector
+    emb = np.asarray(vectors, dtype="float32")
+    return emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+
+def _cache_candidates(state: GraphState, candidates: List[Dict], page: List[Dict]) -> int:
+    """Store the candidate set for later turns (vectors stay in the backend)."""
+    state["session_query"] = state["query"]
+    state["session_candidates"] = candidates
+    state["session_filters"] = {}
+    state["session_shown"] = [_doc_key(d) for d in page]
+    return len(candidates)
+
+
+# ============================================================================
+# Nodes
+# ============================================================================
+
+def followup_node(state: GraphState) -> GraphState:
+    """Decide whether this turn refines the cached candidates or starts a new search."""
+    # A budget applies per turn, not to the whole session: restart the clock here,
+    # so the safety check below counts against it
+    state["deadline"] = None
+    start_deadline(state)
+
+    cached = len(state.get("session_candidates") or [])
+    state["refinement"] = parse_followup(state["query"], state.get("session_query", "")) if cached else None
+    # Refinements skip the router, so they get its rule-based safety check here
+    state["safety_flags"] = rule_safety_flags(state["query"].lower())
+
+    state["step_log"].append({
+        "node": "followup",
+        "input": state["query"],
+        "output": {"refinement": state["refinement"], "cached_candidates": cached, "safety_flags": state["safety_flags"]},
+        "success": True
+    })
+    return state
+
+
+def refine_node(state: GraphState) -> GraphState:
+    """Re-filter / re-sort / re-rank / paginate cached candidates, no vector search."""
+    try:
+        docs = refine_candidates(state, state["refinement"])
+        state["retrieved_docs"] = docs
+        state["session_shown"] = state.get("session_shown", []) + [
+            _doc_key(d) for d in docs if _doc_key(d) not in state.get("session_shown", [])
+        ]
+        state["step_log"].append({
+            "node": "refine",
+            "input": {"query": state["query"], "refinement": state["refinement"]},
+            "output": {
+                "num_docs": len(docs),
+                "candidates": len(state.get("session_candidates", [])),
+                "filters": state["session_filters"],
+                "vector_search": False,
+                "top_results": [
+                    {"title": d["title"], "price": d["price"]}
+                    for d in docs[:3]
+                ]
+            },
+            "success": True
+        })
+    except Exception as e:
+        logger.error(f"Refine error: {e}", exc_info=True)
+        state["retrieved_docs"] = []
+        state["step_log"].append({
+            "node": "refine",
+            "error": str(e),
+            "success": False
+        })
+    return state
+
+
+def session_retriever_node(state: GraphState) -> GraphState:
+    """Fresh retrieval per the plan, caching a wider candidate set for follow-ups."""
+    try:
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+        mode = retrieval_router_hybrid(state)
+        skip_web = mode == "hybrid" and is_tight(state, "web")
+
+        sources = {}
+        if mode != "web_only":
+            sources["rag"] = lambda: retrieve_products(query, filters, k=SESSION_CANDIDATES)
+        if mode == "web_only" or (mode == "hybrid" and not skip_web):
+            sources["web"] = lambda: retrieve_from_web(query, filters, k=PAGE_SIZE if mode == "web_only" else 2)
+
+        results, dropped, latency_ms = _run_sources_concurrently(sources, SOURCE_TIMEOUTS_S)
+        rag_docs = results.get("rag", [])
+        web_docs = results.get("web", [])
+
+        rag_k = 3 if mode == "hybrid" else PAGE_SIZE
+        page = rag_docs[:rag_k] + web_docs
+        state["retrieved_docs"] = page
+        cached = _cache_candidates(state, rag_docs + web_docs, page)
+
+        state["step_log"].append({
+            "node": "session_retriever",
+            "input": {"query": query, "filters": filters},
+            "output": {
+                "num_docs": len(page),
+                "mode": mode,
+                "cached_candidates": cached,
+                "dropped_sources": dropped,
+                "latency_ms": latency_ms,
+                "top_results": [
+                    {"title": d["title"], "price": d["price"], "source": d.get("source")}
+                    for d in page[:5]
+                ]
+            },
+            "success": True
+        })
+        if skip_web:
+            mark_degraded(state, "skip_web")
+
+    except Exception as e:
+        logger.error(f"Session Retriever error: {e}", exc_info=True)
+        state["retrieved_docs"] = []
+        state["step_log"].append({
+            "node": "session_retriever",
+            "error": str(e),
+            "success": False
+        })
+
+    return state
@@ -0,0 +1,201 @@
+# graph/speculative.py
+"""
+Speculative retrieval for create_graph("speculative")
+
+The speculative search is an unfiltered ANN query, so it can start as soon
+as the query arrives and overlap with the router and planner LLM calls.
+When the plan lands, its filters are applied to the speculative candidates
+with filter_docs; a fresh search only runs if too few candidates survive,
+and its results go through the same filter_docs pass so both paths return
+the same filter semantics.
+
+Callers that know the query early (the voice pipeline, on a stable partial
+transcript) can start the speculation themselves with route=True and pass
+its speculation_id in the initial state: the router LLM call then overlaps
+the rest of the utterance too, and speculative_router_node uses its result.
+"""
+
+from graph.state import GraphState
+from graph.retriever import retrieve_from_web, get_backend
+from graph.retriever.filters import filter_docs
+from graph.strategies import retrieval_router_hybrid
+from graph.router import get_router_chain
+from graph.nodes import _run_sources_concurrently, SOURCE_TIMEOUTS_S, router_node, apply_router_result, apply_rule_router
+from graph.deadline import is_tight, mark_degraded, start_deadline
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Tuple
+import threading
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Wider candidate pool so plan filters still leave enough docs
+SPECULATIVE_K = 20
+
+# Separate from the hybrid retrieval pool: resolve_speculation runs on that
+# pool and blocks on these futures, so sharing one pool could deadlock
+_speculation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative")
+
+# In-flight speculative searches by speculation_id (bounded in case a run dies mid-graph)
+MAX_PENDING = 256
+_pending: "OrderedDict[str, Future]" = OrderedDict()
+# Router results started alongside, same ids
+_routes: "OrderedDict[str, Future]" = OrderedDict()
+_pending_lock = threading.Lock()
+
+
+def _track(registry: OrderedDict, speculation_id: str, future: Future):
+    with _pending_lock:
+        registry[speculation_id] = future
+        while len(registry) > MAX_PENDING:
+            _, stale = registry.popitem(last=False)
+            stale.cancel()
+
+
+def start_speculative_retrieval(query: str, k: int = SPECULATIVE_K, route: bool = False) -> str:
+    """Kick off an unfiltered vector search (and the router chain if route) in the background and return its id."""
+    speculation_id = uuid.uuid4().hex
+    _track(_pending, speculation_id, _speculation_executor.submit(lambda: get_backend().search(query, {}, k)))
+    if route:
+        _track(_routes, speculation_id, _speculation_executor.submit(lambda: get_router_chain().invoke(query)))
+    return speculation_id
+
+
+def resolve_speculation(speculation_id: str, query: str, filters: Dict, k: int, timeout: float) -> Tuple[List[Dict], Dict]:
+    """
+    Apply plan filters to the speculative candidates, falling back to a
+    fresh search when they are missing or too few survive. Both paths
+    apply the plan filters through filter_docs.
+
+    Returns:
+        (docs, info for step_log)
+    """
+    with _pending_lock:
+        future = _pending.pop(speculation_id, None)
+
+    info = {"candidates": 0, "speculative_hits": 0, "fresh_search": False}
+
+    if future is not None:
+        try:
+            candidates = future.result(timeout=timeout)
+            docs = filter_docs(candidates, filters, k)
+            info.update(candidates=len(candidates), speculative_hits=len(docs))
+            if len(docs) >= k:
+                return docs, info
+            info["reason"] = f"only {len(docs)}/{k} candidates match plan filters"
+        except Exception as e:
+            info["reason"] = f"speculation failed: {e!r}"
+    else:
+        info["reason"] = "no speculation in flight"
+
+    logger.info(f"[Speculative] Fresh search ({info['reason']})")
+    info["fresh_search"] = True
+    candidates = get_backend().search(query, filters, SPECULATIVE_K)
+    return filter_docs(candidates, filters, k), info
+
+
+def discard_speculation(speculation_id: str):
+    """Drop a speculation whose results won't be used (web-only plans)."""
+    with _pending_lock:
+        futures = [_pending.pop(speculation_id, None), _routes.pop(speculation_id, None)]
+    for future in futures:
+        if future is not None:
+            future.cancel()
+
+
+def speculate_node(state: GraphState) -> GraphState:
+    """Start the vector search before routing and planning (unless the caller already did)."""
+    start_deadline(state)
+    started_early = bool(state.get("speculation_id"))
+    if not started_early:
+        state["speculation_id"] = start_speculative_retrieval(state["query"])
+    state["step_log"].append({
+        "node": "speculate",
+        "input": state["query"],
+        "output": {"speculation_id": state["speculation_id"], "k": SPECULATIVE_K, "started_early": started_early},
+        "success": True
+    })
+    return state
+
+
+def speculative_router_node(state: GraphState) -> GraphState:
+    """Use the router result started with the speculation, else route normally."""
+    with _pending_lock:
+        future = _routes.pop(state.get("speculation_id", ""), None)
+    if future is None:
+        return router_node(state)
+
+    if is_tight(state, "router") and not future.done():
+        future.cancel()
+        return apply_rule_router(state)
+    try:
+        state = apply_router_result(state, future.result())
+        state["step_log"][-1]["speculative"] = True
+        return state
+    except Exception as e:
+        logger.info(f"[Speculative] Early route failed ({e!r}), routing again")
+        return router_node(state)
+
+
+def speculative_retriever_node(state: GraphState) -> GraphState:
+    """Retrieve per the plan's sources, reusing the speculative candidates for RAG."""
+    speculation_id = state.get("speculation_id", "")
+    try:
+        query = state["query"]
+        filters = state["plan"].get("filters", {})
+        mode = retrieval_router_hybrid(state)
+
+        if mode == "web_only":
+            discard_speculation(speculation_id)
+            docs = retrieve_from_web(query, filters, k=5)
+            state["retrieved_docs"] = docs
+            output = {"num_docs": len(docs), "source": "web"}
+        else:
+            rag_k = 3 if mode == "hybrid" else 5
+            sources = {"rag": lambda: resolve_speculation(speculation_id, query, filters, rag_k, SOURCE_TIMEOUTS_S["rag"])}
+            skip_web = mode == "hybrid" and is_tight(state, "web")
+            if mode == "hybrid" and not skip_web:
+                sources["web"] = lambda: retrieve_from_web(query, filters, k=2)
+
+            results, dropped, latency_ms = _run_sources_concurrently(sources, SOURCE_TIMEOUTS_S)
+            rag_docs, info = results.get("rag", ([], {}))
+            web_docs = results.get("web", [])
+
+            docs = rag_docs + web_docs
+            state["retrieved_docs"] = docs
+            output = {
+                "num_docs": len(docs),
+                "mode": mode,
+                "rag_docs": len(rag_docs),
+                "web_docs": len(web_docs),
+                "dropped_sources": dropped,
+                "latency_ms": latency_ms,
+                **info
+            }
+
+        output["top_results"] = [
+            {"title": d["title"], "price": d["price"], "source": d.get("source")}
+            for d in docs[:5]
+        ]
+        state["step_log"].append({
+            "node": "speculative_retriever",
+            "input": {"query": query, "filters": filters},
+            "output": output,
+            "success": True
+        })
+        if mode == "hybrid" and skip_web:
+            mark_degraded(state, "skip_web")
+
+    except Exception as e:
+        logger.error(f"Speculative Retriever error: {e}", exc_info=True)
+        discard_speculation(speculation_id)
+        state["retrieved_docs"] = []
+        state["step_log"].append({
+            "node": "speculative_retriever",
+            "error": str(e),
+            "success": False
+        })
+
+    return state
@@ -7,6 +7,13 @@ class GraphState(TypedDict):
     # Input
     query: str
     
+    # Optional latency budget (ms); deadline is stamped at graph entry (graph/deadline.py)
+    latency_budget_ms: float
+    deadline: float
+    
+    # Speculative graph: id of the vector search started before routing
+    speculation_id: str
+    
     # Router outputs
     task: str  # One of: "product_search", "comparison", "recommendation", "availability_check"
     constraints: dict  # Contains: product, min_price, max_price, material, brand
@@ -18,10 +25,23 @@ class GraphState(TypedDict):
     # Retriever outputs
     retrieved_docs: List[dict]
     
+    # Answerer prompt packing report (prompt_tokens, context_tokens, per_doc_tokens)
+    answer_context: dict
+    
+    # Stream answer text as it is generated (graph.stream(..., stream_mode="custom") gets {"answer_delta"})
+    stream_answer: bool
+    
     # Answerer outputs
     answer: str
     citations: List[str]
     
+    # Session memory (create_graph("session"), persisted by the checkpointer)
+    session_query: str  # Query that produced the cached candidates
+    session_candidates: List[dict]
+    session_filters: dict  # Refinement filters accumulated since the last search
+    session_shown: List[str]  # Doc ids already shown, for pagination
+    refinement: dict  # This turn's parsed follow-up, None for a new search
+    
     # Logging
     # step_log: Annotated[List[dict], operator.add]  # Accumulate logs
     step_log: List[dict] 
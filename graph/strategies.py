@@ -5,6 +5,7 @@ All conditional logic in one place
 """
 
 from graph.state import GraphState
+from graph.safety import record_check
 import logging
 
 logger = logging.getLogger(__name__)
@@ -80,4 +81,43 @@ def retrieval_router_autonomous(state: GraphState) -> str:
     elif not state.get("answer"):
         return "answer"
     else:
-        return "done"
\ No newline at end of file
+        return "done"
+
+# ============================================================================
+# Session Follow-up Router
+# ============================================================================
+
+def session_router(state: GraphState) -> str:
+    """
+    Reuse cached candidates for follow-ups, otherwise run the full pipeline
+    
+    Returns:
+        "refine" | "new_search" | "refuse" (flagged follow-up)
+    """
+    if state.get("refinement"):
+        if record_check(state):
+            logger.info(f"🛑 Safety: Short-circuiting flagged follow-up {state.get('safety_flags')}")
+            return "refuse"
+        logger.info("♻️ Session: Refining cached candidates")
+        return "refine"
+    else:
+        logger.info("🆕 Session: New search")
+        return "new_search"
+
+
+# ============================================================================
+# Safety Short-circuit Router
+# ============================================================================
+
+def safety_router(state: GraphState) -> str:
+    """
+    Send flagged queries straight to the templated refusal
+    
+    Returns:
+        "refuse" | "continue"
+    """
+    if record_check(state):
+        logger.info(f"🛑 Safety: Short-circuiting flagged query {state.get('safety_flags')}")
+        return "refuse"
+    else:
+        return "continue"
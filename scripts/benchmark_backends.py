@@ -0,0 +1,129 @@
+"""
+Cross-backend retrieval benchmark
+Runs the same query set against each vector backend and reports
+latency, memory and overlap@k between backends
+
+Usage:
+    python scripts/benchmark_backends.py
+    python scripts/benchmark_backends.py --backends faiss chroma --k 5 --queries queries.txt
+"""
+
+import sys
+import time
+import argparse
+import resource
+from itertools import combinations
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.retriever.backends import get_backend, BACKENDS
+
+DEFAULT_QUERIES = [
+    "organic shampoo under $20",
+    "stainless steel kettle between $20 and $40",
+    "Nike shoes around $80",
+    "recommend longboard under $1000",
+    "puzzles around $18",
+    "wooden toys for toddlers",
+    "science kit for kids",
+    "bluetooth speaker",
+]
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (Linux), falling back to peak RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def overlap_at_k(a, b, k: int) -> float:
+    """Fraction of shared doc ids between two top-k result lists"""
+    ids_a = {str(d["doc_id"]) for d in a[:k]}
+    ids_b = {str(d["doc_id"]) for d in b[:k]}
+    return len(ids_a & ids_b) / k if k else 0.0
+
+
+def benchmark_backend(name: str, queries, k: int) -> dict:
+    """Load one backend, then time single and batched search over the query set"""
+    backend = get_backend(name)
+    filters_list = [{} for _ in queries]
+
+    rss_before = current_rss_mb()
+    t0 = time.perf_counter()
+    stats = backend.stats()  # forces index + model load
+    load_s = time.perf_counter() - t0
+    rss_loaded = current_rss_mb()
+
+    # Warm up encoder
+    backend.search(queries[0], {}, k)
+
+    latencies = []
+    results = []
+    for query in queries:
+        t0 = time.perf_counter()
+        results.append(backend.search(query, {}, k))
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    backend.search_batch(queries, filters_list, k)
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    return {
+        "name": name,
+        "stats": stats,
+        "load_s": load_s,
+        "rss_mb": rss_loaded - rss_before,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "batch_ms_per_query": batch_ms / len(queries),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector backends on a shared query set")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--queries", type=Path, help="Text file with one query per line")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.queries:
+        queries = [q.strip() for q in args.queries.read_text().splitlines() if q.strip()]
+    else:
+        queries = DEFAULT_QUERIES
+
+    print(f"Benchmarking {args.backends} on {len(queries)} queries (k={args.k})\n")
+
+    reports = [benchmark_backend(name, queries, args.k) for name in args.backends]
+
+    print(f"{'backend':<8} {'vectors':>8} {'dim':>5} {'load s':>7} {'RSS MB':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'batch ms/q':>11}")
+    for r in reports:
+        print(f"{r['name']:<8} {r['stats'].get('num_vectors', 0):>8} {r['stats'].get('dim', 0):>5} "
+              f"{r['load_s']:>7.1f} {r['rss_mb']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['batch_ms_per_query']:>11.1f}")
+
+    for a, b in combinations(reports, 2):
+        overlaps = [overlap_at_k(ra, rb, args.k) for ra, rb in zip(a["results"], b["results"])]
+        print(f"\noverlap@{args.k} {a['name']} vs {b['name']}: {sum(overlaps) / len(overlaps):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-call overhead of MCP web search: pooled vs unpooled sessions
+Unpooled opens a fresh transport + ClientSession (and, for stdio, spawns
+the server) for every call; pooled reuses the warm sessions in
+graph/retriever/mcp_pool.py. Also reports pooled throughput under concurrency.
+
+Runs against the local stub server (scripts/mcp_stub_server.py over stdio)
+unless MCP_SERVER_URL or MCP_SERVER_COMMAND is set.
+
+Usage:
+    python scripts/benchmark_mcp.py
+    python scripts/benchmark_mcp.py --calls 50 --concurrency 32
+    MCP_SERVER_URL=http://127.0.0.1:8766/mcp python scripts/benchmark_mcp.py
+"""
+
+import os
+import sys
+import shlex
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+if not os.getenv("MCP_SERVER_URL"):
+    os.environ.setdefault("MCP_SERVER_COMMAND", shlex.join([sys.executable, str(Path(__file__).parent / "mcp_stub_server.py")]))
+
+from graph.retriever.mcp_pool import (
+    open_transport, tool_result_json, acall_tool, get_mcp_pool, get_mcp_stats, close_mcp_pool
+)
+from graph.retriever.web_client import submit
+from graph.retriever.web_providers import MCP_SEARCH_TOOL
+
+QUERIES = ["organic shampoo", "stainless steel kettle", "running shoes", "jigsaw puzzle"]
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def unpooled_call(query: str):
+    """What a naive integration does: connect, initialize, call, disconnect"""
+    from mcp import ClientSession
+    async with open_transport() as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            return tool_result_json(await session.call_tool(MCP_SEARCH_TOOL, {"query": query, "num": 10}))
+
+
+async def time_calls(call, n: int) -> list:
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        await call(QUERIES[i % len(QUERIES)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def pooled_throughput(total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await acall_tool(MCP_SEARCH_TOOL, {"query": QUERIES[i % len(QUERIES)], "num": 10})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def report(label: str, latencies: list):
+    print(f"  {label:<10} mean {sum(latencies) / len(latencies):>8.1f}ms | "
+          f"p50 {percentile(latencies, 50):>8.1f}ms | p95 {percentile(latencies, 95):>8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs unpooled MCP tool calls")
+    parser.add_argument("--calls", type=int, default=20, help="Sequential calls per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent pooled calls for throughput")
+    args = parser.parse_args()
+
+    # Warm the pool before timing; the unpooled path pays this on every call
+    start = time.perf_counter()
+    submit(get_mcp_pool().start()).result()
+    print(f"Pool warm-up: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    # Unpooled sessions run on the same loop as the pool for a like-for-like comparison
+    unpooled = submit(time_calls(unpooled_call, args.calls)).result()
+    pooled = asyncio.run(time_calls(lambda q: acall_tool(MCP_SEARCH_TOOL, {"query": q, "num": 10}), args.calls))
+
+    print(f"\n{args.calls} sequential {MCP_SEARCH_TOOL} calls:")
+    report("unpooled", unpooled)
+    report("pooled", pooled)
+    print(f"  overhead saved per call: {percentile(unpooled, 50) - percentile(pooled, 50):.1f}ms (p50)")
+
+    qps = asyncio.run(pooled_throughput(args.calls * 10, args.concurrency))
+    print(f"\nPooled throughput at concurrency {args.concurrency}: {qps:.1f} calls/s")
+    print(f"Pool stats: {get_mcp_stats()}")
+    close_mcp_pool()
+
+
+if __name__ == "__main__":
+    main()
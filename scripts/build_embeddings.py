@@ -0,0 +1,177 @@
+"""
+Build the FAISS backend artifacts locally from data/amazon_enriched.parquet
+Replaces the Google Drive download of data_cleaned.csv / text_emb.pt
+
+Each build goes to its own directory under data/faiss/builds/ (or --out-dir):
+- catalog.parquet   rows in the rag1 schema (uniq_id, product_name, selling_price, ..., summary)
+- embeddings.npy    L2-normalized float16 matrix, np.load(..., mmap_mode="r") friendly
+then data/faiss/manifest.json (model, dim, rows, dtype, checksum and the
+build's file paths) is atomically replaced to point at it. Build directories
+are never modified after the swap, so a reader that loaded the previous
+manifest keeps a consistent pair of files; the previous build is kept for
+such readers and older ones are pruned.
+
+Rows whose embedding text is unchanged reuse the vectors of the previous build.
+
+Usage:
+    python scripts/build_embeddings.py
+    python scripts/build_embeddings.py --batch-size 64 --out-dir data/faiss
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+from graph.retriever.rag1 import EMBED_MODEL, MANIFEST_NAME, FAISS_DIR, file_checksum
+
+CATALOG_NAME = "catalog.parquet"
+EMBEDDINGS_NAME = "embeddings.npy"
+EMB_DTYPE = "float16"
+BUILDS_DIR = "builds"
+# Builds kept on disk: the current one plus the previous one for in-flight readers
+KEEP_BUILDS = 2
+
+
+def _parse_price(price) -> float:
+    """'$1,299.99' -> 1299.99; ranges and junk -> 0.0"""
+    try:
+        return float(str(price).replace(",", "").replace("₹", "").replace("$", ""))
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def build_catalog(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the enriched Amazon dataset to the rag1 catalog schema"""
+    text = df[["Product Name", "About Product", "category", "brand", "material"]].fillna("").astype(str)
+    rich_description = (
+        text["Product Name"]
+        + ". Category: " + text["category"]
+        + ". Brand: " + text["brand"]
+        + ". Material: " + text["material"]
+        + ". " + text["About Product"]
+    )
+
+    catalog = pd.DataFrame({
+        "uniq_id": df["Uniq Id"].astype(str),
+        "product_name": df["Product Name"],
+        "selling_price": df["Selling Price"].map(_parse_price),
+        "category": df["category"],
+        "brand": df["brand"],
+        "material": df["material"],
+        "rich_description": rich_description,
+        # Prompt text for the answerer (scripts/summarize_products.py); not embedded
+        "summary": df["summary"] if "summary" in df.columns else None,
+    })
+    catalog["text_hash"] = catalog["rich_description"].map(
+        lambda t: hashlib.sha256(t.encode("utf-8")).hexdigest()
+    )
+    return catalog
+
+
+def load_cached_vectors(out_dir: Path, model_name: str) -> dict:
+    """text_hash -> vector from the previous build (if it used the same model)"""
+    manifest_path = out_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("model") != model_name:
+        print(f"Previous build used {manifest.get('model')}, re-encoding everything")
+        return {}
+
+    old_catalog = pd.read_parquet(out_dir / manifest["catalog"], columns=["text_hash"])
+    old_emb = np.load(out_dir / manifest["embeddings"], mmap_mode="r")
+    return {h: old_emb[i] for i, h in enumerate(old_catalog["text_hash"])}
+
+
+def build_embeddings(data_path: Path, out_dir: Path, batch_size: int = 32, model_name: str = EMBED_MODEL) -> dict:
+    """
+    Encode the catalog, reusing cached vectors, and write catalog/embeddings/manifest
+
+    Returns:
+        The manifest dict
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    catalog = build_catalog(pd.read_parquet(data_path))
+    cached = load_cached_vectors(out_dir, model_name)
+
+    missing = [i for i, h in enumerate(catalog["text_hash"]) if h not in cached]
+    print(f"{len(catalog)} products: {len(catalog) - len(missing)} cached, {len(missing)} to encode")
+
+    new_vectors = {}
+    if missing:
+        model = SentenceTransformer(model_name, trust_remote_code=True)
+        start = time.perf_counter()
+        texts = catalog["rich_description"].iloc[missing].tolist()
+        encoded = model.encode(texts, batch_size=batch_size, normalize_embeddings=True, show_progress_bar=True)
+        new_vectors = dict(zip(missing, encoded))
+        elapsed = time.perf_counter() - start
+        print(f"Encoded {len(missing)} products in {elapsed:.1f}s ({len(missing) / max(elapsed, 1e-9):.1f} rows/s)")
+
+    if not len(catalog):
+        raise ValueError(f"❌ {data_path} has no products to embed")
+    dim = len(next(iter(new_vectors.values()))) if new_vectors else len(next(iter(cached.values())))
+    emb = np.empty((len(catalog), dim), dtype=EMB_DTYPE)
+    for i, h in enumerate(catalog["text_hash"]):
+        emb[i] = new_vectors[i] if i in new_vectors else cached[h]
+
+    # Fresh build directory, written completely before anything points at it
+    build_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    build_dir = out_dir / BUILDS_DIR / build_id
+    build_dir.mkdir(parents=True)
+    with open(build_dir / EMBEDDINGS_NAME, "wb") as f:
+        np.save(f, emb)
+    catalog.to_parquet(build_dir / CATALOG_NAME, index=False)
+
+    manifest = {
+        "model": model_name,
+        "dim": int(dim),
+        "rows": int(len(catalog)),
+        "dtype": EMB_DTYPE,
+        "normalized": True,
+        "build": build_id,
+        "catalog": f"{BUILDS_DIR}/{build_id}/{CATALOG_NAME}",
+        "embeddings": f"{BUILDS_DIR}/{build_id}/{EMBEDDINGS_NAME}",
+        "checksum": file_checksum(str(build_dir / EMBEDDINGS_NAME)),
+        "source": str(data_path),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # The pointer swap: readers see either the old build or the new one, never a mix
+    tmp_manifest = out_dir / (MANIFEST_NAME + ".tmp")
+    tmp_manifest.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_manifest, out_dir / MANIFEST_NAME)
+
+    prune_builds(out_dir)
+    print(f"✓ Wrote {len(catalog)}x{dim} {EMB_DTYPE} embeddings to {out_dir}")
+    return manifest
+
+
+def prune_builds(out_dir: Path, keep: int = KEEP_BUILDS):
+    """Delete all but the newest `keep` build directories (ids sort chronologically)"""
+    builds = sorted(p for p in (out_dir / BUILDS_DIR).iterdir() if p.is_dir())
+    for old in builds[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build local FAISS embeddings for the rag1 backend")
+    parser.add_argument("--data", type=Path, default=Path("data/amazon_enriched.parquet"))
+    parser.add_argument("--out-dir", type=Path, default=Path(FAISS_DIR))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model", default=EMBED_MODEL,
+                        help="Encoder to build with; the FAISS loader reads it back from the manifest")
+    args = parser.parse_args()
+
+    build_embeddings(args.data, args.out_dir, batch_size=args.batch_size, model_name=args.model)
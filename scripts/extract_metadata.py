@@ -21,17 +21,37 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datasets import load_dataset
 from graph.models.llm import get_llm
 from langchain_core.prompts import PromptTemplate
+from typing import List, Dict, Optional, Tuple
+import multiprocessing as mp
+import argparse
+import hashlib
 import json
+import os
 import re
+import time
 import logging
 from tqdm import tqdm
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+METADATA_FIELDS = ["category", "brand", "material"]
+
+# Source fields the LLM reads; a change in any of them invalidates the row's metadata
+HASH_FIELDS = ["Product Name", "About Product", "Product Specification"]
+
+# Checkpoint shards hold only the row key, content hash and extracted fields
+SHARD_COLUMNS = ["Uniq Id", "content_hash"] + METADATA_FIELDS
+SHARD_SCHEMA = pa.schema([(col, pa.string()) for col in SHARD_COLUMNS])
+
+# The JSON answer is ~40 tokens; don't pay for the pipeline's default 128
+EXTRACTION_MAX_NEW_TOKENS = 64
+
 # Extraction prompt
 EXTRACTION_TEMPLATE = """<|im_start|>system
 You extract structured product metadata from text. Return ONLY valid JSON.<|im_end|>
@@ -64,7 +84,7 @@ extraction_prompt = PromptTemplate(
 
 
 def extract_json_from_llm(text: str) -> dict:
-    """Extract JSON from LLM output"""
+    """Extract JSON from LLM output (empty dict if there is none)"""
     text = text.strip()
     text = re.sub(r'```json\s*', '', text)
     text = re.sub(r'```\s*', '', text)
@@ -85,16 +105,235 @@ def extract_json_from_llm(text: str) -> dict:
     try:
         return json.loads(text)
     except:
-        return {"category": None, "brand": None, "material": None}
+        return {}
+
+
+# ============================================================================
+# Rule-based pre-pass (fills fields without the LLM when structure suffices)
+# ============================================================================
+
+# "Brand: X" / "Material: Y" entries in the pipe-separated spec / technical details
+SPEC_BRAND_RE = re.compile(r'(?:^|\|)\s*(?:Brand(?:\s*Name)?|Manufacturer)\s*:\s*([^|]+)', re.IGNORECASE)
+SPEC_MATERIAL_RE = re.compile(r'(?:^|\|)\s*Material(?:\s*Type)?\s*:\s*([^|]+)', re.IGNORECASE)
+
+# Materials recognisable from the product title alone (longest first)
+TITLE_MATERIALS = [
+    "stainless steel", "cast iron", "faux leather", "memory foam",
+    "bamboo", "wooden", "wood", "leather", "cotton", "wool", "silicone",
+    "plastic", "glass", "ceramic", "porcelain", "polyester", "nylon",
+    "aluminum", "steel", "metal", "felt", "canvas", "rubber", "foam", "paper",
+]
+_TITLE_MATERIAL_RE = re.compile(r'\b(' + '|'.join(re.escape(m) for m in TITLE_MATERIALS) + r')\b', re.IGNORECASE)
+_MATERIAL_ALIASES = {"wooden": "wood"}
+
+# Leaf-category head nouns too vague to stand in for the product type
+GENERIC_HEADS = {"set", "kit", "supply", "accessory", "product", "item", "other", "more", "part", "tool"}
+_INVARIANT_NOUNS = {"scissors", "pants", "jeans", "shorts", "glasses", "sunglasses", "clothes", "goggles", "tweezers"}
+
+_NULL_VALUES = {"", "n/a", "na", "none", "null", "nan", "unknown", "generic"}
+
+
+def _singularize(word: str) -> str:
+    """Cheap English singular for category head nouns"""
+    if word in _INVARIANT_NOUNS or len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _clean(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    value = str(value).strip()
+    return None if value.lower() in _NULL_VALUES else value
+
+
+def rule_category(category_path) -> Optional[str]:
+    """Head noun of the Amazon category leaf, e.g. '... | Jigsaw Puzzles' -> 'puzzle'"""
+    path = _clean(category_path)
+    if not path:
+        return None
+    leaf = path.split("|")[-1].strip().lower()
+    # "Skates, Skateboards & Scooters" lists several types: not confident
+    if "&" in leaf or "," in leaf or " and " in leaf:
+        return None
+    words = re.findall(r"[a-z]+", leaf)
+    if not words:
+        return None
+    head = _singularize(words[-1])
+    return None if head in GENERIC_HEADS else head
+
+
+def rule_brand(row, known_brands: Dict[str, str]) -> Optional[str]:
+    """Brand from a 'Brand:' spec entry, else a known brand prefixing the title"""
+    for field in ("Product Specification", "Technical Details"):
+        text = _clean(row.get(field))
+        if text:
+            match = SPEC_BRAND_RE.search(text)
+            if match and _clean(match.group(1)):
+                return match.group(1).strip()
+    
+    title = (_clean(row.get("Product Name")) or "").lower()
+    # Longest known brand that the title starts with, on a word boundary
+    for key in sorted(known_brands, key=len, reverse=True):
+        if title.startswith(key) and (len(title) == len(key) or not title[len(key)].isalnum()):
+            return known_brands[key]
+    return None
+
+
+def rule_material(row) -> Optional[str]:
+    """Material from a 'Material:' spec entry, else exactly one material word in the title"""
+    for field in ("Product Specification", "Technical Details"):
+        text = _clean(row.get(field))
+        if text:
+            match = SPEC_MATERIAL_RE.search(text)
+            if match and _clean(match.group(1)):
+                return match.group(1).strip().lower()
+    
+    found = {m.lower() for m in _TITLE_MATERIAL_RE.findall(_clean(row.get("Product Name")) or "")}
+    found = {_MATERIAL_ALIASES.get(m, m) for m in found}
+    # Two different materials in one title is ambiguous: leave it to the LLM
+    return found.pop() if len(found) == 1 else None
+
+
+def apply_rule_prepass(df: pd.DataFrame, known_brands: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, pd.Series, dict]:
+    """
+    Fill category / brand / material from structure where it is unambiguous
+    
+    Args:
+        df: Rows to enrich
+        known_brands: lowercase -> display brand names seen in earlier runs
+    
+    Returns:
+        (df with metadata columns, mask of fully resolved rows, report)
+    """
+    df = df.copy()
+    known_brands = dict(known_brands or {})
+    
+    df["category"] = df["Category"].map(rule_category) if "Category" in df.columns else None
+    df["material"] = [rule_material(row) for _, row in df.iterrows()]
+    
+    # Spec brands first so they can extend the vocabulary for title matching
+    df["brand"] = [rule_brand(row, {}) for _, row in df.iterrows()]
+    for brand in df["brand"].dropna():
+        known_brands.setdefault(brand.lower(), brand)
+    missing = df["brand"].isna()
+    df.loc[missing, "brand"] = [rule_brand(row, known_brands) for _, row in df[missing].iterrows()]
+    
+    resolved = df[METADATA_FIELDS].notna().all(axis=1)
+    total = max(len(df), 1)
+    report = {f"{field}_rate": float(df[field].notna().sum() / total) for field in METADATA_FIELDS}
+    report["llm_calls_avoided"] = float(resolved.sum() / total)
+    
+    return df, resolved, report
+
+
+def load_known_brands(shard_dir: Path) -> Dict[str, str]:
+    """Brand vocabulary from previously enriched shards (lowercase -> display)"""
+    brands = {}
+    for path in _shard_paths(shard_dir):
+        for brand in pq.read_table(path, columns=["brand"]).column("brand").to_pylist():
+            brand = _clean(brand)
+            # Very short names ("DB") match too many title prefixes
+            if brand and len(brand) >= 3:
+                brands.setdefault(brand.lower(), brand)
+    return brands
+
+
+def build_extraction_input(row) -> dict:
+    """Truncated prompt fields for one product row"""
+    return {
+        "product_name": str(row.get("Product Name", ""))[:200],
+        "about_product": str(row.get("About Product", ""))[:300],
+        "product_spec": str(row.get("Product Specification", ""))[:300]
+    }
+
+
+def generate_batch(llm, inputs: List[dict]) -> List[dict]:
+    """
+    Extract metadata for several products with one padded generation call
+    
+    Args:
+        llm: HuggingFacePipeline from get_llm()
+        inputs: Prompt fields from build_extraction_input
+    
+    Returns:
+        One metadata dict per input (empty dict on failure)
+    """
+    pipe = llm.pipeline
+    
+    # Decoder-only models must be left-padded for batched generation
+    pipe.tokenizer.padding_side = "left"
+    if pipe.tokenizer.pad_token is None:
+        pipe.tokenizer.pad_token = pipe.tokenizer.eos_token
+    
+    prompts = [extraction_prompt.format(**x) for x in inputs]
+    
+    try:
+        outputs = pipe(prompts, batch_size=len(prompts), max_new_tokens=EXTRACTION_MAX_NEW_TOKENS)
+        texts = [out[0]["generated_text"] for out in outputs]
+    except Exception as e:
+        # Fall back to one prompt at a time so a single bad row doesn't sink the batch
+        logger.warning(f"Batched generation failed ({e}), retrying {len(prompts)} prompts one by one")
+        texts = []
+        for prompt in prompts:
+            try:
+                texts.append(pipe(prompt, max_new_tokens=EXTRACTION_MAX_NEW_TOKENS)[0]["generated_text"])
+            except Exception as row_error:
+                logger.warning(f"Failed to extract metadata: {row_error}")
+                texts.append("")
+    
+    results = []
+    for text in texts:
+        metadata = extract_json_from_llm(text) if text else {}
+        results.append(metadata if isinstance(metadata, dict) else {})
+    return results
+
+
+def _iter_chunks(df: pd.DataFrame, batch_size: int):
+    """Yield (row labels, prompt inputs) per batch"""
+    for i in range(0, len(df), batch_size):
+        batch = df.iloc[i:i+batch_size]
+        yield list(batch.index), [build_extraction_input(row) for _, row in batch.iterrows()]
+
+
+# Per-process model for multiprocessing workers
+_worker_llm = None
+
+
+def _init_worker(num_threads: int):
+    """Load one model per worker process and pin its torch thread count"""
+    global _worker_llm
+    import torch
+    torch.set_num_threads(num_threads)
+    _worker_llm = get_llm()
+
+
+def _extract_chunk(chunk):
+    """Worker task: run one padded batch"""
+    indices, inputs = chunk
+    return indices, generate_batch(_worker_llm, inputs)
+
+
+def _log_coverage(df: pd.DataFrame):
+    """Show how many rows got each metadata field"""
+    logger.info(f"Categories found: {df['category'].notna().sum()}")
+    logger.info(f"Brands found: {df['brand'].notna().sum()}")
+    logger.info(f"Materials found: {df['material'].notna().sum()}")
 
 
-def extract_metadata_batch(df: pd.DataFrame, batch_size: int = 50) -> pd.DataFrame:
+def extract_metadata_batch(df: pd.DataFrame, batch_size: int = 16) -> pd.DataFrame:
     """
-    Extract metadata for all products using LLM
+    Extract metadata for all products using LLM (in-process, batched)
     
     Args:
         df: DataFrame with product data
-        batch_size: Process in batches to show progress
+        batch_size: Number of prompts per padded generation call
     
     Returns:
         DataFrame with added columns: category, brand, material
@@ -102,55 +341,245 @@ def extract_metadata_batch(df: pd.DataFrame, batch_size: int = 50) -> pd.DataFra
     llm = get_llm()
     
     # Initialize result columns
-    df['category'] = None
-    df['brand'] = None
-    df['material'] = None
-    
-    # Create chain
-    chain = extraction_prompt | llm
+    for field in METADATA_FIELDS:
+        df[field] = None
     
     logger.info(f"Extracting metadata for {len(df)} products...")
+    start = time.perf_counter()
     
-    # Process in batches with progress bar
-    for i in tqdm(range(0, len(df), batch_size), desc="Extracting metadata"):
-        batch = df.iloc[i:i+batch_size]
-        
-        for idx, row in batch.iterrows():
-            try:
-                # Prepare input
-                input_data = {
-                    "product_name": str(row.get("Product Name", ""))[:200],
-                    "about_product": str(row.get("About Product", ""))[:300],
-                    "product_spec": str(row.get("Product Specification", ""))[:300]
-                }
-                
-                # Call LLM
-                result = chain.invoke(input_data)
-                
-                # Parse response
-                metadata = extract_json_from_llm(result)
+    for indices, inputs in tqdm(_iter_chunks(df, batch_size), total=-(-len(df) // batch_size), desc="Extracting metadata"):
+        for idx, metadata in zip(indices, generate_batch(llm, inputs)):
+            for field in METADATA_FIELDS:
+                df.at[idx, field] = metadata.get(field)
+    
+    elapsed_min = (time.perf_counter() - start) / 60
+    logger.info(f"Metadata extraction complete! ({len(df) / max(elapsed_min, 1e-9):.1f} products/min)")
+    _log_coverage(df)
+    
+    return df
+
+
+def add_content_hashes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a content_hash column: sha256 over the fields the LLM reads
+    
+    Rows whose name, about text and specification are unchanged keep
+    the same hash across catalog refreshes, so their metadata is reused.
+    """
+    text = df[HASH_FIELDS].fillna("").astype(str).agg("\x1f".join, axis=1)
+    df["content_hash"] = text.map(lambda t: hashlib.sha256(t.encode("utf-8")).hexdigest())
+    return df
+
+
+def _shard_paths(shard_dir: Path) -> List[Path]:
+    return sorted(shard_dir.glob("part-*.parquet"))
+
+
+def load_enriched_hashes(shard_dir: Path) -> set:
+    """Content hashes already enriched by previous (possibly crashed) runs"""
+    hashes = set()
+    for path in _shard_paths(shard_dir):
+        hashes.update(pq.read_table(path, columns=["content_hash"]).column("content_hash").to_pylist())
+    return hashes
+
+
+def _write_shard(shard_dir: Path, shard_id: int, rows: pd.DataFrame):
+    """Write one checkpoint shard atomically (tmp file + rename)"""
+    path = shard_dir / f"part-{shard_id:05d}.parquet"
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(_to_arrow(rows[SHARD_COLUMNS], SHARD_SCHEMA), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _to_arrow(chunk: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Convert a chunk to an all-string Arrow table so every shard shares one schema"""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        chunk[col] = chunk[col].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def extract_metadata_streaming(
+    df: pd.DataFrame,
+    shard_dir: Path,
+    batch_size: int = 16,
+    workers: int = 1,
+    threads_per_worker: int = 4,
+    shard_size: int = 1000,
+    use_rules: bool = True
+) -> dict:
+    """
+    Extract metadata with batched generation across worker processes,
+    checkpointing results into Parquet shards
+    
+    Rows whose content hash already appears in shard_dir are skipped,
+    so a rerun only extracts new or changed products and a crashed run
+    resumes after its last complete shard.
+    
+    Args:
+        df: DataFrame with product data
+        shard_dir: Directory of part-NNNNN.parquet checkpoint shards
+        batch_size: Number of prompts per padded generation call
+        workers: Worker processes, each with its own model copy
+        threads_per_worker: torch threads per worker
+        shard_size: Rows per checkpoint shard
+        use_rules: Run the rule pre-pass and skip the LLM for fully resolved rows
+    
+    Returns:
+        Run statistics (rows, skipped, failed, seconds, products_per_min, rule report)
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    if "content_hash" not in df.columns:
+        df = add_content_hashes(df)
+    
+    done_hashes = load_enriched_hashes(shard_dir)
+    todo = df[~df["content_hash"].isin(done_hashes)].drop_duplicates("content_hash")
+    skipped = len(df) - len(todo)
+    
+    existing = _shard_paths(shard_dir)
+    next_shard = int(existing[-1].stem.split("-")[1]) + 1 if existing else 0
+    
+    # Rule pre-pass: fully resolved rows are checkpointed without an LLM call
+    rule_report = {}
+    if use_rules:
+        todo, resolved, rule_report = apply_rule_prepass(todo, load_known_brands(shard_dir))
+        logger.info("Rule pre-pass: " + ", ".join(f"{k}={v:.1%}" for k, v in rule_report.items()))
+        if resolved.any():
+            _write_shard(shard_dir, next_shard, todo[resolved])
+            next_shard += 1
+        todo = todo[~resolved]
+    else:
+        todo = todo.copy()
+        for field in METADATA_FIELDS:
+            todo[field] = None
+    
+    logger.info(f"Extracting metadata for {len(todo)} products, {skipped} already enriched "
+                f"(batch_size={batch_size}, workers={workers})...")
+    
+    pool = None
+    chunks = _iter_chunks(todo, batch_size)
+    if workers > 1 and len(todo):
+        # spawn: torch and forked model weights don't mix
+        pool = mp.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(threads_per_worker,))
+        results = pool.imap(_extract_chunk, chunks)
+    elif len(todo):
+        llm = get_llm()
+        results = ((indices, generate_batch(llm, inputs)) for indices, inputs in chunks)
+    else:
+        results = iter(())
+    
+    start = time.perf_counter()
+    done = 0
+    failed = 0
+    found = {field: 0 for field in METADATA_FIELDS}
+    pending = []
+    
+    completed = False
+    try:
+        with tqdm(total=len(todo), desc="Extracting metadata") as pbar:
+            for indices, metadata in results:
+                # Failed generations are not checkpointed, so the next run retries them
+                ok = [bool(m) for m in metadata]
+                failed += ok.count(False)
+                metadata = [m for m, keep in zip(metadata, ok) if keep]
+                chunk = todo.loc[indices].loc[ok].copy()
+                for field in METADATA_FIELDS:
+                    # Rule values win; the LLM only fills what rules left open
+                    llm_values = pd.Series([m.get(field) for m in metadata], index=chunk.index, dtype=object)
+                    chunk[field] = chunk[field].where(chunk[field].notna(), llm_values)
+                    found[field] += int(chunk[field].notna().sum())
+                pending.append(chunk)
                 
-                # Update dataframe
-                df.at[idx, 'category'] = metadata.get('category')
-                df.at[idx, 'brand'] = metadata.get('brand')
-                df.at[idx, 'material'] = metadata.get('material')
+                if sum(len(c) for c in pending) >= shard_size:
+                    _write_shard(shard_dir, next_shard, pd.concat(pending))
+                    next_shard += 1
+                    pending = []
                 
-            except Exception as e:
-                logger.warning(f"Failed to extract metadata for row {idx}: {e}")
-                continue
+                done += len(indices)
+                rate = done / max((time.perf_counter() - start) / 60, 1e-9)
+                pbar.update(len(indices))
+                pbar.set_postfix(products_per_min=f"{rate:.1f}")
+        
+        if pending:
+            _write_shard(shard_dir, next_shard, pd.concat(pending))
+        completed = True
+    finally:
+        if pool is not None:
+            # On an error or Ctrl-C, don't wait for the queued chunks
+            if completed:
+                pool.close()
+            else:
+                pool.terminate()
+            pool.join()
     
-    logger.info("Metadata extraction complete!")
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": done,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": elapsed,
+        "products_per_min": done / max(elapsed / 60, 1e-9),
+        **rule_report,
+    }
     
-    # Show statistics
-    logger.info(f"Categories found: {df['category'].notna().sum()}")
-    logger.info(f"Brands found: {df['brand'].notna().sum()}")
-    logger.info(f"Materials found: {df['material'].notna().sum()}")
+    logger.info(f"Metadata extraction complete! {done} products in {elapsed:.1f}s "
+                f"({stats['products_per_min']:.1f} products/min), {skipped} reused, {failed} failed (retried next run)")
+    logger.info(f"Categories found: {found['category']}")
+    logger.info(f"Brands found: {found['brand']}")
+    logger.info(f"Materials found: {found['material']}")
     
-    return df
+    return stats
+
+
+def assemble_enriched(df: pd.DataFrame, shard_dir: Path, output_path: Path) -> pd.DataFrame:
+    """
+    Join the current catalog with enriched metadata from all shards
+    
+    Metadata is matched by content hash, so unchanged products pick up
+    earlier results while other columns (price, URL, ...) stay current.
+    Summaries that scripts/summarize_products.py added to a previous
+    output_path are carried over the same way.
+    """
+    if "content_hash" not in df.columns:
+        df = add_content_hashes(df)
+    
+    shards = [pd.read_parquet(path) for path in _shard_paths(shard_dir)]
+    enriched = pd.concat(shards) if shards else pd.DataFrame(columns=SHARD_COLUMNS)
+    enriched = enriched.drop_duplicates("content_hash", keep="last")[["content_hash"] + METADATA_FIELDS]
+    
+    df_enriched = df.drop(columns=[f for f in METADATA_FIELDS if f in df.columns]).merge(
+        enriched, on="content_hash", how="left"
+    )
+    
+    previous_columns = pq.read_schema(output_path).names if output_path.exists() else []
+    if "summary" not in df_enriched.columns and {"content_hash", "summary"} <= set(previous_columns):
+        summaries = pd.read_parquet(output_path, columns=["content_hash", "summary"]).drop_duplicates("content_hash", keep="last")
+        df_enriched = df_enriched.merge(summaries, on="content_hash", how="left")
+        missing = int(df_enriched["summary"].isna().sum())
+        if missing:
+            logger.info(f"{missing} new or changed products have no summary; run scripts/summarize_products.py")
+    
+    df_enriched.to_parquet(output_path, index=False)
+    return df_enriched
 
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Enrich Amazon products with LLM-extracted metadata")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N products")
+    parser.add_argument("--batch-size", type=int, default=16, help="Prompts per padded generation call")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (each loads its own model copy)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Rows per checkpoint shard")
+    parser.add_argument("--no-rules", action="store_true", help="Send every row to the LLM")
+    parser.add_argument("--shard-dir", type=Path, default=Path("data/enriched_shards"))
+    parser.add_argument("--output", type=Path, default=Path("data/amazon_enriched.parquet"))
+    args = parser.parse_args()
+    if args.threads_per_worker is None:
+        # Split the cores between workers so they don't oversubscribe
+        args.threads_per_worker = max(1, (os.cpu_count() or 1) // max(1, args.workers))
     
     # Load data
     logger.info("Loading Amazon dataset...")
@@ -158,15 +587,26 @@ def main():
     df = df.to_pandas()
     
     # Optional: Process subset for testing
-    df = df.head(50)  # Uncomment to test on 50 products first
+    if args.limit:
+        df = df.head(args.limit)
+    
+    df = add_content_hashes(df)
     
-    # Extract metadata
-    df_enriched = extract_metadata_batch(df)
+    # Extract metadata, checkpointing into shards (resumes from existing shards)
+    extract_metadata_streaming(
+        df,
+        args.shard_dir,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        shard_size=args.shard_size,
+        use_rules=not args.no_rules
+    )
     
     # Save enriched dataset
-    output_path = Path("data/amazon_enriched.parquet")
+    output_path = args.output
     output_path.parent.mkdir(exist_ok=True)
-    df_enriched.to_parquet(output_path, index=False)
+    df_enriched = assemble_enriched(df, args.shard_dir, output_path)
     
     logger.info(f"Enriched dataset saved to {output_path}")
     
@@ -3,15 +3,35 @@ Data indexing script for Amazon Product Dataset 2020
 Uses pre-extracted metadata from extract_metadata.py
 """
 
-import pandas as pd
+import sys
+import time
+import argparse
+import resource
 from pathlib import Path
-from langchain_huggingface import HuggingFaceEmbeddings
+from typing import List
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+import pyarrow.parquet as pq
+from sentence_transformers import SentenceTransformer
 from langchain_chroma import Chroma
+from graph.retriever.rag import normalize_metadata, get_schema_version, METADATA_SCHEMA_VERSION, EMBED_MODEL
+
+
+DATA_PATH = Path("data/amazon_enriched.parquet")
+
+EMBED_COLUMNS = ["Product Name", "About Product", "Product Specification"]
+INDEX_COLUMNS = ["Uniq Id"] + EMBED_COLUMNS + ["Selling Price", "category", "brand", "material"]
+
+# Added by scripts/summarize_products.py; indexed as metadata when present
+OPTIONAL_COLUMNS = ["summary"]
 
 
 def load_enriched_data():
     """Load enriched dataset with metadata"""
-    data_path = Path("data/amazon_enriched.parquet")
+    data_path = DATA_PATH
     
     if not data_path.exists():
         raise FileNotFoundError(
@@ -22,59 +42,181 @@ def load_enriched_data():
     return df
 
 
-def index_products(df: pd.DataFrame = None, persist_directory: str = "./chroma_db"):
+def iter_product_chunks(data_path: Path = DATA_PATH, chunk_rows: int = 2048):
+    """Stream the enriched Parquet file in record batches of at most chunk_rows"""
+    if not data_path.exists():
+        raise FileNotFoundError(
+            "Enriched data not found. Run 'python scripts/extract_metadata.py' first!"
+        )
+    
+    parquet_file = pq.ParquetFile(data_path)
+    columns = INDEX_COLUMNS + [c for c in OPTIONAL_COLUMNS if c in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def build_embed_texts(df: pd.DataFrame) -> List[str]:
+    """Embedding text per product, built with vectorized string ops"""
+    cols = df[EMBED_COLUMNS].fillna("").astype(str)
+    texts = (
+        "Product Name: " + cols["Product Name"]
+        + ". About Product: " + cols["About Product"]
+        + ". Product Specification: " + cols["Product Specification"]
+    )
+    return texts.tolist()
+
+
+def build_metadatas(df: pd.DataFrame) -> List[dict]:
+    """Normalized Chroma metadata per product"""
+    columns = ["Uniq Id", "Product Name", "Selling Price", "category", "brand", "material"]
+    columns += [c for c in OPTIONAL_COLUMNS if c in df.columns]
+    records = df[columns].fillna("").to_dict("records")
+    return [normalize_metadata(r) for r in records]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def index_products(
+    df: pd.DataFrame = None,
+    persist_directory: str = "./chroma_db",
+    chunk_rows: int = 2048,
+    batch_size: int = 64,
+    workers: int = 1,
+    data_path: Path = DATA_PATH
+):
     """
     Index products into vector database with rich metadata
+    
+    Streams the catalog chunk by chunk: build texts and metadata,
+    encode (optionally across worker processes), then bulk-upsert
+    the chunk into Chroma, so peak memory is bounded by chunk_rows.
+    
+    Args:
+        df: Optional in-memory catalog; streamed from data_path if None
+        persist_directory: Chroma directory
+        chunk_rows: Rows per streamed chunk (keep below Chroma's max batch size)
+        batch_size: Encoder batch size
+        workers: Encoder processes (sentence-transformers multi-process pool)
+        data_path: Enriched Parquet file
     """
-    if df is None:
-        df = load_enriched_data()
-    
-    # Select columns for embedding
-    useful_columns = ["Product Name", "About Product", "Product Specification"]
-    df_embed = df[['Uniq Id'] + useful_columns + ['Selling Price', 'category', 'brand', 'material']].copy()
-    df_embed = df_embed.fillna("")
-    
-    # Create embedding text
-    df_embed['embed_text'] = df_embed.apply(
-        lambda x: f"Product Name: {x['Product Name']}. "
-                  f"About Product: {x['About Product']}. "
-                  f"Product Specification: {x['Product Specification']}",
-        axis=1
-    )
+    if df is not None:
+        chunks = (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
+    else:
+        chunks = iter_product_chunks(data_path, chunk_rows)
     
-    # Prepare metadata with all filters
-    metadatas = []
-    for _, row in df_embed.iterrows():
-        metadata = {
-            "Uniq Id": row["Uniq Id"],
-            "Product Name": row["Product Name"],
-            "Selling Price": row["Selling Price"],
-            "category": row["category"] if pd.notna(row["category"]) else "",
-            "brand": row["brand"] if pd.notna(row["brand"]) else "",
-            "material": row["material"] if pd.notna(row["material"]) else "",
-        }
-        metadatas.append(metadata)
-    
-    # Generate embeddings
-    print(f"Creating embeddings for {len(df_embed)} products...")
-    embedder = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    
-    # Initialize Chroma vector store
-    vector_store = Chroma.from_texts(
-        texts=df_embed['embed_text'].tolist(),
-        metadatas=metadatas,
-        embedding=embedder,
-        persist_directory=persist_directory
+    # Same model HuggingFaceEmbeddings wraps at query time; used directly for batching/multi-process
+    model = SentenceTransformer(EMBED_MODEL)
+    # collection_metadata only applies when the collection is created; an
+    # existing older index is upgraded explicitly after the upserts below
+    vector_store = Chroma(
+        persist_directory=persist_directory,
+        collection_metadata={"schema_version": METADATA_SCHEMA_VERSION}
     )
+    collection = vector_store._collection
+    
+    pool = model.start_multi_process_pool(target_devices=["cpu"] * workers) if workers > 1 else None
+    
+    print(f"Indexing products (chunk_rows={chunk_rows}, batch_size={batch_size}, workers={workers})...")
+    start = time.perf_counter()
+    total = 0
+    
+    try:
+        for chunk in chunks:
+            texts = build_embed_texts(chunk)
+            metadatas = build_metadatas(chunk)
+            
+            if pool is not None:
+                embeddings = model.encode_multi_process(texts, pool, batch_size=batch_size)
+            else:
+                embeddings = model.encode(texts, batch_size=batch_size)
+            
+            # Product ids as document ids keep re-indexing idempotent
+            collection.upsert(
+                ids=[str(m["Uniq Id"]) for m in metadatas],
+                embeddings=[e.tolist() for e in embeddings],
+                metadatas=metadatas,
+                documents=texts
+            )
+            
+            total += len(texts)
+            elapsed = time.perf_counter() - start
+            print(f"  {total} products | {total / max(elapsed, 1e-9):.1f} rows/s | peak RSS {_peak_rss_mb():.0f} MB")
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+    
+    if get_schema_version(vector_store) < METADATA_SCHEMA_VERSION:
+        # Rows from an earlier catalog may not have been re-upserted: normalize them too
+        print(f"Upgrading existing index to schema v{METADATA_SCHEMA_VERSION}...")
+        _upgrade_collection(collection)
+    
+    elapsed = time.perf_counter() - start
+    print(f"✓ Indexed {total} products to {persist_directory} "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.1f} rows/s, peak RSS {_peak_rss_mb():.0f} MB)")
+    
+    return vector_store
+
+
+def migrate_metadata(persist_directory: str = "./chroma_db", batch_size: int = 500):
+    """
+    Upgrade an existing Chroma index to the current metadata schema
+    
+    Adds numeric price and lowercased filter fields in place,
+    without re-embedding any documents.
+    """
+    vector_store = Chroma(persist_directory=persist_directory)
+    collection = vector_store._collection
+    
+    if get_schema_version(vector_store) >= METADATA_SCHEMA_VERSION:
+        print(f"✓ {persist_directory} already at schema v{METADATA_SCHEMA_VERSION}")
+        return vector_store
     
-    print(f"✓ Indexed {len(df_embed)} products to {persist_directory}")
+    print(f"Migrating {collection.count()} documents in {persist_directory}...")
+    total = _upgrade_collection(collection, batch_size)
+    print(f"✓ Migrated {total} documents to schema v{METADATA_SCHEMA_VERSION}")
     
     return vector_store
 
 
+def _upgrade_collection(collection, batch_size: int = 500) -> int:
+    """Normalize every document's metadata, then record the schema version on the collection"""
+    total = collection.count()
+    for offset in range(0, total, batch_size):
+        batch = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+        collection.update(
+            ids=batch["ids"],
+            metadatas=[normalize_metadata(m) for m in batch["metadatas"]]
+        )
+    
+    collection.modify(metadata={**(collection.metadata or {}), "schema_version": METADATA_SCHEMA_VERSION})
+    return total
+
+
 if __name__ == "__main__":
-    df = load_enriched_data()
-    print(f"Loaded {len(df)} enriched products")
+    parser = argparse.ArgumentParser(description="Index enriched products into Chroma")
+    parser.add_argument("--persist-dir", default="./chroma_db")
+    parser.add_argument("--chunk-rows", type=int, default=2048, help="Rows per streamed chunk")
+    parser.add_argument("--batch-size", type=int, default=64, help="Encoder batch size")
+    parser.add_argument("--workers", type=int, default=1, help="Encoder processes")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Upgrade metadata of an existing index instead of re-indexing")
+    args = parser.parse_args()
+    
+    if args.migrate:
+        migrate_metadata(args.persist_dir)
+        sys.exit(0)
+    
+    # Only the metadata columns are loaded here; the catalog itself is streamed
+    if not DATA_PATH.exists():
+        raise FileNotFoundError(
+            "Enriched data not found. Run 'python scripts/extract_metadata.py' first!"
+        )
+    df = pd.read_parquet(DATA_PATH, columns=["category", "brand", "material"])
+    print(f"Found {len(df)} enriched products")
     
     # Show metadata stats
     print(f"\nMetadata coverage:")
@@ -82,6 +224,11 @@ if __name__ == "__main__":
     print(f"  Brands: {df['brand'].notna().sum()}/{len(df)}")
     print(f"  Materials: {df['material'].notna().sum()}/{len(df)}")
     
-    persist_dir = "./chroma_db"
-    vector_store = index_products(df, persist_directory=persist_dir)
+    persist_dir = args.persist_dir
+    vector_store = index_products(
+        persist_directory=persist_dir,
+        chunk_rows=args.chunk_rows,
+        batch_size=args.batch_size,
+        workers=args.workers
+    )
     print(f"\n✓ Vector store ready at {persist_dir}")
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Offline load test for the web retriever
+Fires concurrent queries through aretrieve_from_web against the stub
+search server and reports throughput, latency percentiles and failures.
+With --provider stub,stub2 the queries are hedged and hedge stats are printed.
+
+Usage:
+    python scripts/web_stub_server.py &
+    python scripts/load_test_web.py
+    python scripts/load_test_web.py --requests 2000 --concurrency 64 --url http://127.0.0.1:8765/shopping
+    python scripts/web_stub_server.py --port 8767 &
+    python scripts/load_test_web.py --provider stub,stub2
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+QUERIES = [
+    "organic shampoo", "stainless steel kettle", "running shoes", "longboard",
+    "jigsaw puzzle", "wooden toys", "science kit", "bluetooth speaker",
+]
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def run_load(total: int, concurrency: int) -> dict:
+    from graph.retriever.web import aretrieve_from_web
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, empty = [], 0
+
+    async def one(i: int):
+        nonlocal empty
+        async with semaphore:
+            start = time.perf_counter()
+            docs = await aretrieve_from_web(QUERIES[i % len(QUERIES)], {}, k=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+            empty += not docs
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "latencies": latencies, "empty": empty}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the web retriever against the stub server")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--url", default=None, help="Stub server URL (default WEB_STUB_URL)")
+    parser.add_argument("--provider", default="stub", help="WEB_PROVIDER, e.g. stub,stub2 to hedge")
+    args = parser.parse_args()
+
+    # Provider settings are read at import time
+    os.environ["WEB_PROVIDER"] = args.provider
+    # Measure the providers, not the result cache
+    os.environ["WEB_CACHE"] = "0"
+    if args.url:
+        os.environ["WEB_STUB_URL"] = args.url
+
+    result = asyncio.run(run_load(args.requests, args.concurrency))
+    lat = result["latencies"]
+    print(f"{args.requests} requests, concurrency {args.concurrency}: "
+          f"{args.requests / max(result['elapsed'], 1e-9):.1f} req/s")
+    print(f"  latency p50 {percentile(lat, 50):.1f}ms | p95 {percentile(lat, 95):.1f}ms | p99 {percentile(lat, 99):.1f}ms")
+    print(f"  empty/failed: {result['empty']}")
+    if "," in args.provider:
+        from graph.retriever.web_hedge import get_hedge_stats
+        print(f"  hedging: {get_hedge_stats()}")
+
+
+if __name__ == "__main__":
+    main()
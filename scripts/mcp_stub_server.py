@@ -0,0 +1,49 @@
+"""
+Local stub MCP server with a web.search tool
+Returns the same deterministic Serper-style results as web_stub_server.py,
+so the MCP web provider and session pool can be run and benchmarked offline.
+
+Usage:
+    python scripts/mcp_stub_server.py                      # stdio, for MCP_SERVER_COMMAND (spawned by the pool)
+    python scripts/mcp_stub_server.py --http --port 8766   # streamable HTTP at /mcp
+    python scripts/mcp_stub_server.py --latency-ms 30
+"""
+
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+# Shares fake_results with the HTTP stub server
+sys.path.insert(0, str(Path(__file__).parent))
+
+from mcp.server.fastmcp import FastMCP
+from web_stub_server import fake_results
+
+
+def build_server(latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 8766) -> FastMCP:
+    server = FastMCP("web-search-stub", host=host, port=port, log_level="WARNING")
+
+    @server.tool(name="web.search", description="Search shopping results for a query")
+    async def web_search(query: str, num: int = 10) -> dict:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return {"shopping": fake_results(query, num)}
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub MCP server with a web.search tool")
+    parser.add_argument("--http", action="store_true", help="Serve streamable HTTP instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per tool call")
+    args = parser.parse_args()
+
+    server = build_server(args.latency_ms, args.host, args.port)
+    server.run(transport="streamable-http" if args.http else "stdio")
+
+
+if __name__ == "__main__":
+    main()
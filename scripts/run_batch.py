@@ -0,0 +1,103 @@
+"""
+Run a JSONL file of queries through the graph in batches
+Each stage (router, planner, retriever, answerer) runs once per batch
+
+Input: one JSON object per line with a "query" field (and optional "id")
+Output: one JSON object per query with task, plan, docs, answer and
+per-query stage timings; throughput is printed at the end
+
+Usage:
+    python scripts/run_batch.py queries.jsonl results.jsonl
+    python scripts/run_batch.py queries.jsonl results.jsonl --batch-size 16
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.batch import run_batch, STAGES
+from graph.answerer.templates import get_answer_latency_stats
+from graph.retriever.breaker import get_breaker_states
+
+
+def load_queries(path: Path) -> list:
+    """Read {"id", "query"} records, numbering lines without an id"""
+    records = []
+    for line_no, line in enumerate(path.read_text().splitlines(), 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not record.get("query"):
+            raise ValueError(f"❌ Line {line_no} of {path} has no 'query'")
+        record.setdefault("id", line_no)
+        records.append(record)
+    return records
+
+
+def to_result(record: dict, state: dict, stats: dict) -> dict:
+    """Flatten a final graph state into one output line"""
+    return {
+        "id": record["id"],
+        "query": state["query"],
+        "task": state.get("task"),
+        "constraints": state.get("constraints"),
+        "safety_flags": state.get("safety_flags", []),
+        "plan": state.get("plan"),
+        "retrieved_docs": [
+            {"doc_id": d.get("doc_id"), "title": d.get("title"), "price": d.get("price"), "source": d.get("source")}
+            for d in state.get("retrieved_docs", [])
+        ],
+        "answer": state.get("answer"),
+        "answer_mode": next((log["output"].get("mode") for log in state["step_log"]
+                             if log["node"] == "answerer" and "output" in log), None),
+        "citations": state.get("citations", []),
+        "errors": [log["node"] for log in state["step_log"] if not log.get("success")],
+        "timings_ms": {**stats["stage_ms"], "total": round(stats["total_s"] * 1000, 1)},
+        "batch_size": stats["num_queries"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-run queries through the graph")
+    parser.add_argument("input", type=Path, help="JSONL file of queries")
+    parser.add_argument("output", type=Path, help="JSONL file for results")
+    parser.add_argument("--batch-size", type=int, default=32, help="Queries per batched stage call")
+    args = parser.parse_args()
+
+    records = load_queries(args.input)
+    print(f"Running {len(records)} queries in batches of {args.batch_size}")
+
+    stage_totals = {stage: 0.0 for stage in STAGES}
+    start = time.perf_counter()
+
+    with open(args.output, "w") as f:
+        for i in range(0, len(records), args.batch_size):
+            batch = records[i:i + args.batch_size]
+            states, stats = run_batch([r["query"] for r in batch])
+            for record, state in zip(batch, states):
+                f.write(json.dumps(to_result(record, state, stats), default=str) + "\n")
+
+            for stage in STAGES:
+                stage_totals[stage] += stats["stage_ms"][stage]
+            print(f"  batch {i // args.batch_size + 1}: {len(batch)} queries, "
+                  f"{stats['queries_per_s']:.2f} queries/s")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ Wrote {len(records)} results to {args.output}")
+    print(f"Throughput: {len(records) / max(elapsed, 1e-9):.2f} queries/s ({elapsed:.1f}s total)")
+    for stage in STAGES:
+        print(f"  {stage:<10} {stage_totals[stage] / 1000:>8.1f}s")
+    for mode, stats in get_answer_latency_stats().items():
+        print(f"  answer ({mode}): {stats['count']} answers, p50 {stats['p50_ms']:.1f}ms, p95 {stats['p95_ms']:.1f}ms")
+    for name, breaker in get_breaker_states().items():
+        print(f"  breaker {name}: {breaker['state']}, {breaker['failures']}/{breaker['calls']} failed, "
+              f"{breaker['rejected']} rejected, opened {breaker['opened']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Offline key-facts summaries for the product store
+Run after extract_metadata.py and before build_embeddings.py / index_data.py
+
+Adds a "summary" column to data/amazon_enriched.parquet: material, size,
+weight, age range and the first few feature bullets, with the boilerplate
+("Make sure this fits...", shipping notes) dropped. The answerer puts the
+summary in the prompt instead of the raw description, so every retrieved
+doc costs fewer prompt tokens.
+
+Usage:
+    python scripts/summarize_products.py
+    python scripts/summarize_products.py --data data/amazon_enriched.parquet --max-features 2
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+# Feature bullets kept per product, and words kept per bullet
+MAX_FEATURES = 3
+MAX_FEATURE_WORDS = 12
+
+# About Product bullets that say nothing about the product
+BOILERPLATE = [
+    "make sure this fits", "go to your orders", "view shipping rates", "learn more",
+    "satisfaction guaranteed", "money back", "customer service", "warranty",
+    "show up to", "click", "add to cart",
+]
+
+# Normalized Product Specification keys -> summary label
+SPEC_KEYS = {
+    "productdimensions": "Size",
+    "itemweight": "Weight",
+    "manufacturerrecommendedage": "Age",
+}
+
+# '14.7 x 11.1 x 10.2 inches  4.06 pounds' -> the dimensions part only
+DIMENSIONS_RE = re.compile(r"\d[\d.\sx]*\s*(?:inches|cm|mm|feet)", re.IGNORECASE)
+
+_NULL_VALUES = {"", "nan", "none", "null", "n/a", "na", "unknown"}
+
+
+def _clean(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    value = " ".join(str(value).split())
+    return None if value.lower() in _NULL_VALUES else value
+
+
+def _spaced(value: str) -> str:
+    """'3.5x6.2x13inches' -> '3.5 x 6.2 x 13 inches', '8yearsandup' -> '8 years and up'"""
+    value = re.split(r"[(;]", value)[0].strip()
+    if m := DIMENSIONS_RE.match(value):
+        value = m.group(0)
+    value = re.sub(r"(?<=\d)\s*x\s*(?=\d)", " x ", value)
+    value = re.sub(r"(?<=\d)(?=[A-Za-z])", " ", value)
+    return value.replace("andup", " and up").replace("  ", " ").strip()
+
+
+def parse_spec(spec) -> Dict[str, str]:
+    """Size, weight and age from a 'Key: value|Key: value' specification string"""
+    facts = {}
+    for part in (_clean(spec) or "").split("|"):
+        key, sep, value = part.partition(":")
+        label = SPEC_KEYS.get(re.sub(r"[^a-z]", "", key.lower()))
+        if sep and label and label not in facts and _clean(value):
+            facts[label] = _spaced(value)
+    return facts
+
+
+def extract_features(about, max_features: int = MAX_FEATURES) -> List[str]:
+    """First sentence of each non-boilerplate About Product bullet, clipped to MAX_FEATURE_WORDS"""
+    features = []
+    for bullet in (_clean(about) or "").split("|"):
+        bullet = bullet.strip()
+        if not bullet or any(b in bullet.lower() for b in BOILERPLATE):
+            continue
+        sentence = re.split(r"(?<=[.!?])\s", bullet, maxsplit=1)[0].rstrip(".!? ")
+        words = sentence.split()
+        if len(words) > MAX_FEATURE_WORDS:
+            sentence = " ".join(words[:MAX_FEATURE_WORDS]).rstrip(",;:") + "..."
+        features.append(sentence)
+        if len(features) >= max_features:
+            break
+    return features
+
+
+def summarize_row(row, max_features: int = MAX_FEATURES) -> Optional[str]:
+    """'Material: ... Size: ... Features: a; b; c.' or None if nothing is known"""
+    facts = {"Material": _clean(row.get("material"))}
+
+    spec = parse_spec(row.get("Product Specification"))
+    dimensions = _clean(row.get("Product Dimensions"))
+    facts["Size"] = _spaced(dimensions) if dimensions else spec.get("Size")
+    shipping_weight = _clean(row.get("Shipping Weight"))
+    facts["Weight"] = spec.get("Weight") or (_spaced(shipping_weight) if shipping_weight else None)
+    facts["Age"] = spec.get("Age")
+
+    parts = [f"{label}: {value}." for label, value in facts.items() if value]
+    features = extract_features(row.get("About Product"), max_features)
+    if features:
+        features_text = "; ".join(features)
+        parts.append(f"Features: {features_text}" + ("" if features_text.endswith("...") else "."))
+    return " ".join(parts) or None
+
+
+def add_summaries(df: pd.DataFrame, max_features: int = MAX_FEATURES) -> pd.DataFrame:
+    """Add (or refresh) the summary column"""
+    df["summary"] = [summarize_row(row, max_features) for _, row in df.iterrows()]
+    return df
+
+
+def _log_coverage(df: pd.DataFrame):
+    """How many rows got a summary, and how much shorter it is than the raw description"""
+    has_summary = df["summary"].notna()
+    raw = df["About Product"].fillna("").str.len()
+    print(f"Summaries: {has_summary.sum()}/{len(df)}")
+    if has_summary.any():
+        print(f"  avg chars: summary {df.loc[has_summary, 'summary'].str.len().mean():.0f} "
+              f"vs About Product {raw[has_summary].mean():.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add key-facts summaries to the enriched product data")
+    parser.add_argument("--data", type=Path, default=Path("data/amazon_enriched.parquet"))
+    parser.add_argument("--output", type=Path, default=None, help="Defaults to overwriting --data")
+    parser.add_argument("--max-features", type=int, default=MAX_FEATURES, help="Feature bullets per summary")
+    args = parser.parse_args()
+
+    if not args.data.exists():
+        raise FileNotFoundError(
+            "Enriched data not found. Run 'python scripts/extract_metadata.py' first!"
+        )
+
+    df = add_summaries(pd.read_parquet(args.data), args.max_features)
+    _log_coverage(df)
+
+    # Write to a temp file and swap in so a crash never leaves a truncated dataset
+    output_path = args.output or args.data
+    tmp_path = output_path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+    print(f"✓ Wrote summaries to {output_path}")
+
+    print(df[["Product Name", "summary"]].head(5).to_string())
+
+
+if __name__ == "__main__":
+    main()
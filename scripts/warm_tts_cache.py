@@ -0,0 +1,63 @@
+"""
+Pre-synthesize the assistant's fixed responses into the TTS audio cache
+Covers the no-results answer, safety refusals and the answerer's fallback,
+split into sentences exactly as the voice pipeline speaks them, so the first
+user to hear each one doesn't wait for TTS.
+
+Usage:
+    python scripts/warm_tts_cache.py
+    python scripts/warm_tts_cache.py --backend fake --voice alloy
+    python scripts/warm_tts_cache.py --stats
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path before importing local modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def fixed_responses() -> list:
+    """Answers the graph produces verbatim"""
+    from graph.safety import REFUSALS, REDIRECT
+    return [
+        "I couldn't find any products matching your criteria. Try adjusting your search.",  # apply_no_docs_answer
+        "No products found.",  # apply_answerer_error without docs
+        *REFUSALS.values(),
+        REDIRECT,
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the TTS audio cache with fixed responses")
+    parser.add_argument("--backend", default=None, help="TTS backend (default TTS_BACKEND)")
+    parser.add_argument("--voice", default=None, help="Voice (default TTS_VOICE)")
+    parser.add_argument("--stats", action="store_true", help="Only print cache stats")
+    args = parser.parse_args()
+
+    from voice.tts import TTS_VOICE, get_tts_backend, synthesize_stream
+    from voice.tts_cache import get_tts_cache, get_tts_cache_stats
+
+    if args.stats:
+        print(get_tts_cache_stats())
+        return
+    if get_tts_cache() is None:
+        print("❌ TTS cache disabled (TTS_CACHE=0)")
+        return
+
+    backend = get_tts_backend(args.backend)
+    sentences, synthesized = 0, 0
+    # One response at a time, so sentence splitting (and cache keys) match the voice pipeline
+    for text in fixed_responses():
+        for chunk in synthesize_stream([text], backend, voice=args.voice or TTS_VOICE):
+            sentences += 1
+            synthesized += not chunk["cached"]
+            status = "cached" if chunk["cached"] else f"{chunk['synth_ms']:.0f}ms"
+            print(f"  {status:>7}  {chunk['text']}")
+    print(f"✓ {sentences} sentences, {synthesized} newly synthesized")
+    print(get_tts_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the web search provider
+Speaks the Serper shopping format (POST /shopping {"q", "num"} ->
+{"shopping": [...]}) with deterministic results per query, so the web
+retriever can be run and load-tested offline (WEB_PROVIDER=stub).
+
+Latency, tail latency and failures are injectable to exercise timeouts,
+limits and hedging (run a second server on 8767 for WEB_PROVIDER=stub,stub2).
+
+Usage:
+    python scripts/web_stub_server.py
+    python scripts/web_stub_server.py --port 8766 --latency-ms 80 --jitter-ms 40 --error-rate 0.05
+    python scripts/web_stub_server.py --port 8767 --slow-rate 0.1 --slow-ms 1500
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SELLERS = ["Amazon.com", "Walmart", "Target", "Best Buy", "eBay"]
+BRANDS = ["Acme", "Northwind", "Contoso", "Globex", "Initech"]
+
+
+def fake_results(query: str, num: int) -> list:
+    """Same query -> same products, prices and stock"""
+    results = []
+    for i in range(num):
+        seed = int(hashlib.sha1(f"{query}|{i}".encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        brand = rng.choice(BRANDS)
+        results.append({
+            "title": f"{brand} {query.title()} {rng.choice(['Classic', 'Pro', 'Lite', 'Plus', 'Max'])}",
+            "source": rng.choice(SELLERS),
+            "link": f"https://shop.example.com/p/{seed:08x}",
+            "price": f"${rng.uniform(5, 150):.2f}",
+            "delivery": rng.choice(["Free delivery", "Free 2-day delivery", "$4.99 delivery"]),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "ratingCount": rng.randint(0, 5000),
+            "inStock": rng.random() > 0.15,
+            "productId": f"{seed:08x}",
+            "brand": brand,
+            "position": i + 1,
+        })
+    return results
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+    slow_rate = 0.0
+    slow_ms = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        delay_ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if random.random() < self.slow_rate:
+            delay_ms += self.slow_ms
+        time.sleep(max(0.0, delay_ms) / 1000)
+        if random.random() < self.error_rate:
+            self._send(503, {"message": "injected failure"})
+            return
+
+        query = str(body.get("q", "")).strip()
+        if self.path.rstrip("/") != "/shopping" or not query:
+            self._send(400, {"message": "POST /shopping with a non-empty 'q'"})
+            return
+        self._send(200, {"searchParameters": body, "shopping": fake_results(query, int(body.get("num", 10)))})
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Silence per-request logging under load
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub web search server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean response delay")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Uniform +/- delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=1000.0, help="Extra delay for slow requests")
+    args = parser.parse_args()
+
+    StubHandler.latency_ms = args.latency_ms
+    StubHandler.jitter_ms = args.jitter_ms
+    StubHandler.error_rate = args.error_rate
+    StubHandler.slow_rate = args.slow_rate
+    StubHandler.slow_ms = args.slow_ms
+
+    # HTTP/1.1 keeps connections alive so the client's pool is exercised
+    StubHandler.protocol_version = "HTTP/1.1"
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub search server on http://{args.host}:{args.port}/shopping "
+          f"(latency {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, {args.slow_rate:.0%} +{args.slow_ms:.0f}ms, "
+          f"error rate {args.error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
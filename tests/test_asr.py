@@ -0,0 +1,97 @@
+# tests/test_asr.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from voice.asr import StreamingTranscriber, FakeBackend, synthetic_speech, ASR_END_OF_UTTERANCE_MS
+
+TRANSCRIPT = "organic shampoo under $20"
+
+
+def _events(frames, transcript: str = TRANSCRIPT):
+    transcriber = StreamingTranscriber(FakeBackend(transcript, word_ms=300))
+    events = [e for frame in frames for e in transcriber.feed(frame)]
+    return events + transcriber.flush()
+
+
+def test_partials_grow_then_final():
+    """Partials reveal the transcript word by word; silence ends it with one final."""
+    events = _events(synthetic_speech(TRANSCRIPT))
+
+    partials = [e for e in events if e["type"] == "partial"]
+    finals = [e for e in events if e["type"] == "final"]
+
+    assert partials, "Expected partial transcripts while speaking"
+    assert all(TRANSCRIPT.startswith(p["text"]) for p in partials), "Partials should be prefixes of the transcript"
+    assert len(finals) == 1, f"Expected one final, got {len(finals)}"
+    assert finals[0]["text"] == TRANSCRIPT
+    assert finals[0]["reason"] == "silence"
+
+
+def test_stable_partial_needs_agreeing_decodes():
+    """A partial is stable only once consecutive decodes agree, and only in a pause here."""
+    events = _events(synthetic_speech(TRANSCRIPT))
+    stable = [e for e in events if e["type"] == "partial" and e["stable"]]
+
+    assert stable, "Expected a stable partial in the trailing silence"
+    assert stable[0]["text"] == TRANSCRIPT
+    assert stable[0]["pause"], "Words only stop changing once the user pauses"
+    first_partial = next(e for e in events if e["type"] == "partial")
+    assert not first_partial["stable"], "The first decode can't be stable"
+
+
+def test_final_after_end_of_utterance_silence():
+    """The final comes ASR_END_OF_UTTERANCE_MS after speech stops."""
+    word_ms, lead_ms = 300, 300
+    events = _events(synthetic_speech(TRANSCRIPT, word_ms=word_ms, lead_ms=lead_ms))
+    final = next(e for e in events if e["type"] == "final")
+
+    speech_end_ms = lead_ms + len(TRANSCRIPT.split()) * word_ms
+    assert final["t_ms"] >= speech_end_ms + ASR_END_OF_UTTERANCE_MS - 30
+    assert final["t_ms"] <= speech_end_ms + ASR_END_OF_UTTERANCE_MS + 60
+
+
+def test_silence_produces_no_events():
+    """Frames below the VAD threshold never start an utterance."""
+    events = _events(synthetic_speech("", lead_ms=0, tail_ms=1500))
+    assert events == []
+
+
+def test_flush_finalizes_cut_off_utterance():
+    """A stream that ends mid-utterance is finalized by flush()."""
+    frames = synthetic_speech(TRANSCRIPT, tail_ms=0)
+    events = _events(frames)
+
+    assert events[-1]["type"] == "final"
+    assert events[-1]["reason"] == "end_of_stream"
+
+
+def test_early_speculation_routes_once(monkeypatch):
+    """Restarts on a changed stable partial speculate retrieval only; the router call is made once."""
+    import voice.pipeline as pipeline
+
+    started = []
+    monkeypatch.setattr(pipeline, "start_speculative_retrieval",
+                        lambda query, route=False: started.append((query, route)) or f"spec-{len(started)}")
+    monkeypatch.setattr(pipeline, "discard_speculation", lambda speculation_id: None)
+
+    speculation = pipeline.EarlySpeculation()
+    speculation.on_partial({"text": "organic", "stable": True, "pause": False, "t_ms": 600})
+    speculation.on_partial({"text": "organic shampoo", "stable": True, "pause": True, "t_ms": 900})
+    speculation.on_partial({"text": "organic shampoo under $20", "stable": True, "pause": True, "t_ms": 1500})
+    speculation.on_partial({"text": "organic shampoo under $20", "stable": True, "pause": True, "t_ms": 1800})
+
+    assert [route for _, route in started] == [False, True, False], f"Unexpected speculations: {started}"
+    assert speculation.restarts == 2
+    assert speculation.claim("Organic shampoo under $20.") == "spec-3"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,138 @@
+# tests/test_breaker.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.retriever.breaker import (
+    CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN,
+    BREAKER_MIN_CALLS, BREAKER_OPEN_SECONDS,
+)
+
+
+def _fail(breaker: CircuitBreaker):
+    with pytest.raises(RuntimeError):
+        with breaker.guard():
+            raise RuntimeError("provider down")
+
+
+def _expire_cool_down(breaker: CircuitBreaker):
+    """Pretend the breaker opened BREAKER_OPEN_SECONDS ago"""
+    breaker.opened_at -= BREAKER_OPEN_SECONDS
+
+
+# ============================================================================
+# CLOSED -> OPEN
+# ============================================================================
+
+def test_breaker_opens_on_failure_rate():
+    """Breaker opens once the window has enough calls and half of them failed."""
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+
+    for _ in range(BREAKER_MIN_CALLS - 1):
+        _fail(breaker)
+    assert breaker.state == CLOSED, "Should stay closed below BREAKER_MIN_CALLS"
+
+    _fail(breaker)
+    assert breaker.state == OPEN, f"Expected open after {BREAKER_MIN_CALLS} failures, got {breaker.state}"
+    assert breaker.counts["opened"] == 1
+
+
+def test_breaker_stays_closed_on_success():
+    """Successful fast calls never open the breaker."""
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+
+    for _ in range(BREAKER_MIN_CALLS * 2):
+        with breaker.guard():
+            pass
+
+    assert breaker.state == CLOSED
+    assert breaker.counts["failures"] == 0
+
+
+def test_breaker_opens_on_slow_calls():
+    """Calls slower than slow_call_ms count toward the slow-call rate."""
+    breaker = CircuitBreaker("test", slow_call_ms=50)
+
+    for _ in range(BREAKER_MIN_CALLS):
+        breaker.record(False, latency_ms=200)
+
+    assert breaker.state == OPEN, f"Expected open on slow calls, got {breaker.state}"
+
+
+def test_breaker_rejects_while_open():
+    """An open breaker raises CircuitOpenError without running the call."""
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+    for _ in range(BREAKER_MIN_CALLS):
+        _fail(breaker)
+
+    ran = []
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            ran.append(True)
+
+    assert not ran, "Call should not run while the breaker is open"
+    assert breaker.counts["rejected"] == 1
+
+
+# ============================================================================
+# OPEN -> HALF_OPEN -> CLOSED / OPEN
+# ============================================================================
+
+def test_breaker_half_open_probe_success_closes():
+    """After the cool-down one probe goes through; its success closes the breaker."""
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+    for _ in range(BREAKER_MIN_CALLS):
+        _fail(breaker)
+    _expire_cool_down(breaker)
+
+    assert breaker.allow(), "Probe should be allowed after the cool-down"
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(), "Only BREAKER_HALF_OPEN_PROBES probes at a time"
+
+    breaker.record(False, latency_ms=10)
+    assert breaker.state == CLOSED
+    assert len(breaker.calls) == 0, "Closing should reset the window"
+
+
+def test_breaker_half_open_probe_failure_reopens():
+    """A failed probe opens the breaker again with a fresh cool-down."""
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+    for _ in range(BREAKER_MIN_CALLS):
+        _fail(breaker)
+    _expire_cool_down(breaker)
+
+    _fail(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.counts["opened"] == 2
+    assert not breaker.allow(), "Reopened breaker should reject until the next cool-down"
+
+
+def test_breaker_cancelled_probe_is_released():
+    """A probe cancelled by the caller (hedge loser) frees its slot without recording."""
+    import asyncio
+
+    breaker = CircuitBreaker("test", slow_call_ms=1000)
+    for _ in range(BREAKER_MIN_CALLS):
+        _fail(breaker)
+    _expire_cool_down(breaker)
+    calls_before = breaker.counts["calls"]
+
+    with pytest.raises(asyncio.CancelledError):
+        with breaker.guard():
+            raise asyncio.CancelledError()
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.counts["calls"] == calls_before, "Cancellation should not count as a call"
+    assert breaker.allow(), "Probe slot should be free again"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
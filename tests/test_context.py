@@ -0,0 +1,87 @@
+# tests/test_context.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.answerer.context import pack_docs, count_tokens
+
+
+class WhitespaceTokenizer:
+    """One token per whitespace-separated word, so counts are easy to check by hand"""
+
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+    def decode(self, ids):
+        return " ".join(ids)
+
+
+@pytest.fixture(autouse=True)
+def tokenizer(monkeypatch):
+    monkeypatch.setattr("graph.answerer.context.get_tokenizer", lambda: WhitespaceTokenizer())
+
+
+def _doc(i: int, words: int = 200) -> dict:
+    return {
+        "title": f"Kettle {i}",
+        "price": 20 + i,
+        "brand": "Acme",
+        "content": " ".join(f"word{i}_{w}" for w in range(words)),
+    }
+
+
+def test_budget_is_respected():
+    """Long descriptions are truncated so the packed docs fit the budget."""
+    docs_text, report = pack_docs([_doc(i) for i in range(5)], ["brand"], budget=300)
+
+    assert report["context_tokens"] <= 300, f"Over budget: {report}"
+    assert report["context_tokens"] == count_tokens(docs_text)
+    assert sum(report["per_doc_tokens"]) == report["context_tokens"]
+    assert all(f"[DOC {i + 1}]" in docs_text for i in range(5)), "Every doc keeps its header"
+
+
+def test_higher_ranked_docs_get_more_room():
+    """The budget is split by rank: earlier docs keep more of their description."""
+    _, report = pack_docs([_doc(i) for i in range(4)], [], budget=200)
+
+    per_doc = report["per_doc_tokens"]
+    assert per_doc == sorted(per_doc, reverse=True), f"Shares should shrink with rank: {per_doc}"
+    assert per_doc[0] > per_doc[-1]
+
+
+def test_short_docs_leave_budget_to_later_docs():
+    """What a short top doc doesn't use carries over to the docs after it."""
+    docs = [_doc(0, words=3)] + [_doc(i) for i in range(1, 3)]
+    text, report = pack_docs(docs, [], budget=200)
+
+    assert "word0_2" in text, "A short description is not truncated"
+    assert report["context_tokens"] > 150, f"Unused share should carry over: {report}"
+
+
+def test_prompt_token_count():
+    """format_answerer_input reports the token count of the full formatted prompt."""
+    from graph.answerer import format_answerer_input
+    from graph.answerer.prompts import answerer_prompt
+
+    state = {
+        "query": "cheap kettle",
+        "task": "product_search",
+        "plan": {"retrieval_fields": ["brand"], "comparison_criteria": ["price"]},
+        "retrieved_docs": [_doc(i) for i in range(3)],
+    }
+    inputs = format_answerer_input(state)
+
+    report = state["answer_context"]
+    assert report["prompt_tokens"] == len(answerer_prompt.format(**inputs).split())
+    assert report["prompt_tokens"] > report["context_tokens"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
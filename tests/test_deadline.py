@@ -0,0 +1,51 @@
+# tests/test_deadline.py
+import pytest
+import sys
+import time
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.deadline import start_deadline, remaining_ms, is_tight
+
+
+def test_no_budget_no_deadline():
+    state = start_deadline({"query": "kettle"})
+    assert "deadline" not in state
+    assert remaining_ms(state) is None and not is_tight(state, "router")
+
+
+def test_clock_counts_time_before_first_check():
+    """Time spent between graph entry and the first budget check is counted."""
+    state = start_deadline({"latency_budget_ms": 1000})
+    time.sleep(0.05)
+
+    assert remaining_ms(state) <= 955
+
+
+def test_caller_start_time_is_kept():
+    """A caller can start the clock when the request arrived; later stamps don't reset it."""
+    arrived = time.monotonic() - 0.4
+    state = start_deadline({"latency_budget_ms": 1000}, start=arrived)
+    start_deadline(state)
+
+    assert remaining_ms(state) == pytest.approx(600, abs=30)
+
+
+def test_followup_restarts_clock_per_turn():
+    """A session turn gets a fresh deadline, stamped before the follow-up's safety check."""
+    from graph.session import followup_node
+
+    state = {"query": "cheaper ones?", "latency_budget_ms": 1000, "deadline": time.monotonic() - 60, "step_log": []}
+    state = followup_node(state)
+
+    assert remaining_ms(state) == pytest.approx(1000, abs=30)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
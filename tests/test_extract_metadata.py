@@ -0,0 +1,147 @@
+# tests/test_extract_metadata.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+pytest.importorskip("datasets")
+
+import scripts.extract_metadata as extract_metadata
+from scripts.extract_metadata import add_content_hashes, extract_metadata_streaming, assemble_enriched, apply_rule_prepass
+
+
+def _products(*names: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Uniq Id": [f"id-{i}" for i in range(len(names))],
+        "Product Name": list(names),
+        "About Product": ["" for _ in names],
+        "Product Specification": ["" for _ in names],
+        "Selling Price": ["$10.00" for _ in names],
+    })
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Replace generation with a recorder; returns the list of product names sent to the "LLM"."""
+    seen = []
+
+    def generate_batch(llm, inputs):
+        seen.extend(x["product_name"] for x in inputs)
+        return [{"category": "llm-category", "brand": "LLM Brand", "material": "llm-material"} for _ in inputs]
+
+    monkeypatch.setattr(extract_metadata, "get_llm", lambda: None)
+    monkeypatch.setattr(extract_metadata, "generate_batch", generate_batch)
+    return seen
+
+
+# ============================================================================
+# CONTENT HASHES AND RESUME
+# ============================================================================
+
+def test_content_hash_follows_llm_fields():
+    """Only the fields the LLM reads change the hash."""
+    df = add_content_hashes(_products("Acme Kettle", "Acme Kettle", "Zed Mug"))
+    assert df.loc[0, "content_hash"] == df.loc[1, "content_hash"], "Same content should hash the same"
+    assert df.loc[0, "content_hash"] != df.loc[2, "content_hash"]
+
+    repriced = _products("Acme Kettle")
+    repriced["Selling Price"] = "$12.00"
+    assert add_content_hashes(repriced).loc[0, "content_hash"] == df.loc[0, "content_hash"], \
+        "Price is not an LLM input"
+
+    edited = _products("Acme Kettle")
+    edited["About Product"] = "Now 1.7 liters"
+    assert add_content_hashes(edited).loc[0, "content_hash"] != df.loc[0, "content_hash"], \
+        "Changed description should produce a new hash"
+
+
+def test_resume_skips_enriched_rows(tmp_path, fake_llm):
+    """A rerun only sends new or changed products to the LLM."""
+    extract_metadata_streaming(_products("Acme Kettle", "Zed Mug"), tmp_path, use_rules=False)
+    assert sorted(fake_llm) == ["Acme Kettle", "Zed Mug"]
+
+    fake_llm.clear()
+    refreshed = _products("Acme Kettle", "Zed Mug v2", "Bolt Pan")
+    stats = extract_metadata_streaming(refreshed, tmp_path, use_rules=False)
+
+    assert sorted(fake_llm) == ["Bolt Pan", "Zed Mug v2"], f"Unexpected LLM calls: {fake_llm}"
+    assert stats["skipped"] == 1 and stats["rows"] == 2
+
+    enriched = assemble_enriched(refreshed, tmp_path, tmp_path / "out.parquet")
+    assert enriched["category"].notna().all(), "Every current row should have metadata"
+
+
+def test_failed_rows_are_retried(tmp_path, monkeypatch):
+    """Rows whose generation failed are not checkpointed, so the next run retries them."""
+    monkeypatch.setattr(extract_metadata, "get_llm", lambda: None)
+    monkeypatch.setattr(extract_metadata, "generate_batch",
+                        lambda llm, inputs: [{"category": "kettle"}] + [{}] * (len(inputs) - 1))
+    stats = extract_metadata_streaming(_products("Acme Kettle", "Zed Mug"), tmp_path, use_rules=False)
+    assert stats["failed"] == 1
+
+    seen = []
+    monkeypatch.setattr(extract_metadata, "generate_batch",
+                        lambda llm, inputs: seen.extend(x["product_name"] for x in inputs) or [{"category": "mug"}] * len(inputs))
+    extract_metadata_streaming(_products("Acme Kettle", "Zed Mug"), tmp_path, use_rules=False)
+    assert seen == ["Zed Mug"]
+
+
+
+def test_reassembly_keeps_summaries(tmp_path, fake_llm):
+    """Summaries added to the output by summarize_products survive a re-run for unchanged rows."""
+    shards, output = tmp_path / "shards", tmp_path / "out.parquet"
+    extract_metadata_streaming(_products("Acme Kettle", "Zed Mug"), shards, use_rules=False)
+    enriched = assemble_enriched(_products("Acme Kettle", "Zed Mug"), shards, output)
+    enriched["summary"] = ["Material: steel.", "Material: ceramic."]
+    enriched.to_parquet(output, index=False)
+
+    refreshed = _products("Acme Kettle", "Zed Mug v2")
+    extract_metadata_streaming(refreshed, shards, use_rules=False)
+    enriched = assemble_enriched(refreshed, shards, output)
+
+    assert enriched.loc[0, "summary"] == "Material: steel."
+    assert pd.isna(enriched.loc[1, "summary"]), "A changed product needs a new summary"
+
+# ============================================================================
+# RULE PRE-PASS
+# ============================================================================
+
+def _catalog() -> pd.DataFrame:
+    df = _products("Acme Stainless Steel Kettle", "Zed Mug", "Acme Cotton Tote")
+    df["Category"] = ["Home & Kitchen | Kettles", "Home & Kitchen | Mugs", "Bags | Totes & Shoppers"]
+    df["Product Specification"] = ["Brand: Acme", "", ""]
+    return df
+
+
+def test_prepass_splits_resolved_and_unresolved():
+    """Rows with category, brand and material from structure skip the LLM; the rest don't."""
+    df, resolved, report = apply_rule_prepass(_catalog())
+
+    assert resolved.tolist() == [True, False, False]
+    assert df.loc[0, ["category", "brand", "material"]].tolist() == ["kettle", "Acme", "stainless steel"]
+    # "Acme" learned from the first row's spec fills the third row's brand from its title
+    assert df.loc[2, "brand"] == "Acme"
+    assert pd.isna(df.loc[2, "category"]), "Multi-type leaf categories are left to the LLM"
+    assert report["llm_calls_avoided"] == pytest.approx(1 / 3)
+
+
+def test_rule_values_beat_llm_values(tmp_path, fake_llm):
+    """The LLM only fills fields the rules left empty, and resolved rows never reach it."""
+    df = _catalog()
+    extract_metadata_streaming(df, tmp_path)
+
+    assert "Acme Stainless Steel Kettle" not in fake_llm, "Fully resolved rows skip the LLM"
+    enriched = assemble_enriched(df, tmp_path, tmp_path / "out.parquet").set_index("Uniq Id")
+    assert enriched.loc["id-1", ["category", "brand", "material"]].tolist() == ["mug", "LLM Brand", "llm-material"]
+    assert enriched.loc["id-2", ["category", "brand", "material"]].tolist() == ["llm-category", "Acme", "cotton"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+# tests/test_mcp_pool.py
+import pytest
+import sys
+import time
+import shlex
+import asyncio
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+pytest.importorskip("mcp")
+
+from graph.retriever import mcp_pool
+from graph.retriever.mcp_pool import MCPSessionPool, tool_result_json
+from graph.retriever.web_client import submit
+from graph.retriever.web_providers import MCP_SEARCH_TOOL
+
+# The local stub server over stdio, one subprocess per session
+STUB_COMMAND = shlex.join([sys.executable, str(Path(__file__).parent.parent / "scripts" / "mcp_stub_server.py")])
+
+
+@pytest.fixture
+def pool():
+    pool = MCPSessionPool(size=2, command=STUB_COMMAND, url="")
+    submit(pool.start()).result(timeout=30)
+    yield pool
+    submit(pool.close()).result(timeout=10)
+
+
+def _search(pool: MCPSessionPool, query: str):
+    result = submit(pool.call_tool(MCP_SEARCH_TOOL, {"query": query, "num": 5})).result(timeout=10)
+    return tool_result_json(result)
+
+
+def test_pool_requires_server():
+    """Without MCP_SERVER_URL or MCP_SERVER_COMMAND the pool refuses to start."""
+    with pytest.raises(ValueError):
+        MCPSessionPool(size=1, command="", url="")
+
+
+def test_pool_call(pool):
+    """Tool calls go over the warm sessions and return the stub's results."""
+    payload = _search(pool, "stainless steel kettle")
+
+    assert payload["shopping"], "Stub should return shopping results"
+    stats = pool.stats()
+    assert stats["healthy"] == 2 and stats["calls"] == 1, f"Unexpected stats: {stats}"
+
+
+def test_pool_survives_closed_session_and_reconnects(pool, monkeypatch):
+    """A session whose server went away is routed around, then reconnected by the health loop."""
+    monkeypatch.setattr(mcp_pool, "MCP_HEALTH_INTERVAL", 0.1)
+    # Restart the health loop so it picks up the short interval
+    submit(_restart_health_loop(pool)).result(timeout=5)
+
+    dead = pool.sessions[0]
+    submit(dead.close()).result(timeout=10)
+    assert not dead.healthy
+
+    # Calls keep working on the remaining session
+    assert _search(pool, "organic shampoo")["shopping"]
+
+    deadline = time.monotonic() + 20
+    while not dead.healthy and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert dead.healthy, "Closed session should be reconnected"
+    assert pool.stats()["reconnects"] >= 1
+    assert _search(pool, "running shoes")["shopping"]
+
+
+async def _restart_health_loop(pool: MCPSessionPool):
+    pool._health_task.cancel()
+    pool._health_task = asyncio.create_task(pool._health_loop())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
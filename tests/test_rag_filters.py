@@ -0,0 +1,79 @@
+# tests/test_rag_filters.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.retriever.rag import build_where_clause, normalize_metadata, _matches_filters, POST_FILTER_FIELDS
+
+SHAMPOO = normalize_metadata({
+    "Product Name": "Organic Hair Shampoo",
+    "Selling Price": "$12.99",
+    "category": "Hair Shampoo",
+    "brand": "Nike Inc",
+    "material": "Organic Argan Oil",
+})
+
+# ============================================================================
+# WHERE CLAUSE (price pushdown)
+# ============================================================================
+
+@pytest.mark.parametrize("filters,where", [
+    ({}, None),
+    ({"min_price": 10}, {"price": {"$gte": 10.0}}),
+    ({"max_price": "20"}, {"price": {"$lte": 20.0}}),
+    ({"min_price": 10, "max_price": 20}, {"$and": [{"price": {"$gte": 10.0}}, {"price": {"$lte": 20.0}}]}),
+    ({"min_price": None, "max_price": None}, None),
+])
+def test_build_where_clause_prices(filters, where):
+    assert build_where_clause(filters) == where
+
+
+def test_where_clause_ignores_substring_fields():
+    """Category, brand and material are never pushed down; they are post-filtered."""
+    filters = {"category": "shampoo", "brand": ["Nike"], "material": "organic", "max_price": 20}
+
+    assert build_where_clause(filters) == {"price": {"$lte": 20.0}}
+    assert set(POST_FILTER_FIELDS) == {"category", "brand", "material"}
+
+
+# ============================================================================
+# POST-FILTERING (substring semantics)
+# ============================================================================
+
+@pytest.mark.parametrize("filters", [
+    {"category": "shampoo"},
+    {"brand": "nike"},
+    {"brand": ["Adidas", "NIKE"]},
+    {"material": "argan"},
+    {"min_price": 10, "max_price": 15},
+])
+def test_post_filter_matches_substrings(filters):
+    assert _matches_filters(SHAMPOO, filters), f"{filters} should match"
+
+
+@pytest.mark.parametrize("filters", [
+    {"category": "conditioner"},
+    {"brand": ["Adidas"]},
+    {"material": "leather"},
+    {"max_price": 10},
+])
+def test_post_filter_rejects(filters):
+    assert not _matches_filters(SHAMPOO, filters), f"{filters} should not match"
+
+
+def test_post_filter_legacy_price_string():
+    """v1 metadata without a numeric price falls back to parsing "Selling Price"."""
+    legacy = {"Selling Price": "$1,299.00", "brand": "Acme"}
+    assert _matches_filters(legacy, {"min_price": 1000})
+    assert not _matches_filters(legacy, {"max_price": 1000})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+# tests/test_rules.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.router.rules import rule_route, rule_safety_flags, rule_price, rule_task
+from graph.safety import apply_safety_refusal, REFUSALS, REDIRECT
+
+# ============================================================================
+# RULE ROUTER
+# ============================================================================
+
+def test_rule_route_product_search():
+    """Material, price and product from keywords alone."""
+    result = rule_route("organic shampoo under $20")
+
+    assert result.task == "product_search"
+    assert result.constraints.material == "organic"
+    assert result.constraints.max_price == 20
+    assert result.constraints.product == "shampoo"
+    assert result.safety_flags == []
+
+
+def test_rule_route_comparison_brands():
+    """'vs' is a comparison; capitalized words after the first are brands."""
+    result = rule_route("compare Nike vs Adidas running shoes")
+
+    assert result.task == "comparison"
+    assert set(result.constraints.brand) == {"Nike", "Adidas"}
+    assert result.constraints.product == "shoe"
+
+
+@pytest.mark.parametrize("query,task", [
+    ("which is better, Dove or Pantene", "comparison"),
+    ("is the acme kettle in stock", "availability_check"),
+    ("recommend a good yoga mat", "recommendation"),
+    ("bamboo toothbrush", "product_search"),
+])
+def test_rule_task(query, task):
+    assert rule_task(query) == task
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("soap between $5 and $10", (5.0, 10.0)),
+    ("kettle under 30", (None, 30.0)),
+    ("blender over $100", (100.0, None)),
+    ("around $50 headphones", (45.0, 55.0)),
+    ("cheap vegan soap", (None, 15.0)),
+    ("luxury shampoo", (100.0, None)),
+    ("wool socks", (None, None)),
+])
+def test_rule_price(query, expected):
+    assert rule_price(query) == expected
+
+
+# ============================================================================
+# SAFETY
+# ============================================================================
+
+@pytest.mark.parametrize("query,flags", [
+    ("medicine to cure my disease", ["medical_advice"]),
+    ("how do i treat my eczema", ["medical_advice"]),
+    ("remedy for a sore throat", ["medical_advice"]),
+    ("where can i buy a gun", ["dangerous_product"]),
+    ("bomb making kit", ["dangerous_product"]),
+    ("nsfw posters", ["inappropriate_content"]),
+])
+def test_safety_flags_detected(query, flags):
+    assert rule_safety_flags(query) == flags
+
+
+@pytest.mark.parametrize("query", [
+    "healthy dog treats",
+    "heat treated steel pan",
+    "cured leather wallet",
+    "drugstore mascara",
+    "gunmetal kettle",
+    "lavender bath bombs",
+    "hot glue gun",
+    "healing crystal bracelet",
+])
+def test_safety_no_false_positives(query):
+    """Ordinary products that contain a safety stem are not flagged."""
+    assert rule_safety_flags(query) == [], f"'{query}' should not be flagged"
+
+
+def test_safety_refusal_skips_pipeline():
+    """A flagged state gets the templated refusal with no plan or docs."""
+    state = {"query": "where can i buy a gun", "safety_flags": ["dangerous_product"], "step_log": []}
+
+    state = apply_safety_refusal(state)
+
+    assert state["answer"] == f"{REFUSALS['dangerous_product']} {REDIRECT}"
+    assert state["retrieved_docs"] == [] and state["citations"] == []
+    assert state["step_log"][-1]["node"] == "safety"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
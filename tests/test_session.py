@@ -0,0 +1,112 @@
+# tests/test_session.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.session import parse_followup, refine_candidates
+
+# Cached candidates from "running shoes", in retrieval order
+SHOES = [
+    {"doc_id": "1", "title": "Nike Pegasus", "brand": "Nike", "price": 120.0, "source": "rag"},
+    {"doc_id": "2", "title": "Adidas Ultraboost", "brand": "Adidas", "price": 150.0, "source": "rag"},
+    {"doc_id": "3", "title": "Nike Revolution", "brand": "Nike", "price": 65.0, "source": "rag"},
+    {"doc_id": "4", "title": "Asics Gel Trail", "brand": "Asics", "price": 90.0, "source": "rag"},
+    {"title": "Waterproof Trail Runner", "brand": "Salomon", "price": 110.0, "source": "web"},
+]
+
+
+class FakeBackend:
+    """Vectors by keyword: "trail"/"waterproof" point one way, everything else the other"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def _vector(self, text: str) -> np.ndarray:
+        text = text.lower()
+        return np.array([1.0, 0.1] if ("trail" in text or "waterproof" in text) else [0.1, 1.0], dtype="float32")
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.stack([self._vector(t) for t in texts])
+
+    def vectors(self, doc_ids):
+        by_id = {d["doc_id"]: d for d in SHOES if "doc_id" in d}
+        return {i: self._vector(by_id[i]["title"]) for i in doc_ids if i in by_id}
+
+
+def _state(query: str, shown=("1", "2")) -> dict:
+    return {
+        "query": query,
+        "session_query": "running shoes",
+        "session_candidates": list(SHOES),
+        "session_filters": {},
+        "session_shown": list(shown),
+    }
+
+
+# ============================================================================
+# PARSE FOLLOW-UP
+# ============================================================================
+
+@pytest.mark.parametrize("query,expected", [
+    ("cheaper ones?", {"filters": {}, "sort": "price_asc", "more": False, "rerank": False}),
+    ("only Nike", {"filters": {"brand": ["Nike"]}, "sort": None, "more": False, "rerank": False}),
+    ("only Nike under $80", {"filters": {"brand": ["Nike"], "max_price": 80.0}, "sort": None, "more": False, "rerank": False}),
+    ("show me more", {"filters": {}, "sort": None, "more": True, "rerank": False}),
+    ("what about waterproof ones", {"filters": {}, "sort": None, "more": False, "rerank": True}),
+])
+def test_parse_followup(query, expected):
+    assert parse_followup(query, "running shoes") == expected
+
+
+@pytest.mark.parametrize("query", ["leather boots", "bluetooth headphones"])
+def test_new_product_is_a_new_search(query):
+    """Naming a product outside the cached search starts over."""
+    assert parse_followup(query, "running shoes") is None
+
+
+# ============================================================================
+# REFINE CANDIDATES
+# ============================================================================
+
+def test_cheaper_returns_cheaper_than_shown():
+    """'cheaper' keeps candidates under the cheapest one already shown, cheapest first."""
+    state = _state("cheaper ones?")
+    docs = refine_candidates(state, parse_followup(state["query"], state["session_query"]))
+
+    assert [d["price"] for d in docs] == [65.0, 90.0, 110.0]
+
+
+def test_brand_filter_sticks_to_session():
+    """A brand follow-up filters the cached set and is kept for later turns."""
+    state = _state("only Nike")
+    docs = refine_candidates(state, parse_followup(state["query"], state["session_query"]))
+
+    assert [d["title"] for d in docs] == ["Nike Pegasus", "Nike Revolution"]
+    assert state["session_filters"] == {"brand": ["Nike"]}
+
+
+def test_rerank_uses_stored_vectors(monkeypatch):
+    """Re-ranking reads indexed vectors from the backend and only encodes the query and web docs."""
+    backend = FakeBackend()
+    monkeypatch.setattr("graph.session.get_backend", lambda: backend)
+    state = _state("what about waterproof ones")
+
+    docs = refine_candidates(state, parse_followup(state["query"], state["session_query"]))
+
+    assert {d["title"] for d in docs[:2]} == {"Asics Gel Trail", "Waterproof Trail Runner"}
+    assert backend.encoded == ["running shoes what about waterproof ones", "Waterproof Trail Runner"], \
+        f"Only the query and the web doc should be encoded, got {backend.encoded}"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
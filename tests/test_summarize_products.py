@@ -0,0 +1,65 @@
+# tests/test_summarize_products.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from scripts.summarize_products import summarize_row, parse_spec, extract_features
+
+KETTLE = {
+    "material": "Stainless Steel",
+    "Product Specification": (
+        "ProductDimensions:14.7x11.1x10.2inches; 4.06 pounds|Item Weight:2.5 pounds"
+        "|Manufacturer recommended age:8yearsandup"
+    ),
+    "About Product": (
+        "Make sure this fits by entering your model number. | Boils water in 3 minutes. Very fast. "
+        "| Auto shut-off and boil-dry protection keep you safe while you are busy doing other things "
+        "| Cool-touch handle | Stays warm"
+    ),
+    "Shipping Weight": "3 pounds",
+}
+
+
+def test_summarize_row_key_facts():
+    """Material, spec facts and the first feature bullets, in a fixed order."""
+    assert summarize_row(KETTLE) == (
+        "Material: Stainless Steel. Size: 14.7 x 11.1 x 10.2 inches. Weight: 2.5 pounds. Age: 8 years and up. "
+        "Features: Boils water in 3 minutes; "
+        "Auto shut-off and boil-dry protection keep you safe while you are busy...; Cool-touch handle."
+    )
+
+
+def test_summarize_row_column_fallbacks():
+    """Product Dimensions and Shipping Weight columns fill in for a missing spec."""
+    row = {"Product Dimensions": "3.5x6.2x13inches", "Shipping Weight": "1.2 pounds (View shipping rates and policies)"}
+    assert summarize_row(row) == "Size: 3.5 x 6.2 x 13 inches. Weight: 1.2 pounds."
+
+
+@pytest.mark.parametrize("row", [
+    {},
+    {"material": "nan", "About Product": "Make sure this fits by entering your model number."},
+])
+def test_summarize_row_nothing_known(row):
+    """Rows with only boilerplate or null values get no summary."""
+    assert summarize_row(row) is None
+
+
+def test_parse_spec_first_value_wins():
+    assert parse_spec("Item Weight: 1 pounds|Item Weight: 2 pounds|Color: red") == {"Weight": "1 pounds"}
+
+
+def test_extract_features_skips_boilerplate():
+    features = extract_features(KETTLE["About Product"], max_features=2)
+    assert features[0] == "Boils water in 3 minutes"
+    assert len(features) == 2 and not any("fits" in f for f in features)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+# tests/test_templates.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.answerer.templates import render_answer, select_answer_mode
+
+KETTLE = {"title": "Acme Steel Kettle", "brand": "Acme", "price": 24.99, "rating": 4.6, "source": "rag"}
+CHEAP = {"title": "Zed Kettle", "brand": "Zed", "price": 19.5, "rating": 4.1, "source": "rag"}
+
+
+def test_select_answer_mode(monkeypatch):
+    """Only simple tasks with few docs skip the LLM."""
+    monkeypatch.setattr("graph.answerer.templates.TEMPLATE_TASKS", {"availability_check", "product_search"})
+    monkeypatch.setattr("graph.answerer.templates.TEMPLATE_MAX_DOCS", 5)
+
+    assert select_answer_mode("comparison", [KETTLE]) == "llm"
+    assert select_answer_mode("recommendation", [KETTLE]) == "llm"
+    assert select_answer_mode("availability_check", [KETTLE] * 8) == "template"
+    assert select_answer_mode("product_search", [KETTLE] * 5) == "template"
+    assert select_answer_mode("product_search", [KETTLE] * 6) == "llm"
+
+
+def test_template_tasks_opt_out(monkeypatch):
+    """A task left out of TEMPLATE_TASKS always goes to the LLM."""
+    monkeypatch.setattr("graph.answerer.templates.TEMPLATE_TASKS", {"availability_check"})
+    assert select_answer_mode("product_search", [KETTLE]) == "llm"
+
+
+def test_product_search_cites_every_mention():
+    """Every doc mentioned is cited, and citations match the [DOC i] markers."""
+    result = render_answer("product_search", [KETTLE, CHEAP], ["price"])
+
+    assert result["answer"].startswith("I found 2 matching products.")
+    assert "The lowest price is Zed Kettle at $19.50 [DOC 2]." in result["answer"]
+    assert result["citations"] == ["DOC 1", "DOC 2"]
+
+
+def test_product_search_fallback_not_called_matching():
+    """Unfiltered semantic fallback results are not presented as matches."""
+    docs = [{**KETTLE, "semantic_fallback": True}]
+    answer = render_answer("product_search", docs)["answer"]
+
+    assert "matching" not in answer
+    assert answer.startswith("I couldn't find an exact match")
+
+
+def test_availability_in_stock_and_out_of_stock():
+    """Known stock status from a web provider is stated plainly."""
+    web_in = {**KETTLE, "source": "web", "in_stock": True}
+    web_out = {**CHEAP, "source": "web", "in_stock": False}
+
+    assert render_answer("availability_check", [web_in])["answer"] == \
+        "Yes, Acme Steel Kettle is available online at $24.99 [DOC 1]."
+    assert render_answer("availability_check", [web_out])["answer"] == \
+        "Zed Kettle is currently out of stock [DOC 1]."
+
+
+def test_availability_unknown_stock():
+    """A web result without stock information is not reported as available."""
+    answer = render_answer("availability_check", [{**KETTLE, "source": "web", "in_stock": None}])["answer"]
+
+    assert not answer.startswith("Yes")
+    assert "stock status unknown" in answer
+
+
+def test_stale_price_is_hedged():
+    """A price served from a stale web cache entry is marked as such."""
+    doc = {**KETTLE, "source": "web", "in_stock": None, "stale_fields": ["in_stock", "price"]}
+    answer = render_answer("availability_check", [doc])["answer"]
+
+    assert "$24.99 (last seen price)" in answer
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
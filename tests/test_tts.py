@@ -0,0 +1,85 @@
+# tests/test_tts.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from voice.tts import SentenceSplitter, SentenceTTS, FakeBackend, split_sentences, speakable
+
+ANSWER = (
+    "The Acme Steel Kettle is $24.99 and holds 1.7 liters [DOC 1]. "
+    "It has a 4.6 rating from 1,200 reviews, e.g. for boiling speed [DOC 2].\n"
+    "- The Zed kettle is cheaper at $19.50 [DOC 3].\n"
+    "Citations: [DOC 1], [DOC 2], [DOC 3]"
+)
+
+
+def _split_in_deltas(text: str, size: int):
+    splitter = SentenceSplitter()
+    sentences = []
+    for i in range(0, len(text), size):
+        sentences += splitter.feed(text[i:i + size])
+    rest = splitter.flush()
+    return sentences + [rest] if rest else sentences
+
+
+def test_citations_are_not_spoken():
+    """Inline [DOC n] markers, list bullets and the citation tail are stripped."""
+    sentences = split_sentences(ANSWER)
+
+    assert sentences == [
+        "The Acme Steel Kettle is $24.99 and holds 1.7 liters.",
+        "It has a 4.6 rating from 1,200 reviews, e.g. for boiling speed.",
+        "The Zed kettle is cheaper at $19.50.",
+    ], f"Unexpected sentences: {sentences}"
+    assert not any("DOC" in s or "Citations" in s for s in sentences)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 50, 1000])
+def test_delta_boundaries_do_not_change_sentences(size):
+    """Sentences are the same however the text is cut into deltas (incl. mid 'Citations:')."""
+    assert _split_in_deltas(ANSWER, size) == split_sentences(ANSWER)
+
+
+def test_short_fragments_merge_into_next_sentence():
+    """Fragments under TTS_MIN_CHARS are spoken with the following sentence."""
+    sentences = split_sentences("Yes. The Acme kettle is in stock at $24.99.")
+    assert sentences == ["Yes. The Acme kettle is in stock at $24.99."]
+
+
+def test_nothing_after_citation_tail():
+    """Text after the citation tail is ignored, even in later deltas."""
+    splitter = SentenceSplitter()
+    splitter.feed("The Acme kettle is a good pick. Citations:")
+    assert splitter.feed(" [DOC 1]. More text that should never be spoken.") == []
+    assert splitter.flush() == ""
+
+
+def test_speakable_strips_markdown():
+    """Markdown emphasis and inline citations are not read aloud."""
+    assert speakable("**Best:** the *Acme* kettle [DOC 2]") == "Best: the Acme kettle"
+
+
+def test_sentence_tts_keeps_order(monkeypatch):
+    """Audio chunks come out in sentence order with the fake backend, no cache."""
+    monkeypatch.setattr("voice.tts.FAKE_SYNTH_MS_PER_CHAR", 0)
+    monkeypatch.setattr("voice.tts.get_tts_cache", lambda: None)
+    tts = SentenceTTS(FakeBackend())
+    for i in range(0, len(ANSWER), 5):
+        tts.feed(ANSWER[i:i + 5])
+    tts.close()
+
+    chunks = list(tts.chunks())
+    assert [c["index"] for c in chunks] == list(range(len(chunks)))
+    assert [c["text"] for c in chunks] == split_sentences(ANSWER)
+    assert all(c["audio"][:4] == b"RIFF" and not c["cached"] for c in chunks)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
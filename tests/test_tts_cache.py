@@ -0,0 +1,97 @@
+# tests/test_tts_cache.py
+import pytest
+import sys
+import os
+import time
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from voice.tts_cache import AudioCache, cache_key
+
+AUDIO = b"x" * 100  # every entry is 100 bytes
+
+
+def _key(text: str) -> str:
+    return cache_key(text, "alloy", "wav", "fake")
+
+
+def test_cache_key_normalizes_whitespace():
+    """Whitespace differences map to the same entry; voice and backend don't."""
+    assert cache_key("No products  found.", "alloy", "wav", "fake") == cache_key(" No products found. ", "alloy", "wav", "fake")
+    assert cache_key("No products found.", "alloy", "wav", "fake") != cache_key("No products found.", "echo", "wav", "fake")
+    assert cache_key("No products found.", "alloy", "wav", "fake") != cache_key("No products found.", "alloy", "wav", "openai")
+
+
+def test_hit_and_miss(tmp_path):
+    """put() then get() returns the audio; unknown keys miss."""
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    cache.put(_key("a"), "wav", AUDIO)
+
+    assert cache.get(_key("a")) == AUDIO
+    assert cache.get(_key("b")) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 100)
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    """Past max_bytes the least recently used entry is deleted, not the oldest written."""
+    cache = AudioCache(str(tmp_path), max_bytes=300)
+    for text in ("a", "b", "c"):
+        cache.put(_key(text), "wav", AUDIO)
+    cache.get(_key("a"))  # "b" is now least recently used
+
+    cache.put(_key("d"), "wav", AUDIO)
+
+    assert cache.get(_key("b")) is None, "LRU entry should be evicted"
+    assert all(cache.get(_key(t)) == AUDIO for t in ("a", "c", "d"))
+    assert cache.total_bytes <= 300
+    assert len(list(tmp_path.glob("*/*.wav"))) == 3, "Evicted file should be removed from disk"
+
+
+def test_oversized_audio_is_not_cached(tmp_path):
+    """A single clip bigger than the whole cache is skipped."""
+    cache = AudioCache(str(tmp_path), max_bytes=50)
+    cache.put(_key("a"), "wav", AUDIO)
+    assert cache.get(_key("a")) is None
+
+
+def test_recency_survives_restart(tmp_path):
+    """A new cache over the same directory keeps LRU order from file mtimes."""
+    cache = AudioCache(str(tmp_path), max_bytes=300)
+    for text in ("a", "b", "c"):
+        cache.put(_key(text), "wav", AUDIO)
+    # Make the write order unambiguous, then read "a" so it is the most recent
+    now = time.time()
+    for age, text in ((30, "a"), (20, "b"), (10, "c")):
+        path = next(tmp_path.glob(f"*/{_key(text)}.wav"))
+        os.utime(path, (now - age, now - age))
+    cache.get(_key("a"))
+
+    restarted = AudioCache(str(tmp_path), max_bytes=300)
+    assert restarted.total_bytes == 300
+    restarted.put(_key("d"), "wav", AUDIO)
+
+    assert restarted.get(_key("b")) is None, "Least recently used before the restart should go first"
+    assert restarted.get(_key("a")) == AUDIO
+
+
+def test_restart_removes_partial_writes(tmp_path):
+    """Leftover .tmp files from a crashed write are deleted on load."""
+    (tmp_path / "ab").mkdir()
+    partial = tmp_path / "ab" / "abcd.wav.123.tmp"
+    partial.write_bytes(b"partial")
+
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+
+    assert not partial.exists()
+    assert cache.stats()["entries"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+# tests/test_web_cache.py
+import pytest
+import sys
+import time
+import threading
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.retriever import web_cache
+
+DOCS = [{"title": "Steel Kettle", "url": "https://example.com/kettle", "price": 24.99, "in_stock": True, "source": "web"}]
+
+
+def _age(key: str, seconds: float):
+    """Pretend the entry was fetched seconds ago"""
+    web_cache._entries[key]["fetched_at"] = time.monotonic() - seconds
+
+
+def _no_refresh():
+    raise AssertionError("refresh should not be called")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    web_cache.clear()
+    yield
+    web_cache.clear()
+
+
+def test_cache_key_normalizes_query_and_filters():
+    """Case, punctuation and filter order don't change the key."""
+    a = web_cache.cache_key("Steel Kettle!", {"brand": ["Acme", "Zed"], "max_price": 30})
+    b = web_cache.cache_key("steel  kettle", {"max_price": 30, "brand": ["zed", "acme"], "material": ""})
+    assert a == b
+
+
+def test_fresh_hit():
+    """Within the shortest field TTL the entry is returned as stored."""
+    key = web_cache.cache_key("kettle", {})
+    web_cache.put(key, DOCS)
+
+    assert web_cache.get(key, refresh=_no_refresh) == DOCS
+    assert web_cache.get_web_cache_stats()["fresh_hits"] == 1
+
+
+def test_stale_hit_tags_fields_and_drops_stock():
+    """Past the fresh TTL the docs are served stale, tagged, without in_stock."""
+    key = web_cache.cache_key("kettle", {})
+    web_cache.put(key, DOCS)
+    fresh_ttl = web_cache._entries[key]["fresh_ttl"]
+    _age(key, fresh_ttl + 1)
+
+    docs = web_cache.get(key, refresh=lambda: DOCS)
+
+    assert docs is not None, "Stale entry should still be served"
+    assert "price" in docs[0]["stale_fields"]
+    assert docs[0]["in_stock"] is None, "Stale stock status should be dropped"
+    assert DOCS[0]["in_stock"] is True, "Cached docs must not be modified"
+
+
+def test_expired_after_max_stale():
+    """Stale serving ends WEB_CACHE_MAX_STALE_S after the fresh TTL."""
+    key = web_cache.cache_key("kettle", {})
+    web_cache.put(key, DOCS)
+    entry = web_cache._entries[key]
+    assert entry["stale_ttl"] <= entry["fresh_ttl"] + web_cache.WEB_CACHE_MAX_STALE_S
+    _age(key, entry["stale_ttl"] + 1)
+
+    assert web_cache.get(key, refresh=_no_refresh) is None
+    assert web_cache.get_web_cache_stats()["misses"] == 1
+
+
+def test_empty_results_use_negative_ttl():
+    """An empty result is cached only for WEB_CACHE_EMPTY_TTL_S."""
+    key = web_cache.cache_key("nothing matches", {})
+    web_cache.put(key, [])
+
+    assert web_cache.get(key, refresh=_no_refresh) == []
+    _age(key, web_cache.WEB_CACHE_EMPTY_TTL_S + 1)
+    assert web_cache.get(key, refresh=_no_refresh) is None
+
+
+def test_single_background_refresh():
+    """Concurrent stale lookups start one refresh, which makes the entry fresh again."""
+    key = web_cache.cache_key("kettle", {})
+    web_cache.put(key, DOCS)
+    _age(key, web_cache._entries[key]["fresh_ttl"] + 1)
+
+    release, calls = threading.Event(), []
+    refreshed = [{**DOCS[0], "price": 19.99}]
+
+    def refresh():
+        calls.append(1)
+        release.wait(timeout=5)
+        return refreshed
+
+    for _ in range(5):
+        assert web_cache.get(key, refresh=refresh) is not None
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while web_cache.get_web_cache_stats()["refreshes"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) == 1, f"Expected one refresh, got {len(calls)}"
+    assert web_cache.get(key, refresh=_no_refresh) == refreshed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+# tests/test_web_hedge.py
+import pytest
+import sys
+import time
+import uuid
+import asyncio
+import concurrent.futures
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.retriever.web_hedge import HedgedProvider, get_tracker, WEB_HEDGE_MIN_SAMPLES
+from graph.retriever.breaker import CircuitOpenError
+
+
+class FakeProvider:
+    """Answers after latency_ms (or raises error), remembering whether it was cancelled"""
+
+    def __init__(self, latency_ms: float, error: Exception = None, p90_ms: float = None):
+        self.name = f"fake-{uuid.uuid4().hex[:8]}"  # own latency tracker per test
+        self.latency_ms = latency_ms
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        if p90_ms is not None:
+            for _ in range(WEB_HEDGE_MIN_SAMPLES):
+                get_tracker(self.name).record(p90_ms)
+
+    async def asearch(self, query, filters, k=5):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency_ms / 1000)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return [{"title": f"{query} from {self.name}", "source": "web"}]
+
+
+def test_hedge_not_sent_when_primary_is_fast():
+    """A primary that answers within its p90 is the only provider called."""
+    primary, secondary = FakeProvider(5, p90_ms=200), FakeProvider(5)
+
+    docs = HedgedProvider([primary, secondary]).search("kettle", {})
+
+    assert docs[0]["title"] == f"kettle from {primary.name}"
+    assert secondary.calls == 0, "Secondary should not be called"
+
+
+def test_hedge_fires_after_p90_and_cancels_loser():
+    """A primary past its p90 is hedged; the faster secondary wins and the primary is cancelled."""
+    primary, secondary = FakeProvider(1000, p90_ms=50), FakeProvider(10)
+
+    start = time.perf_counter()
+    docs = HedgedProvider([primary, secondary]).search("kettle", {})
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert docs[0]["title"] == f"kettle from {secondary.name}"
+    assert elapsed_ms < 500, f"Hedge should answer well before the primary, took {elapsed_ms:.0f}ms"
+    time.sleep(0.05)  # cancellation is delivered on the client loop
+    assert primary.cancelled, "Losing primary should be cancelled"
+
+
+def test_failover_on_error_without_waiting():
+    """A primary that fails fast goes to the next provider immediately, not after the hedge delay."""
+    primary, secondary = FakeProvider(0, error=RuntimeError("503"), p90_ms=1000), FakeProvider(5)
+
+    start = time.perf_counter()
+    docs = HedgedProvider([primary, secondary]).search("kettle", {})
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert docs[0]["title"] == f"kettle from {secondary.name}"
+    assert elapsed_ms < 500, f"Failover should not wait for the 1000ms hedge delay, took {elapsed_ms:.0f}ms"
+
+
+def test_open_breaker_fails_over():
+    """A provider rejected by its breaker is skipped straight away."""
+    primary, secondary = FakeProvider(0, error=CircuitOpenError("open"), p90_ms=1000), FakeProvider(5)
+
+    docs = HedgedProvider([primary, secondary]).search("kettle", {})
+
+    assert docs[0]["title"] == f"kettle from {secondary.name}"
+
+
+def test_all_providers_fail_raises_last_error():
+    """When every provider fails the last error is raised."""
+    providers = [FakeProvider(0, error=RuntimeError("first")), FakeProvider(0, error=RuntimeError("second"))]
+
+    with pytest.raises(RuntimeError, match="second"):
+        HedgedProvider(providers).search("kettle", {})
+
+
+def test_search_gives_up_after_timeout():
+    """A hedge that never answers times out and cancels its provider requests."""
+    primary, secondary = FakeProvider(5000, p90_ms=20), FakeProvider(5000)
+    hedged = HedgedProvider([primary, secondary])
+    hedged.timeout = 0.2
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        hedged.search("kettle", {})
+
+    time.sleep(0.05)  # cancellation runs on the client loop
+    assert primary.cancelled and secondary.cancelled, "Timed-out requests should be cancelled"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+# tests/test_web_providers.py
+import pytest
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Set up logging (only show warnings and errors)
+logging.basicConfig(level=logging.WARNING, format='%(name)s - %(levelname)s - %(message)s')
+
+from graph.retriever.web_providers import SerperProvider, parse_price, build_search_query
+from graph.retriever.web import apply_price_filters
+
+# Trimmed Serper /shopping response
+SERPER_PAYLOAD = {
+    "searchParameters": {"q": "electric kettle", "type": "shopping"},
+    "shopping": [
+        {
+            "title": "Acme Steel Kettle 1.7L",
+            "source": "Walmart",
+            "link": "https://example.com/acme-kettle",
+            "price": "$24.99",
+            "delivery": "Free delivery",
+            "rating": 4.6,
+            "ratingCount": 1200,
+            "productId": "123",
+            "inStock": True,
+        },
+        {
+            "title": "Zed Glass Kettle",
+            "source": "Target",
+            "link": "https://example.com/zed-kettle",
+            "price": "From $1,019.50",
+            "snippet": "Borosilicate glass",
+        },
+        {"title": "No link", "price": "$5.00"},
+        {"link": "https://example.com/no-title"},
+    ],
+}
+
+
+def test_parse_response_standard_docs():
+    """Shopping items become ranked web product dicts; items without a title or link are skipped."""
+    docs = SerperProvider(api_key="test").parse_response(SERPER_PAYLOAD, {"material": "steel"})
+
+    assert [d["title"] for d in docs] == ["Acme Steel Kettle 1.7L", "Zed Glass Kettle"]
+    acme, zed = docs
+    assert acme["doc_id"] == "web_123"
+    assert acme["price"] == 24.99 and zed["price"] == 1019.5
+    assert (acme["rating"], acme["review_count"], acme["in_stock"]) == (4.6, 1200, True)
+    assert acme["seller"] == "Walmart" and acme["url"] == "https://example.com/acme-kettle"
+    assert acme["content"] == "Acme Steel Kettle 1.7L Free delivery"
+    assert acme["material"] == "steel", "Filter values fill fields the provider doesn't return"
+    assert acme["score"] > zed["score"]
+    assert all(d["source"] == "web" for d in docs)
+
+
+def test_parse_response_unknowns():
+    """Missing rating and stock stay None; a missing productId falls back to a stable link hash."""
+    zed = SerperProvider(api_key="test").parse_response(SERPER_PAYLOAD, {})[1]
+
+    assert zed["rating"] is None and zed["in_stock"] is None
+    assert zed["doc_id"].startswith("web_") and len(zed["doc_id"]) == 16
+    assert SerperProvider(api_key="test").parse_response(SERPER_PAYLOAD, {})[1]["doc_id"] == zed["doc_id"]
+    assert SerperProvider(api_key="test").parse_response({}, {}) == []
+
+
+def test_build_request_needs_api_key():
+    with pytest.raises(ValueError):
+        SerperProvider(api_key="").build_request("kettle", {}, 5)
+
+    request = SerperProvider(api_key="secret").build_request("kettle", {"brand": ["Acme"], "material": "steel"}, 5)
+    assert request["headers"]["X-API-KEY"] == "secret"
+    assert request["json"] == {"q": "kettle Acme steel", "num": 10}
+
+
+@pytest.mark.parametrize("price,expected", [
+    ("$1,299.99", 1299.99),
+    ("From $12.50", 12.5),
+    (12, 12.0),
+    (None, 0.0),
+    ("price unavailable", 0.0),
+])
+def test_parse_price(price, expected):
+    assert parse_price(price) == expected
+
+
+def test_build_search_query_skips_mentioned_terms():
+    assert build_search_query("acme kettle", {"brand": ["Acme"], "material": "glass"}) == "acme kettle glass"
+
+
+def test_apply_price_filters():
+    """Out-of-range prices are dropped; unpriced results are kept."""
+    docs = [{"title": t, "price": p} for t, p in (("a", 5.0), ("b", 15.0), ("c", 25.0), ("unpriced", 0.0))]
+
+    kept = apply_price_filters(docs, {"min_price": 10, "max_price": "20"})
+
+    assert [d["title"] for d in kept] == ["b", "unpriced"]
+    assert apply_price_filters(docs, {}) == docs
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
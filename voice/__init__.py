@@ -0,0 +1,22 @@
+"""Voice interface: streaming speech-to-text feeding the graph, sentence-pipelined text-to-speech"""
+import importlib
+
+# Resolved on first access, so voice.asr / voice.tts (and scripts using them)
+# don't import the graph, torch or langchain through voice.pipeline
+_EXPORTS = {
+    'StreamingTranscriber': 'voice.asr', 'stream_transcribe': 'voice.asr',
+    'transcribe_audio': 'voice.asr', 'get_asr_backend': 'voice.asr',
+    'SentenceTTS': 'voice.tts', 'synthesize_stream': 'voice.tts',
+    'synthesize_speech': 'voice.tts', 'get_tts_backend': 'voice.tts',
+    'get_tts_cache_stats': 'voice.tts_cache',
+    'stream_query': 'voice.pipeline', 'stream_voice': 'voice.pipeline',
+    'voice_query': 'voice.pipeline', 'voice_to_voice_query': 'voice.pipeline',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'voice' has no attribute '{name}'")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -0,0 +1,261 @@
+# voice/asr.py
+"""
+Streaming speech-to-text
+Audio arrives as short PCM frames (16 kHz mono int16). An energy VAD cuts
+the stream into utterances; while the user is still speaking the utterance
+so far is re-decoded every ASR_PARTIAL_INTERVAL_MS and emitted as a partial
+transcript, and ASR_END_OF_UTTERANCE_MS of silence ends it with a final
+transcript. Partials whose words stopped changing are marked stable, so the
+graph can start routing/retrieval before the user finishes.
+
+    transcriber = StreamingTranscriber()
+    for frame in frames:
+        for event in transcriber.feed(frame):
+            ...  # {"type": "partial" | "final", "text", "stable", "pause", "t_ms"}
+
+Decoding runs synchronously inside feed(), so feed() must not be called
+from an audio capture callback: have the callback put frames on a queue and
+feed them from a consumer thread. To keep up in real time, a decode of the
+utterance so far has to take less than ASR_PARTIAL_INTERVAL_MS on average;
+otherwise frames back up in that queue and every event arrives late.
+
+The backend is selected by ASR_BACKEND: "whisper" (openai-whisper, imported
+lazily) or "fake" (deterministic, for tests and offline runs).
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Protocol
+import numpy as np
+import wave
+import math
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+ASR_SAMPLE_RATE = 16000
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+# VAD: 30ms frames, speech above VAD_THRESHOLD_DBFS for VAD_START_FRAMES frames starts an utterance
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_THRESHOLD_DBFS = float(os.getenv("VAD_THRESHOLD_DBFS", "-40"))
+VAD_START_FRAMES = int(os.getenv("VAD_START_FRAMES", "3"))
+# Audio kept from before speech was detected, so the first syllable isn't clipped
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "150"))
+
+ASR_PARTIAL_INTERVAL_MS = int(os.getenv("ASR_PARTIAL_INTERVAL_MS", "300"))
+ASR_END_OF_UTTERANCE_MS = int(os.getenv("ASR_END_OF_UTTERANCE_MS", "600"))
+# A partial is stable once this many consecutive decodes agree on it
+ASR_STABLE_UPDATES = int(os.getenv("ASR_STABLE_UPDATES", "2"))
+# Utterances longer than this are force-ended
+ASR_MAX_UTTERANCE_MS = int(os.getenv("ASR_MAX_UTTERANCE_MS", "15000"))
+
+
+class ASRBackend(Protocol):
+    """Interface every speech-to-text backend implements"""
+
+    name: str
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE) -> str:
+        """Text of one (possibly partial) utterance; audio is float32 in [-1, 1]"""
+        ...
+
+
+class WhisperBackend:
+    """openai-whisper, decoding the whole utterance so far on every call"""
+
+    name = "whisper"
+
+    def __init__(self, model_name: str = WHISPER_MODEL):
+        import whisper  # optional dependency, only needed for real audio
+        logger.info(f"[ASR] Loading whisper model '{model_name}'")
+        self.model = whisper.load_model(model_name)
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE) -> str:
+        if sample_rate != ASR_SAMPLE_RATE:
+            raise ValueError(f"whisper expects 16 kHz audio, got {sample_rate} Hz")
+        result = self.model.transcribe(audio.astype(np.float32), fp16=False, language="en")
+        return result["text"].strip()
+
+
+class FakeBackend:
+    """
+    Deterministic stand-in: reveals ASR_FAKE_TRANSCRIPT one word per
+    ASR_FAKE_WORD_MS of voiced audio, so partials grow while the user speaks
+    and settle in pauses like a real decoder's.
+    Pair with synthetic_speech() to generate matching audio.
+    """
+
+    name = "fake"
+
+    def __init__(self, transcript: str = None, word_ms: float = None):
+        self.transcript = transcript or os.getenv("ASR_FAKE_TRANSCRIPT", "organic shampoo under $20")
+        self.word_ms = word_ms or float(os.getenv("ASR_FAKE_WORD_MS", "300"))
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE) -> str:
+        step = sample_rate * VAD_FRAME_MS // 1000
+        voiced = sum(frame_dbfs(audio[i:i + step]) > VAD_THRESHOLD_DBFS for i in range(0, len(audio), step))
+        return " ".join(self.transcript.split()[:int(voiced * VAD_FRAME_MS // self.word_ms)])
+
+
+BACKENDS = {
+    "whisper": WhisperBackend,
+    "fake": FakeBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_asr_backend(name: str = None) -> ASRBackend:
+    """Backend selected by ASR_BACKEND (cached, whisper models are slow to load)"""
+    name = (name or ASR_BACKEND).lower().strip()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+# ============================================================================
+# Audio helpers
+# ============================================================================
+
+def to_float32(frame) -> np.ndarray:
+    """int16 PCM bytes / array -> float32 in [-1, 1]"""
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        frame = np.frombuffer(frame, dtype=np.int16)
+    frame = np.asarray(frame)
+    if frame.dtype == np.int16:
+        return frame.astype(np.float32) / 32768.0
+    return frame.astype(np.float32)
+
+
+def frame_dbfs(frame: np.ndarray) -> float:
+    """RMS level of a float32 frame in dBFS (-inf for digital silence)"""
+    rms = float(np.sqrt(np.mean(np.square(frame)))) if len(frame) else 0.0
+    return 20 * math.log10(rms) if rms > 0 else float("-inf")
+
+
+def read_wav_frames(path: str, frame_ms: int = VAD_FRAME_MS) -> Iterator[np.ndarray]:
+    """Frames of a 16 kHz mono 16-bit WAV file, as a microphone would deliver them"""
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != ASR_SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected {ASR_SAMPLE_RATE} Hz mono 16-bit PCM")
+        samples_per_frame = ASR_SAMPLE_RATE * frame_ms // 1000
+        while True:
+            data = wav.readframes(samples_per_frame)
+            if not data:
+                return
+            yield np.frombuffer(data, dtype=np.int16)
+
+
+def synthetic_speech(text: str, word_ms: float = 300, lead_ms: int = 300, tail_ms: int = 900,
+                     frame_ms: int = VAD_FRAME_MS) -> List[np.ndarray]:
+    """Tone frames lasting word_ms per word between silences, for FakeBackend runs"""
+    samples_per_frame = ASR_SAMPLE_RATE * frame_ms // 1000
+    speech_ms = len(text.split()) * word_ms
+    t = np.arange(int(ASR_SAMPLE_RATE * speech_ms / 1000)) / ASR_SAMPLE_RATE
+    audio = np.concatenate([
+        np.zeros(ASR_SAMPLE_RATE * lead_ms // 1000),
+        0.3 * np.sin(2 * np.pi * 220 * t),
+        np.zeros(ASR_SAMPLE_RATE * tail_ms // 1000),
+    ])
+    pcm = (audio * 32767).astype(np.int16)
+    return [pcm[i:i + samples_per_frame] for i in range(0, len(pcm), samples_per_frame)]
+
+
+# ============================================================================
+# Streaming transcription
+# ============================================================================
+
+class StreamingTranscriber:
+    """VAD + incremental decoding over a stream of PCM frames"""
+
+    def __init__(self, backend: ASRBackend = None, sample_rate: int = ASR_SAMPLE_RATE):
+        self.backend = backend or get_asr_backend()
+        self.sample_rate = sample_rate
+        self.preroll_frames = max(1, VAD_PREROLL_MS // VAD_FRAME_MS)
+        self.reset()
+
+    def reset(self):
+        self.t_ms = 0.0  # Stream time at the end of the last frame
+        self.in_speech = False
+        self.loud_run = 0  # Consecutive speech frames while waiting for an utterance
+        self.silence_ms = 0.0
+        self.preroll: List[np.ndarray] = []
+        self.utterance: List[np.ndarray] = []
+        self.utterance_ms = 0.0
+        self.last_decode_ms = 0.0
+        self.partials: List[str] = []  # Recent partial texts, for stability
+
+    def _decode(self) -> str:
+        return self.backend.transcribe(np.concatenate(self.utterance), self.sample_rate)
+
+    def _partial(self, pause: bool = False) -> Dict:
+        text = self._decode()
+        self.partials = (self.partials + [text])[-ASR_STABLE_UPDATES:]
+        stable = bool(text) and len(self.partials) == ASR_STABLE_UPDATES and len(set(self.partials)) == 1
+        self.last_decode_ms = self.utterance_ms
+        return {"type": "partial", "text": text, "stable": stable, "pause": pause, "t_ms": round(self.t_ms)}
+
+    def _final(self, reason: str) -> Dict:
+        event = {"type": "final", "text": self._decode(), "stable": True, "t_ms": round(self.t_ms),
+                 "utterance_ms": round(self.utterance_ms), "reason": reason}
+        logger.info(f"[ASR] End of utterance ({reason}) after {event['utterance_ms']}ms: '{event['text']}'")
+        self.in_speech, self.loud_run, self.silence_ms = False, 0, 0.0
+        self.utterance, self.utterance_ms, self.last_decode_ms, self.partials = [], 0.0, 0.0, []
+        return event
+
+    def feed(self, frame) -> List[Dict]:
+        """
+        Consume one frame; returns the partial/final events it produced (usually none)
+
+        Blocks for a full decode whenever a partial or final is due (see the
+        module docstring for the real-time constraint).
+        """
+        frame = to_float32(frame)
+        frame_ms = len(frame) / self.sample_rate * 1000
+        self.t_ms += frame_ms
+        speech = frame_dbfs(frame) > VAD_THRESHOLD_DBFS
+
+        if not self.in_speech:
+            self.preroll = (self.preroll + [frame])[-self.preroll_frames:]
+            self.loud_run = self.loud_run + 1 if speech else 0
+            if self.loud_run < VAD_START_FRAMES:
+                return []
+            self.in_speech = True
+            self.utterance = list(self.preroll)
+            self.utterance_ms = sum(len(f) for f in self.utterance) / self.sample_rate * 1000
+            self.preroll = []
+            return []
+
+        self.utterance.append(frame)
+        self.utterance_ms += frame_ms
+        self.silence_ms = 0.0 if speech else self.silence_ms + frame_ms
+
+        if self.silence_ms >= ASR_END_OF_UTTERANCE_MS:
+            return [self._final("silence")]
+        if self.utterance_ms >= ASR_MAX_UTTERANCE_MS:
+            return [self._final("max_length")]
+        # Decode on schedule, and as soon as a pause starts (words are most likely complete there)
+        pause_started = not speech and self.silence_ms == frame_ms
+        if pause_started or self.utterance_ms - self.last_decode_ms >= ASR_PARTIAL_INTERVAL_MS:
+            event = self._partial(pause=not speech)
+            return [event] if event["text"] else []
+        return []
+
+    def flush(self) -> List[Dict]:
+        """End of stream: finalize an utterance still in progress"""
+        return [self._final("end_of_stream")] if self.in_speech else []
+
+
+def stream_transcribe(frames: Iterable, backend: ASRBackend = None) -> Iterator[Dict]:
+    """Partial and final transcript events for a stream of PCM frames"""
+    transcriber = StreamingTranscriber(backend)
+    for frame in frames:
+        yield from transcriber.feed(frame)
+    yield from transcriber.flush()
+
+
+def transcribe_audio(audio_file_path: str, backend: ASRBackend = None) -> str:
+    """Whole-file transcript (the planned non-streaming interface)"""
+    finals = [e["text"] for e in stream_transcribe(read_wav_frames(audio_file_path), backend) if e["type"] == "final"]
+    return " ".join(t for t in finals if t)
@@ -0,0 +1,256 @@
+# voice/pipeline.py
+"""
+Voice pipeline: streaming ASR feeding the speculative graph
+While the user is still talking, the first stable partial transcript starts
+the vector search (graph/speculative.py). A change in the stable partial
+restarts only the search; the router LLM call is speculated at most once per
+utterance, on a stable partial at a pause, since a running LLM call can't
+be cancelled. At end of utterance the graph runs with that speculation if
+the final transcript matches it; otherwise the speculation is dropped and
+the graph starts fresh.
+
+stream_voice also speaks the answer while it is generated: the answerer
+streams its text, and each sentence is synthesized as soon as it is
+complete (voice/tts.py); recurring sentences come from the audio cache.
+"""
+
+from voice.asr import ASRBackend, StreamingTranscriber, read_wav_frames
+from voice.tts import TTSBackend, SentenceTTS, write_audio
+from graph.speculative import start_speculative_retrieval, discard_speculation
+from typing import Dict, Iterable, Iterator, Optional
+import threading
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+VOICE_GRAPH_VERSION = "speculative"
+
+_graph = None
+
+
+def get_voice_graph():
+    """Speculative graph, compiled once"""
+    global _graph
+    if _graph is None:
+        from graph.graph import create_graph
+        _graph = create_graph(VOICE_GRAPH_VERSION)
+    return _graph
+
+
+def normalize_transcript(text: str) -> str:
+    """Case/punctuation-insensitive form used to match partials to the final"""
+    return " ".join(re.findall(r"[\w$]+(?:\.\d+)?", text.lower()))
+
+
+class EarlySpeculation:
+    """
+    At most one speculation in flight per utterance, restarted if the stable
+    partial changes; at most one router LLM call per utterance
+    """
+
+    def __init__(self):
+        self.speculation_id = None
+        self.text = ""
+        self.started_ms = None
+        self.restarts = 0
+        self.routed = False  # Router call already speculated for this utterance
+
+    def on_partial(self, event: Dict):
+        text = normalize_transcript(event["text"])
+        if not event["stable"] or not text or text == self.text:
+            return
+        if self.speculation_id:
+            discard_speculation(self.speculation_id)
+            self.restarts += 1
+        # Only once the user pauses: words are most likely complete, so the one router call isn't wasted
+        route = not self.routed and event.get("pause", False)
+        self.speculation_id = start_speculative_retrieval(event["text"], route=route)
+        self.routed = self.routed or route
+        self.text, self.started_ms = text, event["t_ms"]
+        logger.info(f"[Voice] Speculating{' (with route)' if route else ''} on stable partial "
+                    f"at {event['t_ms']}ms: '{event['text']}'")
+
+    def claim(self, final_text: str) -> Optional[str]:
+        """speculation_id to hand to the graph, or None (discarded) if the final differs"""
+        if self.speculation_id and normalize_transcript(final_text) == self.text:
+            return self.speculation_id
+        if self.speculation_id:
+            discard_speculation(self.speculation_id)
+        return None
+
+
+def listen(frames: Iterable, asr_backend: ASRBackend = None):
+    """
+    Transcribe the first utterance in frames, speculating on stable partials
+
+    Returns:
+        (final event or None, EarlySpeculation, speculation_id the graph may reuse or None)
+    """
+    transcriber = StreamingTranscriber(asr_backend)
+    speculation = EarlySpeculation()
+    final = None
+
+    for frame in frames:
+        for event in transcriber.feed(frame):
+            if event["type"] == "partial":
+                speculation.on_partial(event)
+            else:
+                final = event
+        if final:
+            break
+    if final is None:
+        final = (transcriber.flush() or [None])[0]
+    if final is None or not final["text"]:
+        speculation.claim("")
+        return None, speculation, None
+    return final, speculation, speculation.claim(final["text"])
+
+
+def initial_state(query: str, speculation_id: Optional[str]) -> Dict:
+    state = {"query": query, "step_log": []}
+    if speculation_id:
+        state["speculation_id"] = speculation_id
+    return state
+
+
+def voice_report(final: Dict, speculation: EarlySpeculation, speculation_id: Optional[str], graph_ms: float) -> Dict:
+    """Speculation and timing details for a voice turn"""
+    logger.info(f"[Voice] '{final['text']}': graph {graph_ms:.0f}ms after end of utterance, "
+                f"speculation {'reused' if speculation_id else 'not used'}")
+    return {
+        "speech": True,
+        "end_of_utterance_ms": final["t_ms"],
+        "utterance_ms": final["utterance_ms"],
+        "speculation_started_ms": speculation.started_ms,
+        "speculation_lead_ms": final["t_ms"] - speculation.started_ms if speculation.started_ms is not None else 0,
+        "speculation_reused": speculation_id is not None,
+        "speculation_restarts": speculation.restarts,
+        "speculation_routed": speculation.routed,
+        "graph_ms": round(graph_ms, 1),
+    }
+
+
+NO_SPEECH = {"query": "", "answer": "", "citations": [], "step_log": [], "voice": {"speech": False}}
+
+
+def stream_query(frames: Iterable, asr_backend: ASRBackend = None, graph=None) -> Dict:
+    """
+    Transcribe the first utterance in frames and answer it (text only)
+
+    Returns:
+        query, answer, citations, step_log and a voice report (when
+        speculation started, whether the graph reused it, ASR/graph timings)
+    """
+    final, speculation, speculation_id = listen(frames, asr_backend)
+    if final is None:
+        return dict(NO_SPEECH)
+
+    graph = graph or get_voice_graph()
+    start = time.perf_counter()
+    result = graph.invoke(initial_state(final["text"], speculation_id))
+    graph_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "query": final["text"],
+        "answer": result.get("answer", ""),
+        "citations": result.get("citations", []),
+        "step_log": result.get("step_log", []),
+        "voice": voice_report(final, speculation, speculation_id, graph_ms),
+    }
+
+
+def stream_voice(frames: Iterable, asr_backend: ASRBackend = None, tts_backend: TTSBackend = None,
+                 graph=None) -> Iterator[Dict]:
+    """
+    Voice-to-voice turn with the answer spoken while it is generated
+
+    The graph runs on a background thread with stream_answer set; answer
+    deltas go to SentenceTTS and audio chunks are yielded in order as soon
+    as each sentence is synthesized. Answers that aren't generated token by
+    token (templates, refusals, fallbacks) are spoken from the final state.
+
+    Yields:
+        {"type": "transcript", "text"}, then {"type": "audio", ...chunk} per
+        sentence, then {"type": "result", query, answer, citations, step_log, voice}
+    """
+    final, speculation, speculation_id = listen(frames, asr_backend)
+    if final is None:
+        yield {"type": "result", **NO_SPEECH}
+        return
+    yield {"type": "transcript", "text": final["text"]}
+
+    graph = graph or get_voice_graph()
+    state = {**initial_state(final["text"], speculation_id), "stream_answer": True}
+    tts = SentenceTTS(tts_backend)
+    result, errors = {}, []
+    start = time.perf_counter()
+
+    def run_graph():
+        streamed = False
+        try:
+            for mode, chunk in graph.stream(state, stream_mode=["custom", "values"]):
+                if mode == "custom" and "answer_delta" in chunk:
+                    tts.feed(chunk["answer_delta"])
+                    streamed = True
+                elif mode == "values":
+                    result.update(chunk)
+            if not streamed:
+                tts.feed(result.get("answer", ""))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            tts.close()
+
+    thread = threading.Thread(target=run_graph, daemon=True, name="voice-graph")
+    thread.start()
+
+    first_audio_ms, sentences, cached = None, 0, 0
+    for chunk in tts.chunks():
+        if first_audio_ms is None:
+            first_audio_ms = round((time.perf_counter() - start) * 1000, 1)
+        sentences += 1
+        cached += chunk["cached"]
+        yield {"type": "audio", **chunk}
+    thread.join()
+    if errors:
+        raise errors[0]
+
+    voice = voice_report(final, speculation, speculation_id, (time.perf_counter() - start) * 1000)
+    voice.update(first_audio_ms=first_audio_ms, sentences=sentences, cached_sentences=cached)
+    yield {
+        "type": "result",
+        "query": final["text"],
+        "answer": result.get("answer", ""),
+        "citations": result.get("citations", []),
+        "step_log": result.get("step_log", []),
+        "voice": voice,
+    }
+
+
+def voice_query(audio_input_path: str, asr_backend: ASRBackend = None) -> Dict:
+    """stream_query over a 16 kHz mono WAV file, frame by frame as if live"""
+    return stream_query(read_wav_frames(audio_input_path), asr_backend)
+
+
+def voice_to_voice_query(audio_input_path: str, output_path: str = "output.wav") -> Dict:
+    """
+    Complete voice-to-voice turn from a WAV file (the planned pipeline interface)
+
+    Returns:
+        query, answer, citations, audio_path (None if nothing was said) and the voice report
+    """
+    chunks, result = [], {}
+    for event in stream_voice(read_wav_frames(audio_input_path)):
+        if event["type"] == "audio":
+            chunks.append(event)
+        elif event["type"] == "result":
+            result = event
+    return {
+        "query": result["query"],
+        "answer": result["answer"],
+        "citations": result["citations"],
+        "audio_path": write_audio(chunks, output_path) if chunks else None,
+        "voice": result["voice"],
+    }
@@ -0,0 +1,293 @@
+# voice/tts.py
+"""
+Sentence-pipelined text-to-speech
+Answer text arrives in deltas while the LLM is still generating. Each
+complete sentence is sent to the TTS backend right away, so the first
+sentence is synthesized (and can be played) while later ones are still being
+generated; audio chunks come out in sentence order. The citation tail
+("Citations: [DOC 1]...") and inline [DOC n] markers are never spoken.
+Sentences already in the audio cache (voice/tts_cache.py) skip TTS and are
+ready immediately.
+
+    tts = SentenceTTS()
+    tts.feed("The Acme kettle is $24.99. It has")   # from the generator thread
+    tts.feed(" a 4.6 rating.\\nCitations: [DOC 1]")
+    tts.close()
+    for chunk in tts.chunks():                        # from the player thread
+        ...  # {"index", "text", "audio", "format", "synth_ms", "cached"}
+
+The backend is selected by TTS_BACKEND: "openai" (openai SDK, imported
+lazily) or "fake" (deterministic silent WAV, for tests and offline runs).
+"""
+
+from voice.tts_cache import AudioCache, cache_key, get_tts_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol
+import numpy as np
+import threading
+import queue
+import wave
+import time
+import io
+import re
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+TTS_BACKEND = os.getenv("TTS_BACKEND", "openai")
+TTS_MODEL = os.getenv("TTS_MODEL", "tts-1")
+TTS_VOICE = os.getenv("TTS_VOICE", "alloy")
+# WAV: no decoder delay before playback, and chunks can be joined into one file
+TTS_FORMAT = os.getenv("TTS_FORMAT", "wav")
+
+# Sentences synthesized concurrently (order of output is kept regardless)
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "2"))
+# Fragments shorter than this are merged into the next sentence rather than synthesized alone
+TTS_MIN_CHARS = int(os.getenv("TTS_MIN_CHARS", "20"))
+
+# Fake backend: 24 kHz like OpenAI's wav output, speaking rate and synthesis cost per character
+FAKE_SAMPLE_RATE = 24000
+FAKE_MS_PER_CHAR = float(os.getenv("TTS_FAKE_MS_PER_CHAR", "60"))
+FAKE_SYNTH_MS_PER_CHAR = float(os.getenv("TTS_FAKE_SYNTH_MS_PER_CHAR", "2"))
+
+
+class TTSBackend(Protocol):
+    """Interface every text-to-speech backend implements"""
+
+    name: str
+
+    def synthesize(self, text: str, voice: str = TTS_VOICE, fmt: str = TTS_FORMAT) -> bytes:
+        """Audio for one sentence, encoded as fmt"""
+        ...
+
+
+class OpenAIBackend:
+    """OpenAI speech API (tts-1), one request per sentence"""
+
+    name = "openai"
+
+    def __init__(self, model: str = TTS_MODEL):
+        from openai import OpenAI  # optional dependency, only needed for real speech
+        self.client = OpenAI()
+        self.model = model
+
+    def synthesize(self, text: str, voice: str = TTS_VOICE, fmt: str = TTS_FORMAT) -> bytes:
+        response = self.client.audio.speech.create(model=self.model, voice=voice, input=text, response_format=fmt)
+        return response.content
+
+
+class FakeBackend:
+    """
+    Deterministic stand-in: silent 16-bit mono WAV lasting FAKE_MS_PER_CHAR
+    per character, after sleeping FAKE_SYNTH_MS_PER_CHAR per character to
+    mimic synthesis time.
+    """
+
+    name = "fake"
+
+    def synthesize(self, text: str, voice: str = TTS_VOICE, fmt: str = TTS_FORMAT) -> bytes:
+        if fmt != "wav":
+            raise ValueError(f"fake TTS backend only produces wav, got '{fmt}'")
+        time.sleep(len(text) * FAKE_SYNTH_MS_PER_CHAR / 1000)
+        samples = np.zeros(int(FAKE_SAMPLE_RATE * len(text) * FAKE_MS_PER_CHAR / 1000), dtype=np.int16)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(FAKE_SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "fake": FakeBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_tts_backend(name: str = None) -> TTSBackend:
+    """Backend selected by TTS_BACKEND (cached, one client per process)"""
+    name = (name or TTS_BACKEND).lower().strip()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+# ============================================================================
+# Text preparation
+# ============================================================================
+
+CITATIONS_RE = re.compile(r"Citations?:", re.IGNORECASE)
+INLINE_CITATION_RE = re.compile(r"\s*\[DOC\s+\d+\]")
+# Sentence end: . ! ? (not inside a number like 19.99) followed by whitespace, or a line break
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+ABBREVIATIONS = ("e.g.", "i.e.", "vs.", "etc.", "approx.", "Mr.", "Mrs.", "Dr.", "oz.", "lbs.")
+
+
+def speakable(text: str) -> str:
+    """Sentence as it should be read aloud: no citation markers or markdown"""
+    text = INLINE_CITATION_RE.sub("", text)
+    text = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s+", "", text)  # list bullets
+    text = re.sub(r"[*_#`]+", "", text)
+    return " ".join(text.split())
+
+
+class SentenceSplitter:
+    """Cuts streamed text into complete, speakable sentences; stops at the citation tail"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.done = False  # Citation tail reached: ignore the rest of the text
+
+    def feed(self, delta: str) -> List[str]:
+        """Append delta and return the sentences it completed"""
+        if self.done:
+            return []
+        self.buffer += delta
+        match = CITATIONS_RE.search(self.buffer)
+        if match:
+            self.buffer, self.done = self.buffer[:match.start()], True
+
+        sentences, start, pending = [], 0, ""
+        for boundary in SENTENCE_END_RE.finditer(self.buffer):
+            piece = self.buffer[start:boundary.start()]
+            if piece.rstrip().endswith(ABBREVIATIONS):
+                continue
+            start = boundary.end()
+            text = speakable(f"{pending} {piece}")
+            if len(text) < TTS_MIN_CHARS:
+                pending = text
+                continue
+            sentences.append(text)
+            pending = ""
+        self.buffer = f"{pending} {self.buffer[start:]}" if pending else self.buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """Whatever is left once the text is complete"""
+        rest, self.buffer = speakable(self.buffer), ""
+        return rest
+
+
+def split_sentences(text: str) -> List[str]:
+    """Speakable sentences of a finished answer"""
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text)
+    rest = splitter.flush()
+    return sentences + [rest] if rest else sentences
+
+
+# ============================================================================
+# Sentence pipeline
+# ============================================================================
+
+class SentenceTTS:
+    """Incremental sentence splitting with in-order, overlapped synthesis"""
+
+    def __init__(self, backend: TTSBackend = None, voice: str = TTS_VOICE, fmt: str = TTS_FORMAT,
+                 cache: Optional[AudioCache] = None):
+        self.backend = backend or get_tts_backend()
+        self.voice = voice
+        self.fmt = fmt
+        self.cache = cache or get_tts_cache()
+        self.splitter = SentenceSplitter()
+        self.index = 0
+        self.started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+        self._queue: "queue.Queue" = queue.Queue()  # (index, text, Future) in sentence order, None at the end
+        self._lock = threading.Lock()
+
+    def _synthesize(self, text: str, key: Optional[str]) -> Dict:
+        start = time.perf_counter()
+        audio = self.backend.synthesize(text, self.voice, self.fmt)
+        if key:
+            self.cache.put(key, self.fmt, audio)
+        return {"audio": audio, "synth_ms": round((time.perf_counter() - start) * 1000, 1), "cached": False}
+
+    def _submit(self, text: str):
+        key = cache_key(text, self.voice, self.fmt, self.backend.name) if self.cache else None
+        audio = self.cache.get(key) if key else None
+        if audio is not None:
+            future = Future()
+            future.set_result({"audio": audio, "synth_ms": 0.0, "cached": True})
+        else:
+            future = self._executor.submit(self._synthesize, text, key)
+        self._queue.put((self.index, text, future))
+        self.index += 1
+
+    def feed(self, delta: str):
+        """Add generated text; complete sentences start synthesizing immediately"""
+        with self._lock:
+            for sentence in self.splitter.feed(delta):
+                self._submit(sentence)
+
+    def close(self):
+        """End of text: synthesize what's left in the buffer"""
+        with self._lock:
+            rest = self.splitter.flush()
+            if rest:
+                self._submit(rest)
+            self._queue.put(None)
+
+    def chunks(self) -> Iterator[Dict]:
+        """Audio chunks in sentence order, as soon as each is ready (blocks until close())"""
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                index, text, future = item
+                result = future.result()
+                yield {
+                    "index": index,
+                    "text": text,
+                    "format": self.fmt,
+                    "ready_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                    **result,
+                }
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def synthesize_stream(deltas: Iterable[str], backend: TTSBackend = None,
+                      voice: str = TTS_VOICE, fmt: str = TTS_FORMAT, cache: Optional[AudioCache] = None) -> Iterator[Dict]:
+    """Audio chunks for a stream of text deltas, consumed on a background thread"""
+    tts = SentenceTTS(backend, voice, fmt, cache)
+
+    def produce():
+        try:
+            for delta in deltas:
+                tts.feed(delta)
+        finally:
+            tts.close()
+
+    threading.Thread(target=produce, daemon=True, name="tts-feed").start()
+    yield from tts.chunks()
+
+
+def write_audio(chunks: Iterable[Dict], output_path: str) -> str:
+    """Write chunks to one file: WAV chunks are joined frame-wise, other formats concatenated"""
+    chunks = list(chunks)
+    if chunks and chunks[0]["format"] == "wav":
+        params, frames = None, []
+        for chunk in chunks:
+            with wave.open(io.BytesIO(chunk["audio"]), "rb") as wav:
+                params = params or wav.getparams()
+                frames.append(wav.readframes(wav.getnframes()))
+        with wave.open(output_path, "wb") as out:
+            out.setparams(params)
+            for data in frames:
+                out.writeframes(data)
+    else:
+        with open(output_path, "wb") as out:
+            for chunk in chunks:
+                out.write(chunk["audio"])
+    return output_path
+
+
+def synthesize_speech(text: str, output_path: str, backend: TTSBackend = None) -> str:
+    """Whole answer to one audio file (the planned non-streaming interface)"""
+    return write_audio(synthesize_stream([text], backend), output_path)
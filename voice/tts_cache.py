@@ -0,0 +1,171 @@
+# voice/tts_cache.py
+"""
+Content-addressed cache of synthesized speech
+Much of what the assistant says is repeated verbatim: the no-results
+answer, refusals, fallbacks and common template sentences. Audio is stored
+on disk under the SHA-256 of (backend, voice, format, text), so a repeated
+sentence is played straight from disk instead of calling TTS. Entries are
+evicted least-recently-used once the directory exceeds TTS_CACHE_MAX_BYTES;
+file mtimes carry recency across restarts.
+"""
+
+from collections import OrderedDict, Counter
+from pathlib import Path
+from typing import Dict, Optional
+import threading
+import hashlib
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1") != "0"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "./data/tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def cache_key(text: str, voice: str, fmt: str, backend: str) -> str:
+    """SHA-256 over backend, voice, format and whitespace-normalized text"""
+    text = " ".join(text.split())
+    return hashlib.sha256(f"{backend}\x1f{voice}\x1f{fmt}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Files at <dir>/<key[:2]>/<key>.<fmt>, indexed in LRU order with their sizes"""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, Path]" = OrderedDict()  # key -> path, oldest first
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self._stats = Counter()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Index existing files, least recently used first"""
+        files = []
+        if self.directory.exists():
+            for path in self.directory.glob("*/*.*"):
+                if path.suffix == ".tmp":
+                    path.unlink(missing_ok=True)  # left by a crashed write
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path.stem, path, stat.st_size))
+        for _, key, path, size in sorted(files):
+            self._index[key] = path
+            self._sizes[key] = size
+            self.total_bytes += size
+        if files:
+            logger.info(f"[TTS cache] {len(files)} entries, {self.total_bytes / 1e6:.1f} MB in {self.directory}")
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{fmt}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            path = self._index.get(key)
+            if path is None:
+                self._stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)  # recency survives restarts
+        except OSError:
+            # Deleted behind our back: forget it
+            with self._lock:
+                if self._index.pop(key, None) is not None:
+                    self.total_bytes -= self._sizes.pop(key, 0)
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["bytes_served"] += len(audio)
+        return audio
+
+    def put(self, key: str, fmt: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        path = self._path(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(audio)
+        os.replace(tmp, path)
+        with self._lock:
+            if key in self._index:
+                self.total_bytes -= self._sizes[key]
+            self._index[key] = path
+            self._index.move_to_end(key)
+            self._sizes[key] = len(audio)
+            self.total_bytes += len(audio)
+            self._stats["puts"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until under max_bytes (lock held)"""
+        while self.total_bytes > self.max_bytes and self._index:
+            key, path = self._index.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(key, 0)
+            self._stats["evictions"] += 1
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            while self._index:
+                _, path = self._index.popitem()
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._sizes.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries, total_bytes = len(self._index), self.total_bytes
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "lookups": lookups,
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "hit_ratio": round(stats.get("hits", 0) / lookups, 4) if lookups else 0.0,
+            "bytes_served": stats.get("bytes_served", 0),
+            "puts": stats.get("puts", 0),
+            "evictions": stats.get("evictions", 0),
+        }
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> Optional[AudioCache]:
+    """Process-wide cache, or None when TTS_CACHE=0"""
+    global _cache
+    if not TTS_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
+
+
+def get_tts_cache_stats() -> Dict:
+    """Entries, bytes on disk, hit ratio and eviction counters"""
+    cache = get_tts_cache()
+    return cache.stats() if cache else {"enabled": False}